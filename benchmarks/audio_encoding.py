@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Compares upload encodings: bytes sent and encode time per second of audio.
+
+Formats whose optional codec is not installed are reported and skipped.
+
+    python -m benchmarks.audio_encoding --seconds 10 --repeat 20
+"""
+import argparse
+import time
+
+import numpy as np
+
+from com.mhire.utils.audio import AUDIO_ENCODINGS, encode_audio
+
+SAMPLING_RATE = 16000
+
+
+def speech_like_audio(seconds: float) -> np.ndarray:
+    """Harmonic tone with a syllable-rate envelope and background noise."""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLING_RATE)) / SAMPLING_RATE
+    envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t)) ** 2 / 4
+    voice = sum(np.sin(2 * np.pi * 140 * k * t) / k for k in range(1, 8))
+    audio = 0.3 * envelope * voice + 0.01 * rng.standard_normal(t.shape[0])
+    return np.clip(audio, -1, 1).astype(np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of the encoded utterance")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    audio = speech_like_audio(args.seconds)
+    print(f"{'format':>6} {'bytes/s audio':>14} {'ratio':>6} {'encode ms/s audio':>18}")
+    wav_size = None
+    for fmt in AUDIO_ENCODINGS:
+        try:
+            _, payload, _ = encode_audio(audio, SAMPLING_RATE, fmt)
+        except RuntimeError as e:
+            print(f"{fmt:>6}  skipped: {e}")
+            continue
+        wav_size = wav_size or len(payload)
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            encode_audio(audio, SAMPLING_RATE, fmt)
+        elapsed = (time.perf_counter() - start) / args.repeat
+
+        print(
+            f"{fmt:>6} {len(payload) / args.seconds:>14.0f} {len(payload) / wav_size:>6.2f} "
+            f"{elapsed * 1000 / args.seconds:>18.3f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""End-to-end latency of the live pipeline against a local mock Groq server.
+
+Replays WAV/FLAC fixtures (or synthetic speech) through ``Pipeline`` with the
+real segmentation, VAD, HTTP clients and translation path, one pipeline per
+stream. Reports utterance-end to transcript and to translation latency
+(p50/p95/p99), CPU per stream, peak memory and the per-stage metrics, and
+writes them as JSON.
+An utterance ends where the VAD marks the end of its last speech, so the
+silence needed to close a segment counts towards the latency.
+
+    python -m benchmarks.end_to_end --fixtures recordings/ --streams 4 --speed 2 \\
+        --latency 0.3 --jitter 0.1 --output results.json
+"""
+import argparse
+import json
+import os
+import platform
+import threading
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from benchmarks.mock_groq import MockGroq, MockGroqServer
+from benchmarks.replay import ReplayTranscription, load_fixtures, synthetic_speech
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    if not values:
+        return {"count": 0, "p50": None, "p95": None, "p99": None, "mean": None}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {"count": len(values), "p50": p50, "p95": p95, "p99": p99, "mean": float(np.mean(values))}
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1024 * 1024 if platform.system() == "Darwin" else 1024)
+
+
+class LatencyRecorder:
+    """Pipeline sinks that time each result against the end of its utterance's speech"""
+
+    def __init__(self, transcription: ReplayTranscription):
+        self.transcription = transcription
+        self.transcript_latencies: List[float] = []
+        self.first_delta_latencies: List[float] = []
+        self.translation_latencies: List[float] = []
+        self.first_deltas = set()
+        self.lock = threading.Lock()
+
+    def latency(self, sequence: int) -> float:
+        return time.perf_counter() - self.transcription.utterance_end_times[sequence]
+
+    def on_transcription(self, utterance) -> None:
+        with self.lock:
+            self.transcript_latencies.append(self.latency(utterance.sequence))
+
+    def on_translation(self, utterance, tgt_lang: str) -> None:
+        with self.lock:
+            self.translation_latencies.append(self.latency(utterance.sequence))
+
+    def on_translation_delta(self, utterance, tgt_lang: str, delta: str) -> None:
+        with self.lock:
+            if (utterance.sequence, tgt_lang) not in self.first_deltas:
+                self.first_deltas.add((utterance.sequence, tgt_lang))
+                self.first_delta_latencies.append(self.latency(utterance.sequence))
+
+
+def run(args) -> dict:
+    mock = MockGroq(args.latency, args.jitter, args.error_rate, args.token_interval)
+    server = MockGroqServer(mock)
+    server.start()
+    os.environ.update(server.environment())
+    os.environ["TRANSLATION_CACHE"] = "none"  # Replayed fixtures repeat; measure the API path
+    # Latencies are matched to utterances by sequence, which interim commits would shift
+    os.environ["INTERIM_RESULTS"] = "false"
+
+    # Imported after the environment points at the mock server
+    from com.mhire.config.config import Config
+    from com.mhire.services.pipeline import Pipeline
+    from com.mhire.services.translation import Translation
+    from com.mhire.utils.metrics import metrics
+
+    metrics.enabled = True
+
+    try:
+        config = Config()
+        translation = Translation(config)
+        if args.fixtures:
+            audio = load_fixtures(args.fixtures)
+        else:
+            audio = [synthetic_speech(args.seconds, seed=i) for i in range(args.streams)]
+
+        pipelines, recorders = [], []
+        for i in range(args.streams):
+            transcription = ReplayTranscription(config, audio[i % len(audio)], speed=args.speed)
+            recorder = LatencyRecorder(transcription)
+            pipeline = Pipeline(
+                config, transcription, translation,
+                src_lang=args.src or None, tgt_langs=args.tgt,
+                on_transcription=recorder.on_transcription,
+                on_translation=recorder.on_translation,
+                on_translation_delta=recorder.on_translation_delta if config.TRANSLATION_STREAMING else None,
+            )
+            pipelines.append(pipeline)
+            recorders.append(recorder)
+
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for pipeline in pipelines:
+            pipeline.start()
+        for pipeline in pipelines:
+            pipeline.transcription.finished.wait()
+        for pipeline in pipelines:
+            pipeline.stop(timeout=args.drain_timeout)
+        cpu_seconds, wall_seconds = time.process_time() - cpu_start, time.perf_counter() - wall_start
+    finally:
+        server.stop()
+
+    audio_seconds = sum(len(p.transcription.replay_audio) for p in pipelines) / 16000
+
+    def collect(name: str) -> List[float]:
+        return [latency for recorder in recorders for latency in getattr(recorder, name)]
+
+    return {
+        "parameters": vars(args),
+        "streams": args.streams,
+        "audio_seconds": audio_seconds,
+        "wall_seconds": wall_seconds,
+        "utterances": sum(len(p.transcription.utterance_end_times) for p in pipelines),
+        "latency_seconds": {
+            "transcript": percentiles(collect("transcript_latencies")),
+            "translation_first_delta": percentiles(collect("first_delta_latencies")),
+            "translation": percentiles(collect("translation_latencies")),
+        },
+        "cpu": {
+            "process_seconds": cpu_seconds,
+            "percent_per_stream": 100 * cpu_seconds / wall_seconds / args.streams,
+            "seconds_per_audio_second": cpu_seconds / audio_seconds,
+        },
+        "peak_rss_mb": peak_rss_mb(),
+        "stage_metrics": metrics.snapshot(),
+        "mock_server": {"latency": args.latency, "jitter": args.jitter, "error_rate": args.error_rate},
+    }
+
+
+def print_summary(results: dict) -> None:
+    print(f"{results['streams']} stream(s), {results['audio_seconds']:.1f}s audio, "
+          f"{results['utterances']} utterances in {results['wall_seconds']:.1f}s")
+    print(f"{'latency (s)':>24} {'n':>5} {'p50':>7} {'p95':>7} {'p99':>7}")
+    for name, stats in results["latency_seconds"].items():
+        if stats["count"]:
+            print(f"{name:>24} {stats['count']:>5} {stats['p50']:>7.3f} {stats['p95']:>7.3f} {stats['p99']:>7.3f}")
+    cpu = results["cpu"]
+    print(f"CPU {cpu['percent_per_stream']:.1f}% per stream, {cpu['seconds_per_audio_second'] * 1000:.1f} ms per audio second")
+    if results["peak_rss_mb"] is not None:
+        print(f"Peak RSS {results['peak_rss_mb']:.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fixtures", nargs="*", default=[], help="WAV/FLAC files replayed round-robin over the streams")
+    parser.add_argument("--seconds", type=float, default=30.0, help="length of synthetic audio without fixtures")
+    parser.add_argument("--streams", type=int, default=1, help="concurrent pipelines")
+    parser.add_argument("--speed", type=float, default=1.0, help="replay speed, 1 is real time")
+    parser.add_argument("--src", default="en", help="source language code, empty to detect it")
+    parser.add_argument("--tgt", nargs="+", default=["de"])
+    parser.add_argument("--latency", type=float, default=0.2, help="mock API base latency in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="mock API extra random latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of mock API requests that fail")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="mock delay between streamed words")
+    parser.add_argument("--drain-timeout", type=float, default=30.0, help="wait for queued utterances after replay")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    results = run(args)
+    print_summary(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, default=float)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Accuracy and cost of the local source-language detector.
+
+Runs ``detect_text_language`` over short transcripts in each supported
+language, uncached and cached, and reports the accuracy and the time per
+call, to compare against the API round trip it sits next to.
+
+    python -m benchmarks.language_detection --repeat 2000
+"""
+import argparse
+import time
+
+from com.mhire.services.language_detection import detect_text_language
+
+SAMPLES = {
+    "en": [
+        "Good morning, how are you today?",
+        "I think we should leave before the traffic gets worse.",
+        "Can you tell me where the train station is?",
+        "The meeting was moved to Thursday afternoon.",
+        "Thank you very much for your help.",
+        "What time does the shop open?",
+    ],
+    "de": [
+        "Guten Morgen, wie geht es dir heute?",
+        "Ich glaube, wir sollten losfahren, bevor der Verkehr schlimmer wird.",
+        "Können Sie mir sagen, wo der Bahnhof ist?",
+        "Das Treffen wurde auf Donnerstagnachmittag verschoben.",
+        "Vielen Dank für Ihre Hilfe.",
+        "Wann öffnet das Geschäft?",
+    ],
+    "ar": [
+        "صباح الخير، كيف حالك اليوم؟",
+        "أعتقد أنه يجب أن نغادر قبل أن يزداد الازدحام.",
+        "هل يمكنك أن تخبرني أين محطة القطار؟",
+        "تم نقل الاجتماع إلى بعد ظهر يوم الخميس.",
+        "شكرا جزيلا على مساعدتك.",
+        "متى يفتح المتجر؟",
+    ],
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=2000, help="calls per sample for the timings")
+    args = parser.parse_args()
+
+    samples = [(lang, text) for lang, texts in SAMPLES.items() for text in texts]
+    correct = sum(detect_text_language.__wrapped__(text) == lang for lang, text in samples)
+    print(f"accuracy {correct}/{len(samples)}")
+    for lang, text in samples:
+        detected = detect_text_language.__wrapped__(text)
+        if detected != lang:
+            print(f"  expected {lang}, got {detected}: {text}")
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for _, text in samples:
+            detect_text_language.__wrapped__(text)
+    uncached = (time.perf_counter() - start) / (args.repeat * len(samples))
+
+    detect_text_language.cache_clear()
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for _, text in samples:
+            detect_text_language(text)
+    cached = (time.perf_counter() - start) / (args.repeat * len(samples))
+
+    print(f"uncached {uncached * 1e6:.1f} us/call, cached {cached * 1e6:.2f} us/call")
+
+
+if __name__ == "__main__":
+    main()
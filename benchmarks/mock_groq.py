@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Local stand-in for the Groq transcription and chat-completions endpoints.
+
+Every response waits ``latency`` seconds plus up to ``jitter`` seconds of
+uniform random delay; a fraction ``error_rate`` of requests fails with a
+503 or a 429 carrying ``Retry-After``. With ``requests_per_second`` set,
+requests beyond that quota (a token bucket holding one second of it) are
+answered 429 like the real API. Transcriptions grow with the uploaded
+audio, completions echo the user message (so numbered batches split back
+cleanly) and stream word by word when asked to.
+
+    python -m benchmarks.mock_groq --port 8090 --latency 0.3 --jitter 0.1
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import random
+import time
+from typing import Optional
+
+from aiohttp import web
+
+TRANSCRIPTION_PATH = "/openai/v1/audio/transcriptions"
+CHAT_COMPLETIONS_PATH = "/openai/v1/chat/completions"
+
+WAV_HEADER_BYTES = 44
+PCM16_BYTES_PER_SECOND = 16000 * 2
+
+# Transcripts grow with the audio, about as fast as speech, so re-sends of a
+# growing utterance extend the previous transcript like a real ASR would
+WORDS = "the quick brown fox jumps over a lazy dog while seven wizards box jolly quails".split()
+WORDS_PER_SECOND = 2.5
+
+
+class MockGroq:
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, error_rate: float = 0.0,
+                 token_interval: float = 0.01, seed: int = 0, requests_per_second: float = 0.0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_interval = token_interval
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self.requests_per_second = requests_per_second
+        self.quota = max(1.0, requests_per_second)
+        self.quota_updated = time.monotonic()
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_post(TRANSCRIPTION_PATH, self.transcribe)
+        app.router.add_post(CHAT_COMPLETIONS_PATH, self.complete)
+        return app
+
+    async def delay(self) -> Optional[web.Response]:
+        """Wait the simulated service time; returns an error response for failed requests"""
+        self.requests += 1
+        if self.over_quota():
+            return web.json_response({"error": "rate limited"}, status=429, headers={"Retry-After": "1"})
+        await asyncio.sleep(self.latency + self.rng.uniform(0, self.jitter))
+        if self.rng.random() >= self.error_rate:
+            return None
+        if self.rng.random() < 0.5:
+            return web.json_response({"error": "rate limited"}, status=429, headers={"Retry-After": "0.1"})
+        return web.json_response({"error": "unavailable"}, status=503)
+
+    def over_quota(self) -> bool:
+        if not self.requests_per_second:
+            return False
+        now = time.monotonic()
+        capacity = max(1.0, self.requests_per_second)
+        self.quota = min(capacity, self.quota + (now - self.quota_updated) * self.requests_per_second)
+        self.quota_updated = now
+        if self.quota < 1:
+            return True
+        self.quota -= 1
+        return False
+
+    async def transcribe(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        payload = form["file"].file.read()
+        error = await self.delay()
+        if error is not None:
+            return error
+
+        seconds = max(0, len(payload) - WAV_HEADER_BYTES) / PCM16_BYTES_PER_SECOND
+        count = max(1, int(seconds * WORDS_PER_SECOND))
+        text = ' '.join(WORDS[i % len(WORDS)] for i in range(count)) + "."
+        if form.get("response_format") != "verbose_json":
+            return web.json_response({"text": text})
+        return web.json_response({
+            "text": text,
+            "language": "english",
+            "duration": seconds,
+            "segments": [{"start": 0.0, "end": seconds, "text": text}],
+        })
+
+    async def complete(self, request: web.Request) -> web.StreamResponse:
+        body = await request.json()
+        error = await self.delay()
+        if error is not None:
+            return error
+
+        content = body["messages"][-1]["content"].upper()
+        if not body.get("stream"):
+            return web.json_response({"choices": [{"message": {"role": "assistant", "content": content}}]})
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        for i, word in enumerate(content.split(" ")):
+            delta = {"choices": [{"delta": {"content": word if i == 0 else " " + word}}]}
+            await response.write(f"data: {json.dumps(delta)}\n\n".encode())
+            await asyncio.sleep(self.token_interval)
+        await response.write(b"data: [DONE]\n\n")
+        return response
+
+
+def _serve(mock: MockGroq, host: str, port: int, ready=None) -> None:
+    async def run():
+        runner = web.AppRunner(mock.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        if ready is not None:
+            ready.put(runner.addresses[0][1])
+        await asyncio.Future()
+
+    asyncio.run(run())
+
+
+class MockGroqServer:
+    """Runs ``MockGroq`` in a child process so it does not count against the measured process."""
+
+    def __init__(self, mock: MockGroq, host: str = "127.0.0.1", port: int = 0):
+        self.mock = mock
+        self.host = host
+        self.port = port
+        self.process: Optional[multiprocessing.Process] = None
+
+    def start(self) -> str:
+        """Start serving and return the base URL"""
+        ready = multiprocessing.Queue()
+        self.process = multiprocessing.Process(
+            target=_serve, args=(self.mock, self.host, self.port, ready), daemon=True
+        )
+        self.process.start()
+        self.port = ready.get(timeout=30)
+        return f"http://{self.host}:{self.port}"
+
+    def stop(self) -> None:
+        if self.process is not None:
+            self.process.terminate()
+            self.process.join()
+            self.process = None
+
+    def environment(self) -> dict:
+        """Config environment variables pointing the services at this server"""
+        base_url = f"http://{self.host}:{self.port}"
+        return {
+            "GROQ_API_KEY": "mock",
+            "GROQ_TRANSCRIPTION_ENDPOINT": base_url + TRANSCRIPTION_PATH,
+            "GROQ_TRANSLATION_ENDPOINT": base_url + CHAT_COMPLETIONS_PATH,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.2, help="base response time in seconds")
+    parser.add_argument("--jitter", type=float, default=0.05, help="extra uniform random delay in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests that fail")
+    parser.add_argument("--token-interval", type=float, default=0.01, help="delay between streamed words")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="requests per second before 429s, 0 for none")
+    args = parser.parse_args()
+
+    mock = MockGroq(args.latency, args.jitter, args.error_rate, args.token_interval,
+                    requests_per_second=args.rate_limit)
+    print(f"Mock Groq API on http://{args.host}:{args.port}{TRANSCRIPTION_PATH} and {CHAT_COMPLETIONS_PATH}")
+    _serve(mock, args.host, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Throughput and 429s against a rate-limited mock API, with and without the client-side limiter.
+
+Live and batch callers translate concurrently against ``mock_groq`` limited
+to ``--quota`` requests per second: without a client-side limit, then with
+``RATE_LIMIT_TRANSLATION_RPM`` set to that quota at each ``--utilization``.
+The client bucket holds one second of quota, like the mock's. Reports
+completed translations per second, 429 responses, failed translations and
+the latency per priority.
+
+    python -m benchmarks.rate_limit --quota 5 --threads 8 --requests 15 --utilization 1 0.95 0.9
+"""
+import argparse
+import os
+import threading
+import time
+from typing import Dict, List
+
+import numpy as np
+
+from benchmarks.mock_groq import MockGroq, MockGroqServer
+
+
+def run_once(args, client_rpm: float, utilization: float) -> Dict[str, float]:
+    os.environ["RATE_LIMIT_TRANSLATION_RPM"] = str(client_rpm)
+    os.environ["RATE_LIMIT_UTILIZATION"] = str(utilization)
+
+    from com.mhire.config.config import Config
+    from com.mhire.services.rate_limiter import Priority
+    from com.mhire.services.translation import Translation
+    from com.mhire.utils.metrics import metrics
+
+    metrics.reset()
+    config = Config()
+    latencies: Dict[Priority, List[float]] = {Priority.LIVE_FINAL: [], Priority.BATCH: []}
+    failures = [0]
+    lock = threading.Lock()
+
+    def worker(index: int) -> None:
+        priority = Priority.LIVE_FINAL if index % 2 == 0 else Priority.BATCH
+        translation = Translation(config, priority=priority)
+        for i in range(args.requests):
+            started = time.perf_counter()
+            result = translation.translate_text(f"sentence {i} of caller {index}", "en", "de")
+            with lock:
+                latencies[priority].append(time.perf_counter() - started)
+                if result.startswith("["):
+                    failures[0] += 1
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(args.threads)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    counters = metrics.snapshot()["counters"]
+    total = args.threads * args.requests
+    return {
+        "completed_per_second": (total - failures[0]) / elapsed,
+        "rate_limited_responses": counters.get("rate_limited_responses", 0),
+        "failed": failures[0],
+        "live_mean": float(np.mean(latencies[Priority.LIVE_FINAL])),
+        "batch_mean": float(np.mean(latencies[Priority.BATCH])),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--quota", type=float, default=5.0, help="mock API requests per second")
+    parser.add_argument("--threads", type=int, default=8, help="concurrent callers, alternately live and batch")
+    parser.add_argument("--requests", type=int, default=15, help="translations per caller")
+    parser.add_argument("--latency", type=float, default=0.1, help="mock API base latency in seconds")
+    parser.add_argument("--utilization", type=float, nargs="+", default=[1.0, 0.95, 0.9],
+                        help="RATE_LIMIT_UTILIZATION values to try")
+    args = parser.parse_args()
+
+    server = MockGroqServer(MockGroq(latency=args.latency, jitter=args.latency / 2, requests_per_second=args.quota))
+    server.start()
+    os.environ.update(server.environment())
+    os.environ["TRANSLATION_CACHE"] = "none"
+    os.environ["TRANSLATION_CONTEXT_PAIRS"] = "0"
+    os.environ["RATE_LIMIT_BURST_SECONDS"] = "1"
+
+    from com.mhire.utils.metrics import metrics
+
+    metrics.enabled = True
+    try:
+        print(f"{args.threads} callers x {args.requests} translations, API quota {args.quota:g} requests/s")
+        print(f"{'client limit':>14} {'done/s':>7} {'429s':>5} {'failed':>6} {'live (s)':>9} {'batch (s)':>9}")
+        runs = [(0.0, 1.0)] + [(args.quota * 60, utilization) for utilization in args.utilization]
+        for client_rpm, utilization in runs:
+            results = run_once(args, client_rpm, utilization)
+            label = f"{utilization:.0%} of quota" if client_rpm else "none"
+            print(f"{label:>14} {results['completed_per_second']:>7.2f} {results['rate_limited_responses']:>5.0f} "
+                  f"{results['failed']:>6} {results['live_mean']:>9.2f} {results['batch_mean']:>9.2f}")
+            # Let the mock's quota refill before the next run
+            time.sleep(2)
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
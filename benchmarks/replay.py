@@ -0,0 +1,97 @@
+"""Replays recorded audio through the real capture, segmentation and VAD path.
+
+``ReplayTranscription`` takes the place of the microphone: a feeder thread
+calls ``audio_callback`` with fixed-size blocks at real-time pace, or
+``speed`` times faster. It remembers when each block was written, so the
+moment an utterance's speech ended can be recovered for latency
+measurements.
+"""
+import threading
+import time
+from bisect import bisect_left
+from typing import List, Optional
+
+import numpy as np
+
+from com.mhire.config.config import Config
+from com.mhire.services.batch import find_audio_files
+from com.mhire.services.transcription import Transcription
+from com.mhire.utils.audio import load_audio
+
+# The microphone delivers about 10 callbacks per second
+BLOCK_SIZE = 1600
+
+
+def load_fixtures(paths: List[str], sample_rate: int = 16000) -> List[np.ndarray]:
+    """Load audio files, and those inside directories, at the pipeline's sample rate"""
+    return [load_audio(path, sample_rate) for path in find_audio_files(paths)]
+
+
+def synthetic_speech(seconds: float, sample_rate: int = 16000, seed: int = 0) -> np.ndarray:
+    """Speech-like bursts of 1-4 s separated by 0.8-1.5 s of near silence."""
+    rng = np.random.default_rng(seed)
+    parts = []
+    total = 0
+    while total < seconds * sample_rate:
+        burst = int(rng.uniform(1, 4) * sample_rate)
+        t = np.arange(burst) / sample_rate
+        envelope = 0.5 * (1 + np.sin(2 * np.pi * 4 * t)) ** 2 / 4
+        pitch = rng.uniform(110, 220)
+        voice = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 8))
+        gap = int(rng.uniform(0.8, 1.5) * sample_rate)
+        parts += [0.3 * envelope * voice, np.zeros(gap)]
+        total += burst + gap
+    audio = np.concatenate(parts) + 0.002 * rng.standard_normal(total)
+    return np.clip(audio, -1, 1).astype(np.float32)
+
+
+class ReplayTranscription(Transcription):
+    """Transcription whose input stream is an audio array instead of a sound device"""
+
+    def __init__(self, config: Config, audio: np.ndarray, speed: float = 1.0, tail_silence: float = 2.0):
+        super().__init__(config)
+        # Trailing silence lets the last utterance end the way it would live
+        self.replay_audio = np.concatenate([audio, np.zeros(int(tail_silence * self.sample_rate), np.float32)])
+        self.speed = speed
+        self.feeder: Optional[threading.Thread] = None
+        self.finished = threading.Event()
+
+        # Sample count after each block and when it was written
+        self.feed_positions: List[int] = []
+        self.feed_times: List[float] = []
+        # When the speech of each utterance handed to the pipeline ended
+        self.utterance_end_times: List[float] = []
+
+    def start_stream(self) -> None:
+        self.running = True
+        self.reset_buffers()
+        self.finished.clear()
+        self.feeder = threading.Thread(target=self._feed, name="replay-feeder", daemon=True)
+        self.feeder.start()
+
+    def stop_stream(self) -> None:
+        self.running = False
+
+    def _feed(self) -> None:
+        start = time.perf_counter()
+        for offset in range(0, len(self.replay_audio), BLOCK_SIZE):
+            if not self.running:
+                break
+            delay = start + offset / self.sample_rate / self.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            block = self.replay_audio[offset:offset + BLOCK_SIZE]
+            self.audio_callback(block[:, None], len(block), None, None)
+            self.feed_positions.append(self.audio_buffer.write_pos)
+            self.feed_times.append(time.perf_counter())
+        self.finished.set()
+
+    def get_next_segment(self, timeout: float = 0.1):
+        segment = super().get_next_segment(timeout)
+        if segment is not None and segment[1]:
+            audio_chunk, speech_timestamps = segment
+            # The new segment starts where the returned one ends
+            speech_end = self.segment_start - len(audio_chunk) + speech_timestamps[-1]["end"]
+            block = min(bisect_left(self.feed_positions, speech_end), len(self.feed_times) - 1)
+            self.utterance_end_times.append(self.feed_times[block])
+        return segment
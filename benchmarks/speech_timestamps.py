@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Checks parity and compares speed of the two get_speech_timestamps backends.
+
+Randomized speech probability sequences are post-processed by the reference
+loop (speech_probs_to_timestamps) and the vectorized backend
+(speech_probs_to_timestamps_array); any mismatch aborts the run.
+
+    python -m benchmarks.speech_timestamps --cases 2000 --hours 1
+"""
+import argparse
+import time
+
+import numpy as np
+
+from com.mhire.services.vad import (
+    VadOptions,
+    speech_probs_to_timestamps,
+    speech_probs_to_timestamps_array,
+)
+
+WINDOW_SIZE_SAMPLES = 512
+SAMPLING_RATE = 16000
+
+
+def random_speech_probs(rng: np.random.Generator, num_windows: int, switch_rate: float) -> np.ndarray:
+    """Noisy alternating speech/silence probabilities, shaped like the model output."""
+    speaking = np.cumsum(rng.random(num_windows) < switch_rate) % 2
+    probs = np.clip(speaking * 0.8 + rng.normal(0, 0.25, num_windows) + 0.1, 0, 1)
+    return probs.astype(np.float32).reshape(-1, 1)
+
+
+def random_vad_options(rng: np.random.Generator) -> VadOptions:
+    return VadOptions(
+        threshold=float(rng.choice([0.3, 0.5, 0.6])),
+        neg_threshold=None if rng.random() < 0.7 else float(rng.random() * 0.4),
+        min_speech_duration_ms=int(rng.choice([0, 100, 250, 1000])),
+        max_speech_duration_s=float(rng.choice([np.inf, 0.5, 2.0, 10.0])),
+        min_silence_duration_ms=int(rng.choice([0, 100, 300, 700, 2000])),
+        speech_pad_ms=int(rng.choice([0, 30, 200, 400])),
+    )
+
+
+def as_array(speeches) -> np.ndarray:
+    return np.array(
+        [[speech["start"], speech["end"]] for speech in speeches], dtype=np.int64
+    ).reshape(-1, 2)
+
+
+def check_parity(rng: np.random.Generator, num_cases: int) -> None:
+    for case in range(num_cases):
+        num_windows = int(rng.integers(1, 1500))
+        speech_probs = random_speech_probs(rng, num_windows, float(rng.choice([0.01, 0.05, 0.5])))
+        vad_options = random_vad_options(rng)
+        audio_length = num_windows * WINDOW_SIZE_SAMPLES - int(rng.integers(1, WINDOW_SIZE_SAMPLES))
+
+        expected = as_array(speech_probs_to_timestamps(speech_probs, audio_length, vad_options))
+        actual = speech_probs_to_timestamps_array(speech_probs, audio_length, vad_options)
+        if not np.array_equal(expected, actual):
+            raise SystemExit(
+                f"Mismatch in case {case} with {vad_options}:\n"
+                f"  loop:       {expected.tolist()}\n  vectorized: {actual.tolist()}"
+            )
+    print(f"parity: {num_cases} randomized cases identical")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cases", type=int, default=2000)
+    parser.add_argument("--hours", type=float, default=1.0, help="length of the timed recording")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    check_parity(rng, args.cases)
+
+    num_windows = int(args.hours * 3600 * SAMPLING_RATE) // WINDOW_SIZE_SAMPLES
+    speech_probs = random_speech_probs(rng, num_windows, 0.02)
+    audio_length = num_windows * WINDOW_SIZE_SAMPLES
+    for max_speech_duration_s in (float("inf"), 10.0):
+        vad_options = VadOptions(min_silence_duration_ms=300, max_speech_duration_s=max_speech_duration_s)
+
+        start = time.perf_counter()
+        speech_probs_to_timestamps(speech_probs, audio_length, vad_options)
+        loop_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        speech_probs_to_timestamps_array(speech_probs, audio_length, vad_options)
+        vectorized_time = time.perf_counter() - start
+
+        print(
+            f"max_speech={max_speech_duration_s:>4}s  loop {loop_time * 1000:8.1f} ms  "
+            f"vectorized {vectorized_time * 1000:7.1f} ms  ({loop_time / vectorized_time:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
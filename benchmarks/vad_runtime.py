@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Picks VAD session pool and ONNX Runtime thread settings for this machine.
+
+Runs ``--streams`` concurrent live streams (one thread each, like server
+clients) through a VadSessionPool for every combination of pool size and
+intra-op threads up to the core count, and reports windows/sec and the p95
+latency of one block. The best configuration is the one with the highest
+throughput whose p95 stays below the block duration, so every stream keeps
+up with real time.
+
+    python -m benchmarks.vad_runtime --streams 8 --seconds 4
+"""
+import argparse
+import os
+import threading
+import time
+
+import numpy as np
+
+from com.mhire.services.vad import SileroVADModel, VadRuntimeOptions, VadSessionPool
+
+WINDOW_SIZE_SAMPLES = 512
+
+
+def bench(runtime_options: VadRuntimeOptions, audio: np.ndarray, block_samples: int):
+    pool = VadSessionPool(runtime_options)
+    latencies = [[] for _ in range(audio.shape[0])]
+
+    def run_stream(i: int) -> None:
+        state, context = SileroVADModel.get_initial_states(batch_size=1)
+        for offset in range(0, audio.shape[1], block_samples):
+            start = time.perf_counter()
+            with pool.checkout() as model:
+                _, state, context = model.stream(audio[i : i + 1, offset : offset + block_samples], state, context)
+            latencies[i].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=run_stream, args=(i,)) for i in range(audio.shape[0])]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    num_windows = audio.size // WINDOW_SIZE_SAMPLES
+    return num_windows / elapsed, float(np.percentile(np.concatenate(latencies), 95))
+
+
+def powers_of_two(limit: int):
+    value = 1
+    while value <= limit:
+        yield value
+        value *= 2
+
+
+def main():
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, default=cores, help="concurrent streams")
+    parser.add_argument("--seconds", type=float, default=4.0, help="audio per stream")
+    parser.add_argument("--block-ms", type=int, default=96, help="audio delivered per call")
+    parser.add_argument("--cores", type=int, default=cores, help="upper bound for pool size x threads")
+    parser.add_argument("--graph-optimization", nargs="+", default=["all"],
+                        choices=["disabled", "basic", "extended", "all"])
+    parser.add_argument("--arena", action="store_true", help="also try with the CPU memory arena enabled")
+    args = parser.parse_args()
+
+    sampling_rate = 16000
+    block_samples = max(1, sampling_rate * args.block_ms // 1000 // WINDOW_SIZE_SAMPLES) * WINDOW_SIZE_SAMPLES
+    num_samples = int(sampling_rate * args.seconds) // block_samples * block_samples
+    audio = (0.1 * np.random.default_rng(0).standard_normal((args.streams, num_samples))).astype(np.float32)
+    block_seconds = block_samples / sampling_rate
+
+    print(f"{args.streams} streams, {args.cores} cores, {block_seconds * 1000:.0f} ms blocks")
+    print(f"{'pool':>5} {'threads':>8} {'arena':>6} {'graph':>9} {'windows/s':>10} {'p95 ms':>8}")
+    best = None
+    for graph_optimization in args.graph_optimization:
+        for arena in ([False, True] if args.arena else [False]):
+            for pool_size in powers_of_two(min(args.cores, args.streams)):
+                for threads in powers_of_two(args.cores // pool_size):
+                    runtime_options = VadRuntimeOptions(
+                        intra_op_num_threads=threads,
+                        enable_cpu_mem_arena=arena,
+                        graph_optimization=graph_optimization,
+                        pool_size=pool_size,
+                    )
+                    throughput, p95 = bench(runtime_options, audio, block_samples)
+                    print(f"{pool_size:>5} {threads:>8} {str(arena):>6} {graph_optimization:>9} "
+                          f"{throughput:>10.0f} {p95 * 1000:>8.2f}")
+                    if p95 < block_seconds and (best is None or throughput > best[0]):
+                        best = (throughput, runtime_options)
+
+    if best is None:
+        print("\nNo configuration kept up with real time")
+        return
+    runtime_options = best[1]
+    print("\nBest configuration:")
+    print(f"VAD_POOL_SIZE={runtime_options.pool_size}")
+    print(f"VAD_INTRA_OP_THREADS={runtime_options.intra_op_num_threads}")
+    print(f"VAD_CPU_MEM_ARENA={str(runtime_options.enable_cpu_mem_arena).lower()}")
+    print(f"VAD_GRAPH_OPTIMIZATION={runtime_options.graph_optimization}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Measures VAD throughput (windows/sec) as the number of concurrent streams grows.
+
+Compares one SileroVADModel.stream call per stream against a single
+BatchedVadScheduler step shared by all streams.
+
+    python -m benchmarks.vad_streams --streams 1 2 4 8 16 32 --seconds 2
+"""
+import argparse
+import time
+
+import numpy as np
+
+from com.mhire.services.vad import BatchedVadScheduler, get_vad_model
+
+WINDOW_SIZE_SAMPLES = 512
+
+
+def bench_independent(model, audio: np.ndarray, num_streams: int, block_samples: int) -> float:
+    states = [model.get_initial_states(1) for _ in range(num_streams)]
+    start = time.perf_counter()
+    for offset in range(0, audio.shape[1], block_samples):
+        for i in range(num_streams):
+            state, context = states[i]
+            _, state, context = model.stream(
+                audio[i : i + 1, offset : offset + block_samples], state, context
+            )
+            states[i] = (state, context)
+    return time.perf_counter() - start
+
+
+def bench_scheduler(model, audio: np.ndarray, num_streams: int, block_samples: int) -> float:
+    scheduler = BatchedVadScheduler(max_streams=num_streams, model=model)
+    streams = [scheduler.add_stream() for _ in range(num_streams)]
+    start = time.perf_counter()
+    for offset in range(0, audio.shape[1], block_samples):
+        for i, stream in enumerate(streams):
+            scheduler.feed(stream, audio[i, offset : offset + block_samples])
+        scheduler.step()
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--streams", type=int, nargs="+", default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument("--seconds", type=float, default=2.0, help="audio per stream")
+    parser.add_argument("--block-ms", type=int, default=96, help="audio delivered per step")
+    args = parser.parse_args()
+
+    model = get_vad_model()
+    sampling_rate = 16000
+    block_samples = max(1, sampling_rate * args.block_ms // 1000 // WINDOW_SIZE_SAMPLES) * WINDOW_SIZE_SAMPLES
+    num_samples = int(sampling_rate * args.seconds) // block_samples * block_samples
+    rng = np.random.default_rng(0)
+
+    print(f"{'streams':>8} {'independent w/s':>16} {'scheduler w/s':>14} {'speedup':>8}")
+    for num_streams in args.streams:
+        audio = (0.1 * rng.standard_normal((num_streams, num_samples))).astype(np.float32)
+        num_windows = num_streams * num_samples // WINDOW_SIZE_SAMPLES
+        independent = num_windows / bench_independent(model, audio, num_streams, block_samples)
+        scheduled = num_windows / bench_scheduler(model, audio, num_streams, block_samples)
+        print(f"{num_streams:>8} {independent:>16.0f} {scheduled:>14.0f} {scheduled / independent:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,111 @@ class Config:
         self.GROQ_TRANSCRIPTION_ENDPOINT = os.getenv("GROQ_TRANSCRIPTION_ENDPOINT")
         self.GROQ_TRANSLATION_ENDPOINT = os.getenv("GROQ_TRANSLATION_ENDPOINT")
 
+        # Upload encoding for transcription requests: wav, flac or opus
+        # (flac and opus need the optional soundfile package)
+        self.AUDIO_UPLOAD_FORMAT = os.getenv("AUDIO_UPLOAD_FORMAT", "wav")
+
+        # HTTP connection pool, timeouts (seconds) and retry policy for API calls
+        self.HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+        self.HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+        self.HTTP_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+        self.HTTP_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "30"))
+        self.HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))
+        self.HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))
+        self.HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "8"))
+        self.HTTP_MAX_RETRY_AFTER = float(os.getenv("HTTP_MAX_RETRY_AFTER", "30"))
+
+        # Client-side rate limits per endpoint and model, 0 for none: requests per minute and
+        # audio seconds per hour for transcription, requests and tokens per minute for
+        # translation; RATE_LIMIT_UTILIZATION of them is used, leaving headroom for
+        # timing jitter, and up to RATE_LIMIT_BURST_SECONDS of quota at once. Limits and
+        # priorities are per process unless RATE_LIMIT_SHARED_PATH names an SQLite file
+        # that all processes using the same API key share
+        self.RATE_LIMIT_ASR_RPM = float(os.getenv("RATE_LIMIT_ASR_RPM", "0"))
+        self.RATE_LIMIT_ASR_AUDIO_SECONDS_PER_HOUR = float(os.getenv("RATE_LIMIT_ASR_AUDIO_SECONDS_PER_HOUR", "0"))
+        self.RATE_LIMIT_TRANSLATION_RPM = float(os.getenv("RATE_LIMIT_TRANSLATION_RPM", "0"))
+        self.RATE_LIMIT_TRANSLATION_TPM = float(os.getenv("RATE_LIMIT_TRANSLATION_TPM", "0"))
+        self.RATE_LIMIT_UTILIZATION = float(os.getenv("RATE_LIMIT_UTILIZATION", "0.95"))
+        self.RATE_LIMIT_BURST_SECONDS = float(os.getenv("RATE_LIMIT_BURST_SECONDS", "10"))
+        self.RATE_LIMIT_SHARED_PATH = os.getenv("RATE_LIMIT_SHARED_PATH", "")
+
+        # Pipeline stage concurrency and queue bounds
+        self.PIPELINE_QUEUE_SIZE = int(os.getenv("PIPELINE_QUEUE_SIZE", "8"))
+        self.PIPELINE_ASR_WORKERS = int(os.getenv("PIPELINE_ASR_WORKERS", "2"))
+        self.PIPELINE_TRANSLATION_WORKERS = int(os.getenv("PIPELINE_TRANSLATION_WORKERS", "2"))
+
+        # Translation cache: memory, sqlite or none; TTL in seconds
+        self.TRANSLATION_CACHE = os.getenv("TRANSLATION_CACHE", "memory")
+        self.TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "1024"))
+        self.TRANSLATION_CACHE_TTL = float(os.getenv("TRANSLATION_CACHE_TTL", "3600"))
+        self.TRANSLATION_CACHE_PATH = os.getenv("TRANSLATION_CACHE_PATH", "translation_cache.sqlite3")
+
+        # Show translations token by token as they are generated
+        self.TRANSLATION_STREAMING = os.getenv("TRANSLATION_STREAMING", "true").lower() == "true"
+
+        # Send the last TRANSLATION_CONTEXT_PAIRS source/translation pairs of a session
+        # (up to TRANSLATION_CONTEXT_MAX_TOKENS estimated tokens) with each translation; 0 to disable
+        self.TRANSLATION_CONTEXT_PAIRS = int(os.getenv("TRANSLATION_CONTEXT_PAIRS", "3"))
+        self.TRANSLATION_CONTEXT_MAX_TOKENS = int(os.getenv("TRANSLATION_CONTEXT_MAX_TOKENS", "300"))
+
+        # Pack short translation requests of the same language pair into one call,
+        # collected for up to the window or until the token/segment budget is reached
+        self.TRANSLATION_BATCHING = os.getenv("TRANSLATION_BATCHING", "false").lower() == "true"
+        self.TRANSLATION_BATCH_WINDOW_MS = float(os.getenv("TRANSLATION_BATCH_WINDOW_MS", "150"))
+        self.TRANSLATION_BATCH_MAX_TOKENS = int(os.getenv("TRANSLATION_BATCH_MAX_TOKENS", "512"))
+        self.TRANSLATION_BATCH_MAX_SEGMENTS = int(os.getenv("TRANSLATION_BATCH_MAX_SEGMENTS", "8"))
+
+        # Source language of each segment when "Auto" is selected: asr (language reported
+        # by the ASR, then the text), text (local detector only) or off (assume English)
+        self.SOURCE_LANGUAGE_DETECTION = os.getenv("SOURCE_LANGUAGE_DETECTION", "asr")
+
+        # WebSocket server limits per client connection
+        self.SERVER_MAX_PENDING_UTTERANCES = int(os.getenv("SERVER_MAX_PENDING_UTTERANCES", "4"))
+        self.SERVER_MAX_OUTGOING_EVENTS = int(os.getenv("SERVER_MAX_OUTGOING_EVENTS", "256"))
+        self.SERVER_MAX_QUEUED_FRAMES = int(os.getenv("SERVER_MAX_QUEUED_FRAMES", "32"))
+        # Clients whose VAD runs batched together; later clients use the VAD session pool
+        self.SERVER_VAD_BATCH_STREAMS = int(os.getenv("SERVER_VAD_BATCH_STREAMS", "64"))
+
+        # Interim results: re-transcribe ongoing speech at most every INTERIM_INTERVAL_MS
+        # and commit words once consecutive hypotheses agree on them
+        self.INTERIM_RESULTS = os.getenv("INTERIM_RESULTS", "false").lower() == "true"
+        self.INTERIM_INTERVAL_MS = float(os.getenv("INTERIM_INTERVAL_MS", "700"))
+        self.INTERIM_MIN_SPEECH_MS = float(os.getenv("INTERIM_MIN_SPEECH_MS", "500"))
+
+        # Adaptive segmentation: end-of-speech silence and maximum segment length move
+        # within these bounds, towards the upper ends as API latency exceeds the
+        # target or the pipeline queues fill up
+        self.ADAPTIVE_FLUSH = os.getenv("ADAPTIVE_FLUSH", "false").lower() == "true"
+        self.FLUSH_TARGET_LATENCY_MS = float(os.getenv("FLUSH_TARGET_LATENCY_MS", "1000"))
+        self.FLUSH_UPDATE_INTERVAL_MS = float(os.getenv("FLUSH_UPDATE_INTERVAL_MS", "500"))
+        self.FLUSH_MIN_SILENCE_MS_MIN = float(os.getenv("FLUSH_MIN_SILENCE_MS_MIN", "400"))
+        self.FLUSH_MIN_SILENCE_MS_MAX = float(os.getenv("FLUSH_MIN_SILENCE_MS_MAX", "1200"))
+        self.FLUSH_MAX_SPEECH_S_MIN = float(os.getenv("FLUSH_MAX_SPEECH_S_MIN", "6"))
+        self.FLUSH_MAX_SPEECH_S_MAX = float(os.getenv("FLUSH_MAX_SPEECH_S_MAX", "20"))
+
+        # GUI rendering: updates are applied in batches every GUI_FRAME_INTERVAL_MS; text
+        # areas keep GUI_SCROLLBACK_LINES lines, older lines are appended to files
+        # derived from GUI_ARCHIVE_PATH when set
+        self.GUI_FRAME_INTERVAL_MS = float(os.getenv("GUI_FRAME_INTERVAL_MS", "50"))
+        self.GUI_SCROLLBACK_LINES = int(os.getenv("GUI_SCROLLBACK_LINES", "2000"))
+        self.GUI_ARCHIVE_PATH = os.getenv("GUI_ARCHIVE_PATH", "")
+
+        # VAD ONNX Runtime sessions: threads per session, CPU memory arena, graph
+        # optimization level (disabled, basic, extended or all), directory caching
+        # optimized models (empty to disable) and number of pooled sessions
+        self.VAD_INTRA_OP_THREADS = int(os.getenv("VAD_INTRA_OP_THREADS", "1"))
+        self.VAD_INTER_OP_THREADS = int(os.getenv("VAD_INTER_OP_THREADS", "1"))
+        self.VAD_CPU_MEM_ARENA = os.getenv("VAD_CPU_MEM_ARENA", "false").lower() == "true"
+        self.VAD_GRAPH_OPTIMIZATION = os.getenv("VAD_GRAPH_OPTIMIZATION", "all")
+        self.VAD_OPTIMIZED_MODEL_DIR = os.getenv("VAD_OPTIMIZED_MODEL_DIR", "")
+        self.VAD_POOL_SIZE = int(os.getenv("VAD_POOL_SIZE", "2"))
+
+        # Per-stage latency metrics: Prometheus text on METRICS_PORT (0 to disable)
+        # and/or a JSON snapshot in the log every METRICS_LOG_INTERVAL seconds
+        self.METRICS_ENABLED = os.getenv("METRICS_ENABLED", "false").lower() == "true"
+        self.METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+        self.METRICS_PORT = int(os.getenv("METRICS_PORT", "9464"))
+        self.METRICS_LOG_INTERVAL = float(os.getenv("METRICS_LOG_INTERVAL", "0"))
 
         # Other config variables can be added here
 
@@ -0,0 +1,168 @@
+import asyncio
+import contextlib
+import functools
+import json
+from typing import Any, AsyncIterator, Dict, Mapping, Optional
+
+import aiohttp
+
+from com.mhire.config.config import Config
+from com.mhire.services.http_client import RetryPolicy
+from com.mhire.services.rate_limiter import EndpointLimiter, RateLimit, RequestCancelled, get_rate_limiter
+from com.mhire.utils.metrics import metrics
+
+
+class HttpResponse:
+    """Fully read response, shaped like the parts of ``requests.Response`` the services use."""
+
+    def __init__(self, status_code: int, text: str, headers: Mapping[str, str]):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class AsyncHttpClient:
+    """aiohttp counterpart of ``HttpClient`` with one shared connection pool.
+
+    Cancelling the task awaiting ``post`` aborts the request and releases its
+    connection, so stopping a session cancels its in-flight calls cleanly.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.retry_policy = RetryPolicy(config)
+        self.rate_limiter = get_rate_limiter(config)
+        self.logger = config.get_logger(__name__)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.session_loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get_session(self) -> aiohttp.ClientSession:
+        """Returns the pooled session, creating it on first use in the running loop."""
+        loop = asyncio.get_running_loop()
+        if self.session is None or self.session.closed or self.session_loop is not loop:
+            self.session_loop = loop
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.config.HTTP_POOL_MAXSIZE),
+                timeout=aiohttp.ClientTimeout(
+                    sock_connect=self.config.HTTP_CONNECT_TIMEOUT,
+                    sock_read=self.config.HTTP_READ_TIMEOUT,
+                ),
+            )
+        return self.session
+
+    async def post(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Any] = None,
+        files: Optional[Dict[str, tuple]] = None,
+        rate_limit: Optional[RateLimit] = None,
+    ) -> HttpResponse:
+        """POST with the same retry policy as ``HttpClient.post``.
+
+        ``files`` takes the ``requests`` multipart format and is rebuilt for
+        every attempt.
+        """
+        session = self.get_session()
+        limiter = self.rate_limiter.limiter(url, rate_limit.model) if rate_limit is not None else None
+        attempt = 0
+        while True:
+            await self._acquire(url, limiter, rate_limit)
+            data = self._form_data(files) if files is not None else None
+            try:
+                async with session.post(url, headers=headers, json=json, data=data) as response:
+                    result = HttpResponse(response.status, await response.text(), response.headers.copy())
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                delay = self.retry_policy.error_delay(attempt)
+                if delay is None:
+                    raise
+                self.logger.warning(f"Request to {url} failed ({e!r}), retrying in {delay:.2f}s")
+            else:
+                self._check_rate_limited(limiter, result.status_code, result.headers, attempt)
+                delay = self.retry_policy.response_delay(result.status_code, result.headers, attempt)
+                if delay is None:
+                    return result
+                self.logger.warning(
+                    f"Request to {url} returned {result.status_code}, retrying in {delay:.2f}s"
+                )
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @contextlib.asynccontextmanager
+    async def stream(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        json: Optional[Any] = None,
+        rate_limit: Optional[RateLimit] = None,
+    ) -> AsyncIterator[aiohttp.ClientResponse]:
+        """POST and hand over the open response so its body can be read as it arrives.
+
+        Retries happen only before the body is read, with the same policy as
+        ``post``.
+        """
+        session = self.get_session()
+        limiter = self.rate_limiter.limiter(url, rate_limit.model) if rate_limit is not None else None
+        attempt = 0
+        while True:
+            await self._acquire(url, limiter, rate_limit)
+            try:
+                response = await session.post(url, headers=headers, json=json)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                delay = self.retry_policy.error_delay(attempt)
+                if delay is None:
+                    raise
+                self.logger.warning(f"Request to {url} failed ({e!r}), retrying in {delay:.2f}s")
+            else:
+                self._check_rate_limited(limiter, response.status, response.headers, attempt)
+                delay = self.retry_policy.response_delay(response.status, response.headers, attempt)
+                if delay is None:
+                    try:
+                        yield response
+                    finally:
+                        response.release()
+                    return
+                self.logger.warning(
+                    f"Request to {url} returned {response.status}, retrying in {delay:.2f}s"
+                )
+                response.release()
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    @staticmethod
+    async def _acquire(url: str, limiter: Optional[EndpointLimiter], rate_limit: Optional[RateLimit]) -> None:
+        if limiter is not None and not await limiter.acquire_async(
+            rate_limit.tokens, rate_limit.priority, rate_limit.cancelled
+        ):
+            raise RequestCancelled(f"Request to {url} cancelled")
+
+    def _check_rate_limited(self, limiter: Optional[EndpointLimiter], status_code: int, headers, attempt: int) -> None:
+        if status_code == 429:
+            metrics.increment("rate_limited_responses")
+            if limiter is not None:
+                limiter.pause(self.retry_policy.rate_limit_pause(headers, attempt))
+
+    @staticmethod
+    def _form_data(files: Dict[str, tuple]) -> aiohttp.FormData:
+        form = aiohttp.FormData()
+        for name, (file_name, value, *content_type) in files.items():
+            if value is None:
+                continue  # requests leaves empty fields out as well
+            if file_name is None:
+                form.add_field(name, value)
+            else:
+                form.add_field(name, value, filename=file_name, content_type=content_type[0] if content_type else None)
+        return form
+
+    async def close(self) -> None:
+        if self.session is not None and not self.session.closed:
+            await self.session.close()
+
+
+@functools.lru_cache
+def get_async_http_client(config: Config) -> AsyncHttpClient:
+    """Returns the async HTTP client shared by all services using this config."""
+    return AsyncHttpClient(config)
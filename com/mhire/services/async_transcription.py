@@ -0,0 +1,81 @@
+import asyncio
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+from com.mhire.config.config import Config
+from com.mhire.services.async_http_client import get_async_http_client
+from com.mhire.services.rate_limiter import Priority, RequestCancelled
+from com.mhire.services.transcription import Transcription
+from com.mhire.utils.metrics import metrics
+
+
+class AsyncTranscription:
+    """asyncio transport for a ``Transcription``.
+
+    Segmentation, request building and response parsing are those of the
+    wrapped ``Transcription``; only the uploads differ: they go through the
+    shared aiohttp pool, so one event loop can drive many sessions without
+    a thread per session.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        transcription: Optional[Transcription] = None,
+        priority: Priority = Priority.LIVE_FINAL,
+    ):
+        self.config = config
+        self.transcription = transcription if transcription is not None else Transcription(config, priority)
+        self.http_client = get_async_http_client(config)
+
+    async def process_audio_chunk(
+        self,
+        audio_chunk: np.ndarray,
+        selected_src_lang: Optional[str] = None,
+        speech_timestamps: Optional[List[dict]] = None,
+        priority: Optional[Priority] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Optional[str]:
+        """Process a chunk of audio and return transcription"""
+        text, _ = await self.process_audio_chunk_with_language(
+            audio_chunk, selected_src_lang, speech_timestamps, detect_language=False,
+            priority=priority, cancelled=cancelled,
+        )
+        return text
+
+    async def process_audio_chunk_with_language(
+        self,
+        audio_chunk: np.ndarray,
+        selected_src_lang: Optional[str] = None,
+        speech_timestamps: Optional[List[dict]] = None,
+        detect_language: bool = True,
+        priority: Optional[Priority] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Process a chunk of audio and return its transcription and the language the ASR detected"""
+        transcription = self.transcription
+        if speech_timestamps is None:
+            # Full VAD pass over the chunk, keep it off the event loop
+            processed_audio = await asyncio.to_thread(transcription.extract_speech, audio_chunk)
+        else:
+            processed_audio = transcription.extract_speech(audio_chunk, speech_timestamps)
+        if processed_audio is None:
+            return None, None
+
+        try:
+            files = transcription.prepare_upload(processed_audio, selected_src_lang, detect_language)
+            with metrics.span("asr_request"):
+                response = await self.http_client.post(
+                    self.config.GROQ_TRANSCRIPTION_ENDPOINT,
+                    headers=transcription.headers,
+                    files=files,
+                    rate_limit=transcription.rate_limit(processed_audio, priority, cancelled)
+                )
+            return transcription.parse_response_with_language(response)
+
+        except RequestCancelled:
+            return None, None
+        except Exception as e:
+            print(f"Error during transcription: {e}")
+            return None, None
@@ -0,0 +1,125 @@
+import asyncio
+from typing import AsyncIterator, Dict, Optional
+
+from com.mhire.config.config import Config
+from com.mhire.services.async_http_client import get_async_http_client
+from com.mhire.services.rate_limiter import Priority
+from com.mhire.services.translation import CompletionStream, Translation, TranslationError
+from com.mhire.services.translation_cache import SQLiteTranslationCache, TranslationCache
+from com.mhire.services.translation_context import TranslationContext
+from com.mhire.utils.metrics import metrics
+
+
+class AsyncTranslation:
+    """asyncio transport for a ``Translation`` using the shared aiohttp pool.
+
+    Prompts, caching, context history and response parsing are those of
+    the wrapped ``Translation``; only the requests differ. Lookups and writes
+    of the on-disk cache run in a worker thread, off the event loop.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        cache: Optional[TranslationCache] = None,
+        priority: Priority = Priority.LIVE_FINAL,
+        translation: Optional[Translation] = None,
+    ):
+        self.config = config
+        self.translation = translation if translation is not None else Translation(config, cache, priority)
+        self.http_client = get_async_http_client(config)
+        self.cache_blocks = isinstance(self.translation.cache, SQLiteTranslationCache)
+
+    async def translate_text(
+        self,
+        text: str,
+        src_lang: str,
+        tgt_lang: str,
+        context: Optional[TranslationContext] = None,
+        raise_errors: bool = False,
+    ) -> str:
+        """Translate text using Groq's LLaMA API
+
+        Failures come back as bracketed error text, or are raised with
+        ``raise_errors``, an error status as ``TranslationError``.
+        """
+        translation = self.translation
+        result = translation.immediate_result(text, src_lang, tgt_lang)
+        if result is not None:
+            return result
+
+        try:
+            cache_key, cached = await self._run_cached(translation.get_cached, text, src_lang, tgt_lang, context)
+            if cached is not None:
+                return cached
+
+            pending = translation.prepare(text, src_lang, tgt_lang, cache_key, context)
+            with metrics.span("translation_request"):
+                completion = await self.http_client.post(
+                    self.config.GROQ_TRANSLATION_ENDPOINT,
+                    headers=translation.headers,
+                    json=pending.request,
+                    rate_limit=translation.rate_limit(pending.request)
+                )
+            if raise_errors and completion.status_code != 200:
+                print(f"Translation error: {completion.text}")
+                raise TranslationError(completion.status_code)
+            translated_text = translation.parse_completion(completion)
+            await self._run_cached(translation.record, pending, completion.status_code == 200, translated_text)
+            return translated_text
+
+        except Exception as e:
+            if raise_errors:
+                raise
+            return translation.error_result(e)
+
+    async def translate_text_stream(
+        self, text: str, src_lang: str, tgt_lang: str, context: Optional[TranslationContext] = None
+    ) -> AsyncIterator[str]:
+        """Translate text and yield the cleaned translation as it is generated"""
+        translation = self.translation
+        result = translation.immediate_result(text, src_lang, tgt_lang)
+        if result is not None:
+            if result:
+                yield result
+            return
+
+        try:
+            cache_key, cached = await self._run_cached(translation.get_cached, text, src_lang, tgt_lang, context)
+            if cached is not None:
+                yield cached
+                return
+
+            pending = translation.prepare(text, src_lang, tgt_lang, cache_key, context, stream=True)
+            stream = CompletionStream()
+            async with self.http_client.stream(
+                self.config.GROQ_TRANSLATION_ENDPOINT,
+                headers=translation.headers,
+                json=pending.request,
+                rate_limit=translation.rate_limit(pending.request)
+            ) as completion:
+                if completion.status != 200:
+                    print(f"Translation error: {await completion.text()}")
+                    yield f"[Translation error: {completion.status}]"
+                    return
+
+                async for line in completion.content:
+                    piece = stream.feed_line(line.decode("utf-8").strip())
+                    if piece:
+                        yield piece
+                piece = stream.finish()
+                if piece:
+                    yield piece
+                await self._run_cached(translation.record, pending, True, stream.text)
+
+        except Exception as e:
+            yield translation.error_result(e)
+
+    def get_supported_languages(self) -> Dict[str, Optional[str]]:
+        return self.translation.get_supported_languages()
+
+    async def _run_cached(self, function, *args):
+        """Call a method that touches the cache, in a worker thread if the cache blocks"""
+        if self.cache_blocks:
+            return await asyncio.to_thread(function, *args)
+        return function(*args)
@@ -0,0 +1,207 @@
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from com.mhire.config.config import Config
+from com.mhire.services.language_detection import LanguageDetector
+from com.mhire.services.rate_limiter import Priority
+from com.mhire.services.transcription import Transcription
+from com.mhire.services.translation import Translation
+from com.mhire.services.vad import (
+    SpeechTimestampsMap, collect_chunks, configure_vad, get_speech_timestamps, merge_segments
+)
+from com.mhire.utils.audio import load_audio
+
+AUDIO_EXTENSIONS = (".wav", ".flac")
+
+
+@dataclass
+class TranscriptSegment:
+    """A transcribed piece of a recording, timed against the original audio."""
+
+    start: float
+    end: float
+    text: str
+    translation: Optional[str] = None
+
+
+@dataclass
+class FileResult:
+    path: str
+    duration: float
+    segments: List[TranscriptSegment]
+    output_path: Optional[str] = None
+
+
+def find_audio_files(paths: Iterable[str]) -> List[str]:
+    """Expand directories into the WAV/FLAC files they contain."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(
+                    os.path.join(root, name) for name in sorted(names)
+                    if name.lower().endswith(AUDIO_EXTENSIONS)
+                )
+        else:
+            files.append(path)
+    return files
+
+
+def format_timestamp(seconds: float) -> str:
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{int(hours):02d}:{int(minutes):02d}:{seconds:05.2f}"
+
+
+def transcribe_file(
+    path: str,
+    src_lang: Optional[str],
+    tgt_lang: Optional[str],
+    chunk_seconds: float,
+    chunk_workers: int,
+    rate_limit_path: Optional[str] = None,
+) -> FileResult:
+    """Transcribe (and translate) one recording.
+
+    The whole file goes through the VAD once, merge_segments packs the
+    speech into chunks of up to ``chunk_seconds``, and the chunks are sent
+    to the API concurrently. Runs inside a worker process, which draws on
+    the quota shared through ``rate_limit_path`` when given.
+    """
+    config = Config()
+    configure_vad(config)
+    if rate_limit_path:
+        config.RATE_LIMIT_SHARED_PATH = rate_limit_path
+    # Gives way to live sessions sharing the quota
+    transcription = Transcription(config, Priority.BATCH)
+    translation = Translation(config, priority=Priority.BATCH)
+    language_detector = LanguageDetector(
+        config, supported=[code for code in translation.get_supported_languages().values() if code]
+    )
+    sample_rate = transcription.sample_rate
+
+    audio = load_audio(path, sample_rate)
+    vad_options = replace(transcription.vad_options, max_speech_duration_s=chunk_seconds)
+    speech_timestamps = get_speech_timestamps(audio, vad_options, sampling_rate=sample_rate)
+    chunks = merge_segments(speech_timestamps, vad_options, sampling_rate=sample_rate)
+
+    def process_chunk(chunk: dict) -> List[TranscriptSegment]:
+        return _transcribe_chunk(audio, chunk, transcription, translation, language_detector, src_lang, tgt_lang)
+
+    with ThreadPoolExecutor(max_workers=chunk_workers) as pool:
+        segments = [segment for result in pool.map(process_chunk, chunks) for segment in result]
+
+    return FileResult(path, audio.shape[0] / sample_rate, segments)
+
+
+def _transcribe_chunk(
+    audio: np.ndarray,
+    chunk: dict,
+    transcription: Transcription,
+    translation: Translation,
+    language_detector: LanguageDetector,
+    src_lang: Optional[str],
+    tgt_lang: Optional[str],
+) -> List[TranscriptSegment]:
+    sample_rate = transcription.sample_rate
+    speech_chunks = [{"start": start, "end": end} for start, end in chunk["segments"]]
+    audio_segments, _ = collect_chunks(audio, speech_chunks, sample_rate)
+    speech = np.concatenate(audio_segments)
+
+    result = transcription.transcribe_verbose(speech, src_lang)
+    if not result:
+        return []
+
+    # Segment times are relative to the speech-only upload; map them back
+    timestamps_map = SpeechTimestampsMap(speech_chunks, sample_rate)
+    speech_duration = speech.shape[0] / sample_rate
+    timed_texts = [
+        (segment["start"], segment["end"], segment["text"].strip())
+        for segment in result.get("segments") or []
+    ] or [(0.0, speech_duration, result.get("text", "").strip())]
+
+    segments = []
+    for start, end, text in timed_texts:
+        if not text:
+            continue
+        end = min(end, speech_duration)
+        end_chunk_index = timestamps_map.get_chunk_index(max(start, end - 1 / sample_rate))
+        segment = TranscriptSegment(
+            start=timestamps_map.get_original_time(start),
+            end=timestamps_map.get_original_time(end, end_chunk_index),
+            text=text,
+        )
+        if tgt_lang:
+            # Without --src, the language the ASR reported for the chunk (or the text) decides
+            segment_lang = src_lang or language_detector.detect(text, result.get("language"))
+            segment.translation = translation.translate_text(text, segment_lang, tgt_lang)
+        segments.append(segment)
+    return segments
+
+
+def write_transcript(result: FileResult, output_dir: Optional[str] = None) -> str:
+    """Write a timestamped transcript next to the audio file or into ``output_dir``."""
+    base_name = os.path.splitext(os.path.basename(result.path))[0] + ".transcript.txt"
+    directory = output_dir or os.path.dirname(os.path.abspath(result.path))
+    os.makedirs(directory, exist_ok=True)
+    output_path = os.path.join(directory, base_name)
+
+    with open(output_path, "w", encoding="utf-8") as f:
+        for segment in result.segments:
+            f.write(f"[{format_timestamp(segment.start)} --> {format_timestamp(segment.end)}] {segment.text}\n")
+            if segment.translation:
+                f.write(f"    {segment.translation}\n")
+    return output_path
+
+
+def run_batch(
+    paths: Iterable[str],
+    src_lang: Optional[str] = None,
+    tgt_lang: Optional[str] = None,
+    output_dir: Optional[str] = None,
+    processes: int = 2,
+    chunk_workers: int = 4,
+    chunk_seconds: float = 30.0,
+) -> Tuple[List[FileResult], float]:
+    """Transcribe many recordings, one worker process per file at a time.
+
+    Returns the per-file results and the overall real-time factor
+    (processing time divided by audio duration).
+    """
+    files = find_audio_files(paths)
+    started = time.perf_counter()
+    results = []
+
+    # The worker processes draw on one quota: the configured shared one, which
+    # live sessions may use as well, or else one of this run's own
+    rate_limit_path = Config().RATE_LIMIT_SHARED_PATH
+    with tempfile.TemporaryDirectory() as directory, ProcessPoolExecutor(max_workers=processes) as pool:
+        rate_limit_path = rate_limit_path or os.path.join(directory, "rate_limits.sqlite3")
+        futures = [
+            pool.submit(transcribe_file, path, src_lang, tgt_lang, chunk_seconds, chunk_workers, rate_limit_path)
+            for path in files
+        ]
+        for path, future in zip(files, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Failed to process {path}: {e}")
+                continue
+            result.output_path = write_transcript(result, output_dir)
+            print(f"{path}: {len(result.segments)} segments, {result.duration:.1f}s -> {result.output_path}")
+            results.append(result)
+
+    elapsed = time.perf_counter() - started
+    audio_seconds = sum(result.duration for result in results)
+    realtime_factor = elapsed / audio_seconds if audio_seconds else 0.0
+    print(
+        f"Processed {audio_seconds:.1f}s of audio from {len(results)} files in {elapsed:.1f}s "
+        f"(real-time factor {realtime_factor:.3f}, {1 / realtime_factor if realtime_factor else 0:.1f}x real time)"
+    )
+    return results, realtime_factor
@@ -0,0 +1,101 @@
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+from com.mhire.config.config import Config
+from com.mhire.utils.metrics import metrics
+
+
+@dataclass
+class FlushDecision:
+    """Segmentation settings chosen by ``AdaptiveFlushPolicy`` and why."""
+
+    min_silence_ms: float
+    max_speech_s: float
+    pressure: float
+    backlog: int
+    asr_latency: Optional[float]
+    translation_latency: Optional[float]
+
+
+class AdaptiveFlushPolicy:
+    """Sizes segments from recent API latency and pipeline backlog.
+
+    Pressure is 0 when requests finish within ``FLUSH_TARGET_LATENCY_MS``
+    and nothing waits in the queues, and reaches 1 when the queues are full
+    or latency is twice the target. It is smoothed over successive updates,
+    then mapped linearly onto the configured ranges of the VAD's
+    end-of-speech silence and maximum speech length. Idle pipelines get
+    short segments for latency; backlogged ones get fewer, longer segments
+    for throughput.
+    """
+
+    def __init__(self, config: Config):
+        self.target_latency = config.FLUSH_TARGET_LATENCY_MS / 1000
+        self.min_silence_range = (config.FLUSH_MIN_SILENCE_MS_MIN, config.FLUSH_MIN_SILENCE_MS_MAX)
+        self.max_speech_range = (config.FLUSH_MAX_SPEECH_S_MIN, config.FLUSH_MAX_SPEECH_S_MAX)
+        self.queue_size = config.PIPELINE_QUEUE_SIZE
+        self.update_interval = config.FLUSH_UPDATE_INTERVAL_MS / 1000
+        self.logger = config.get_logger(__name__)
+
+        # Exponentially weighted moving averages
+        self.latency_weight = 0.2
+        self.pressure_weight = 0.3
+        self.asr_latency: Optional[float] = None
+        self.translation_latency: Optional[float] = None
+        self.pressure = 0.0
+        self.lock = threading.Lock()
+
+        self.last_update = 0.0
+        self.decision = self._decide(backlog=0)
+        metrics.register_gauge("flush_pressure", lambda: self.decision.pressure)
+        metrics.register_gauge("flush_min_silence_ms", lambda: self.decision.min_silence_ms)
+        metrics.register_gauge("flush_max_speech_seconds", lambda: self.decision.max_speech_s)
+
+    def observe_asr(self, seconds: float) -> None:
+        with self.lock:
+            self.asr_latency = self._average(self.asr_latency, seconds)
+
+    def observe_translation(self, seconds: float) -> None:
+        with self.lock:
+            self.translation_latency = self._average(self.translation_latency, seconds)
+
+    def update(self, backlog: int) -> Optional[FlushDecision]:
+        """Re-evaluate at most every ``FLUSH_UPDATE_INTERVAL_MS``; returns a new decision when one was made"""
+        now = time.monotonic()
+        if now - self.last_update < self.update_interval:
+            return None
+        self.last_update = now
+
+        previous = self.decision
+        self.decision = self._decide(backlog)
+        if abs(self.decision.min_silence_ms - previous.min_silence_ms) >= 50:
+            self.logger.info(f"Flush policy: {asdict(self.decision)}")
+        return self.decision
+
+    def _decide(self, backlog: int) -> FlushDecision:
+        with self.lock:
+            latencies = [latency for latency in (self.asr_latency, self.translation_latency) if latency is not None]
+            latency_pressure = max(latencies) / self.target_latency - 1 if latencies else 0.0
+            queue_pressure = backlog / self.queue_size
+            target = min(1.0, max(0.0, latency_pressure, queue_pressure))
+            self.pressure += self.pressure_weight * (target - self.pressure)
+
+            return FlushDecision(
+                min_silence_ms=self._interpolate(self.min_silence_range),
+                max_speech_s=self._interpolate(self.max_speech_range),
+                pressure=self.pressure,
+                backlog=backlog,
+                asr_latency=self.asr_latency,
+                translation_latency=self.translation_latency,
+            )
+
+    def _interpolate(self, bounds) -> float:
+        low, high = bounds
+        return low + (high - low) * self.pressure
+
+    def _average(self, average: Optional[float], value: float) -> float:
+        if average is None:
+            return value
+        return average + self.latency_weight * (value - average)
@@ -0,0 +1,136 @@
+import email.utils
+import functools
+import random
+import time
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from com.mhire.config.config import Config
+from com.mhire.services.rate_limiter import RateLimit, RequestCancelled, get_rate_limiter
+from com.mhire.utils.metrics import metrics
+
+# Responses worth retrying: rate limiting and transient server errors
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RetryPolicy:
+    """Bounded retries with jittered exponential backoff and Retry-After support."""
+
+    def __init__(self, config: Config):
+        self.max_retries = config.HTTP_MAX_RETRIES
+        self.backoff_base = config.HTTP_BACKOFF_BASE
+        self.backoff_max = config.HTTP_BACKOFF_MAX
+        self.max_retry_after = config.HTTP_MAX_RETRY_AFTER
+
+    def backoff_delay(self, attempt: int) -> float:
+        """Exponential backoff with full jitter."""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def error_delay(self, attempt: int) -> Optional[float]:
+        """Delay before retrying a connection error or timeout, None to give up."""
+        if attempt >= self.max_retries:
+            return None
+        return self.backoff_delay(attempt)
+
+    def response_delay(self, status_code: int, headers, attempt: int) -> Optional[float]:
+        """Delay before retrying a response, None to return it to the caller."""
+        if status_code not in RETRY_STATUS_CODES or attempt >= self.max_retries:
+            return None
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is None:
+            return self.backoff_delay(attempt)
+        if retry_after > self.max_retry_after:
+            return None
+        return retry_after
+
+    def rate_limit_pause(self, headers, attempt: int) -> float:
+        """How long to hold back every request to an endpoint that answered 429"""
+        retry_after = parse_retry_after(headers.get("Retry-After"))
+        if retry_after is None:
+            return self.backoff_delay(attempt)
+        return min(retry_after, self.max_retry_after)
+
+
+class HttpClient:
+    """Pooled keep-alive HTTP session with timeouts and bounded retries.
+
+    Shared by the transcription and translation services so that every
+    utterance reuses open TLS connections instead of handshaking twice.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.timeout = (config.HTTP_CONNECT_TIMEOUT, config.HTTP_READ_TIMEOUT)
+        self.retry_policy = RetryPolicy(config)
+        self.rate_limiter = get_rate_limiter(config)
+        self.logger = config.get_logger(__name__)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=config.HTTP_POOL_CONNECTIONS,
+            pool_maxsize=config.HTTP_POOL_MAXSIZE,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def post(self, url: str, rate_limit: Optional[RateLimit] = None, **kwargs) -> requests.Response:
+        """POST with retries on connection errors, timeouts, 429 and 5xx.
+
+        The last response is returned once retries are exhausted, so callers
+        keep handling error status codes themselves. With ``rate_limit``,
+        every attempt first waits for quota of the endpoint and model, and
+        raises ``RequestCancelled`` if the request is cancelled meanwhile.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        limiter = self.rate_limiter.limiter(url, rate_limit.model) if rate_limit is not None else None
+        attempt = 0
+        while True:
+            if limiter is not None and not limiter.acquire(rate_limit.tokens, rate_limit.priority, rate_limit.cancelled):
+                raise RequestCancelled(f"Request to {url} cancelled")
+            try:
+                response = self.session.post(url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                delay = self.retry_policy.error_delay(attempt)
+                if delay is None:
+                    raise
+                self.logger.warning(f"Request to {url} failed ({e}), retrying in {delay:.2f}s")
+            else:
+                if response.status_code == 429:
+                    metrics.increment("rate_limited_responses")
+                    if limiter is not None:
+                        limiter.pause(self.retry_policy.rate_limit_pause(response.headers, attempt))
+                delay = self.retry_policy.response_delay(response.status_code, response.headers, attempt)
+                if delay is None:
+                    return response
+                self.logger.warning(
+                    f"Request to {url} returned {response.status_code}, retrying in {delay:.2f}s"
+                )
+                response.close()
+            time.sleep(delay)
+            attempt += 1
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parses a Retry-After header given in seconds or as an HTTP date."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+@functools.lru_cache
+def get_http_client(config: Config) -> HttpClient:
+    """Returns the HTTP client shared by all services using this config."""
+    return HttpClient(config)
@@ -0,0 +1,154 @@
+import queue
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+from com.mhire.config.config import Config
+from com.mhire.services.rate_limiter import Priority
+from com.mhire.services.transcription import Transcription
+
+_PUNCTUATION = re.compile(r"[^\w']+")
+
+
+def normalize_word(word: str) -> str:
+    return _PUNCTUATION.sub("", word.lower())
+
+
+def drop_committed_prefix(text: str, committed_words: List[str]) -> str:
+    """Remove the words of ``text`` that repeat ``committed_words``.
+
+    The final transcription need not begin with exactly the committed
+    interim words: the ASR may have dropped, added or changed some of them.
+    The committed words are aligned (by word-level edit distance, ignoring
+    case and punctuation) against every prefix of ``text``, and the prefix
+    that aligns best is dropped; of equally good prefixes the longest, so
+    a changed last word is not repeated. If the committed words are not
+    found at all, the whole text is kept.
+    """
+    words = text.split()
+    committed = [normalize_word(word) for word in committed_words]
+    if not committed:
+        return ' '.join(words)
+
+    # distances[j]: edit distance between the committed words and words[:j]
+    distances = list(range(len(words) + 1))
+    for i, committed_word in enumerate(committed, start=1):
+        previous, distances = distances, [i]
+        for j, word in enumerate(words, start=1):
+            substitution = previous[j - 1] + (normalize_word(word) != committed_word)
+            distances.append(min(substitution, previous[j] + 1, distances[j - 1] + 1))
+
+    best = min(distances)
+    if best >= len(committed):
+        return ' '.join(words)
+    end = max(j for j, distance in enumerate(distances) if distance == best)
+    return ' '.join(words[end:])
+
+
+class StablePrefixCommitter:
+    """Local agreement over successive hypotheses of the same growing speech.
+
+    A word is committed once two consecutive hypotheses agree on it and on
+    everything before it (ignoring case and punctuation). The last word of a
+    hypothesis is never committed, as the audio may end in the middle of it.
+    Committed words are final: later hypotheses only extend them.
+    """
+
+    def __init__(self):
+        self.committed: List[str] = []
+        self.previous: List[str] = []
+
+    def update(self, hypothesis: str) -> Tuple[str, str]:
+        """Returns the newly committed text and the provisional rest of the hypothesis"""
+        words = hypothesis.split()
+        committed = len(self.committed)
+        agreed = committed
+        limit = min(len(words) - 1, len(self.previous))
+        while agreed < limit and normalize_word(words[agreed]) == normalize_word(self.previous[agreed]):
+            agreed += 1
+
+        newly_committed = words[committed:agreed]
+        self.committed.extend(newly_committed)
+        self.previous = words
+        return ' '.join(newly_committed), ' '.join(words[agreed:])
+
+
+class InterimTranscriber:
+    """Rolling re-transcription of the speech that is still going on.
+
+    While the VAD has speech open, the speech so far is re-sent for
+    transcription at most every ``INTERIM_INTERVAL_MS``, with at most one
+    request in flight, so re-sends cost at most one upload of up to
+    ``max_sentence_duration`` seconds per interval. Results pass through a
+    ``StablePrefixCommitter``. Re-sends wait for rate limit quota behind
+    final segments, and one still waiting when its speech is flushed is
+    dropped: the final transcription supersedes it.
+
+    Must be driven from the thread that calls ``get_next_segment``:
+    ``request`` and ``poll`` read segmentation state, and results are
+    matched to the speech they belong to by a generation number that
+    ``finish_segment`` advances.
+    """
+
+    def __init__(self, config: Config, transcription: Transcription):
+        self.transcription = transcription
+        self.interval = config.INTERIM_INTERVAL_MS / 1000
+        self.min_speech_samples = int(transcription.sample_rate * config.INTERIM_MIN_SPEECH_MS / 1000)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="interim-asr")
+        self.results: "queue.Queue[Tuple[int, Optional[str]]]" = queue.Queue()
+
+        self.generation = 0
+        self.committer = StablePrefixCommitter()
+        self.in_flight = False
+        self.last_request = 0.0
+
+    def request(self, src_lang: Optional[str]) -> None:
+        """Re-send the open speech if the rate limit allows"""
+        now = time.monotonic()
+        if self.in_flight or now - self.last_request < self.interval:
+            return
+        open_speech = self.transcription.peek_open_speech()
+        if open_speech is None:
+            return
+        speech = self.transcription.extract_speech(*open_speech)
+        if speech is None or len(speech) < self.min_speech_samples:
+            return
+
+        self.in_flight = True
+        self.last_request = now
+        self.executor.submit(self._transcribe, self.generation, speech, src_lang)
+
+    def _transcribe(self, generation: int, speech, src_lang: Optional[str]) -> None:
+        text = None
+        try:
+            text = self.transcription.process_audio_chunk(
+                speech, src_lang, [{"start": 0, "end": len(speech)}],
+                priority=Priority.LIVE_INTERIM,
+                cancelled=lambda: generation != self.generation,
+            )
+        finally:
+            self.results.put((generation, text))
+
+    def poll(self) -> List[Tuple[str, str]]:
+        """(newly committed, provisional) text of every result that arrived, oldest first"""
+        updates = []
+        while True:
+            try:
+                generation, text = self.results.get_nowait()
+            except queue.Empty:
+                return updates
+            self.in_flight = False
+            # Results for speech that has been flushed since are stale
+            if generation == self.generation and text:
+                updates.append(self.committer.update(text.strip()))
+
+    def finish_segment(self) -> List[str]:
+        """Start over for the next speech; returns the words committed from the last one"""
+        committed = self.committer.committed
+        self.generation += 1
+        self.committer = StablePrefixCommitter()
+        return committed
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,93 @@
+import functools
+import re
+import threading
+from typing import Iterable, Optional
+
+from com.mhire.config.config import Config
+from com.mhire.utils.metrics import metrics
+
+# verbose_json reports the language by name
+ASR_LANGUAGE_CODES = {"english": "en", "german": "de", "arabic": "ar"}
+
+_WORD = re.compile(r"[^\W\d_]+")
+_ARABIC_LETTER = re.compile(r"[؀-ۿݐ-ݿࢠ-ࣿﭐ-﷿ﹰ-﻿]")
+_GERMAN_LETTER = re.compile(r"[äöüÄÖÜß]")
+
+# Frequent short words that rarely occur in the other language
+_ENGLISH_WORDS = frozenset(
+    "the and is are was were you your have has had this that with for not of to it "
+    "what where when which who will would can could should they them there their "
+    "we our my me he she his her be been do does did from at on by or but if so".split()
+)
+_GERMAN_WORDS = frozenset(
+    "der die das und ist sind war waren ich du sie wir ihr nicht ein eine einen "
+    "mit für auf den dem des zu von im ist es was wie wo wer wann warum haben hat "
+    "hatte sein bin bist wird werden kann können auch noch nur aber oder wenn dass "
+    "schon sehr mein dein sich uns euch hier da jetzt heute bitte danke ja nein".split()
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def detect_text_language(text: str) -> Optional[str]:
+    """Guess en, de or ar from the text alone; None when the text gives no clear signal.
+
+    Arabic is told apart by its script, German from English by umlauts and
+    common function words. Results are cached, as short phrases repeat.
+    """
+    letters = sum(1 for c in text if c.isalpha())
+    if not letters:
+        return None
+    if len(_ARABIC_LETTER.findall(text)) * 2 > letters:
+        return "ar"
+
+    words = [word.lower() for word in _WORD.findall(text)]
+    german = sum(word in _GERMAN_WORDS for word in words) + len(_GERMAN_LETTER.findall(text))
+    english = sum(word in _ENGLISH_WORDS for word in words)
+    if german == english:
+        return None
+    return "de" if german > english else "en"
+
+
+def asr_language_code(language: Optional[str]) -> Optional[str]:
+    """Code of a language as reported by the ASR, by name or code"""
+    if not language:
+        return None
+    language = language.strip().lower()
+    return ASR_LANGUAGE_CODES.get(language, language)
+
+
+class LanguageDetector:
+    """Source language of each segment, for choosing the translation prompt.
+
+    ``SOURCE_LANGUAGE_DETECTION`` selects how: ``asr`` trusts the language
+    the ASR reports in its verbose JSON response and falls back to the text;
+    ``text`` only looks at the transcript; ``off`` keeps ``default``. When
+    neither gives a supported language, the last detected one is kept, so a
+    short "OK" between German sentences stays German.
+    """
+
+    def __init__(self, config: Config, supported: Iterable[str] = ("en", "de", "ar"), default: str = "en"):
+        self.mode = config.SOURCE_LANGUAGE_DETECTION
+        self.supported = frozenset(supported)
+        self.default = default
+        self.last = default
+        self.lock = threading.Lock()
+
+    @property
+    def uses_asr(self) -> bool:
+        """Whether transcription requests should ask for the detected language"""
+        return self.mode == "asr"
+
+    def detect(self, text: Optional[str], asr_language: Optional[str] = None) -> str:
+        if self.mode == "off":
+            return self.default
+
+        with metrics.span("language_detection"):
+            language = asr_language_code(asr_language) if self.uses_asr else None
+            if language not in self.supported and text:
+                language = detect_text_language(' '.join(text.split()))
+
+        with self.lock:
+            if language in self.supported:
+                self.last = language
+            return self.last
@@ -0,0 +1,437 @@
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from com.mhire.config.config import Config
+from com.mhire.services.flush_policy import AdaptiveFlushPolicy
+from com.mhire.services.interim import InterimTranscriber, drop_committed_prefix
+from com.mhire.services.language_detection import LanguageDetector
+from com.mhire.services.transcription import Transcription
+from com.mhire.services.translation import Translation
+from com.mhire.services.translation_batcher import TranslationBatcher
+from com.mhire.services.translation_context import TranslationContext
+from com.mhire.utils.metrics import metrics
+
+
+@dataclass
+class Utterance:
+    """One speech segment on its way through the pipeline."""
+
+    sequence: int
+    audio: Optional[np.ndarray] = None
+    speech_timestamps: Optional[List[dict]] = None
+    # None for "Auto" until the language is detected after transcription
+    src_lang: Optional[str] = None
+    tgt_langs: List[str] = field(default_factory=list)
+    transcription: Optional[str] = None
+    translations: Dict[str, Optional[str]] = field(default_factory=dict)
+    # Target languages whose translation failed; shown, but kept out of the context
+    failed_translations: Set[str] = field(default_factory=set)
+    # Words of this speech already delivered as committed interim text
+    committed_words: List[str] = field(default_factory=list)
+
+
+class SequenceReorderer:
+    """Releases items in sequence order, holding back those that arrive early."""
+
+    def __init__(self, first_sequence: int = 0):
+        self.next_sequence = first_sequence
+        self.pending: Dict[int, object] = {}
+
+    def push(self, sequence: int, item) -> list:
+        """Adds an item and returns every item that is now ready, in order."""
+        self.pending[sequence] = item
+        ready = []
+        while self.next_sequence in self.pending:
+            ready.append(self.pending.pop(self.next_sequence))
+            self.next_sequence += 1
+        return ready
+
+
+class Pipeline:
+    """Capture → segmentation → ASR → translation → sink, one stage per thread pool.
+
+    Stages are connected by bounded queues, so the ASR of utterance N+1
+    overlaps the translation of utterance N. Utterances carry sequence
+    numbers and the sink delivers transcriptions and translations in order,
+    whatever order the workers finish in. The callbacks run on the sink
+    thread; nothing here depends on the GUI.
+
+    Each transcript is translated into every language of ``tgt_langs``
+    concurrently, so an utterance is ready after its slowest translation
+    rather than the sum of them. The translation callbacks are called once
+    per target language with the language code, which lets every language
+    go to its own sink.
+
+    With ``on_translation_delta`` set, translations are streamed: deltas of
+    the utterance currently due are passed on as they arrive, deltas of later
+    utterances are held until every earlier translation has completed. The
+    deltas are a preview; ``on_translation`` then gets the final cleaned
+    translation, even an empty one, to replace them.
+
+    Translations are requested with the recent history of the session kept
+    in a ``TranslationContext`` (unless ``TRANSLATION_CONTEXT_PAIRS`` is 0).
+    The sink adds each translation to it in sequence order, so the history
+    never skips or reorders fragments when workers finish out of order.
+
+    With ``TRANSLATION_BATCHING`` enabled, translation workers hand every
+    queued utterance to a ``TranslationBatcher`` at once instead, and
+    translations arrive whole (no deltas) and without context.
+
+    With ``INTERIM_RESULTS`` enabled, ongoing speech is re-transcribed by an
+    ``InterimTranscriber``. Words it commits become utterances of their own
+    (with a transcription and no audio), so they are translated before the
+    speech ends; the final transcription of the speech then only carries the
+    words after them. The uncommitted rest is passed to ``on_interim`` as
+    provisional text, which each later call replaces.
+
+    Without a ``src_lang`` ("Auto"), the source language of every utterance
+    is detected after transcription by a ``LanguageDetector`` and selects
+    the translation prompt.
+
+    With ``ADAPTIVE_FLUSH`` enabled, an ``AdaptiveFlushPolicy`` fed with the
+    ASR and translation latencies measured here and the depth of the stage
+    queues re-tunes segmentation: shorter segments while the pipeline keeps
+    up, longer ones while it falls behind.
+    """
+
+    def __init__(
+        self,
+        config: Config,
+        transcription: Transcription,
+        translation: Translation,
+        src_lang: Optional[str] = None,
+        tgt_langs: Sequence[str] = ("en",),
+        on_transcription: Optional[Callable[[Utterance], None]] = None,
+        on_translation: Optional[Callable[[Utterance, str], None]] = None,
+        on_translation_delta: Optional[Callable[[Utterance, str, str], None]] = None,
+        on_interim: Optional[Callable[[str], None]] = None,
+    ):
+        self.config = config
+        self.transcription = transcription
+        self.translation = translation
+        self.src_lang = src_lang
+        self.tgt_langs = list(tgt_langs)
+        self.on_transcription = on_transcription
+        self.on_translation = on_translation
+        self.on_translation_delta = on_translation_delta
+        self.on_interim = on_interim
+
+        self.asr_workers = config.PIPELINE_ASR_WORKERS
+        self.translation_workers = config.PIPELINE_TRANSLATION_WORKERS
+        self.asr_queue = queue.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+        self.translation_queue = queue.Queue(maxsize=config.PIPELINE_QUEUE_SIZE)
+        self.sink_queue = queue.Queue()
+
+        # Fan-out of each utterance to its target languages
+        self.translation_executor: Optional[ThreadPoolExecutor] = None
+        self.batcher = TranslationBatcher(config, translation) if config.TRANSLATION_BATCHING else None
+        self.interim = InterimTranscriber(config, transcription) if config.INTERIM_RESULTS else None
+        self.flush_policy = AdaptiveFlushPolicy(config) if config.ADAPTIVE_FLUSH else None
+        self.translation_context = TranslationContext(config) if config.TRANSLATION_CONTEXT_PAIRS > 0 else None
+        self.language_detector = LanguageDetector(
+            config, supported=[code for code in translation.get_supported_languages().values() if code]
+        )
+
+        self.running = False
+        self.threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        """Start audio capture and all pipeline stages"""
+        self.running = True
+        self.threads = []
+        self.translation_executor = ThreadPoolExecutor(
+            max_workers=self.translation_workers * max(1, len(self.tgt_langs)),
+            thread_name_prefix="pipeline-translation-fanout",
+        )
+        self.transcription.start_stream()
+
+        # Queue depths, sampled when metrics are exported
+        metrics.register_gauge("asr_queue_depth", self.asr_queue.qsize)
+        metrics.register_gauge("translation_queue_depth", self.translation_queue.qsize)
+        metrics.register_gauge("sink_queue_depth", self.sink_queue.qsize)
+
+        self._start_stage("segmentation", self._segment, 1, self.asr_queue, self.asr_workers)
+        self._start_stage("asr", self._transcribe, self.asr_workers, self.translation_queue, self.translation_workers)
+        self._start_stage("translation", self._translate, self.translation_workers, self.sink_queue, 1)
+        self._start_stage("sink", self._deliver, 1, None, 0)
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        """Stop capturing; segments already queued are still delivered.
+
+        Waits up to ``timeout`` seconds for the sink to finish when given.
+        """
+        self.running = False
+        self.transcription.stop_stream()
+        if self.batcher:
+            self.batcher.close()
+        if timeout is not None and self.threads:
+            self.threads[-1].join(timeout=timeout)
+
+    def _start_stage(self, name, target, num_workers, downstream, downstream_workers) -> None:
+        remaining = [num_workers]
+        lock = threading.Lock()
+
+        def run():
+            try:
+                target()
+            finally:
+                # The last worker of a stage tells every downstream worker to stop
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    for _ in range(downstream_workers):
+                        downstream.put(None)
+
+        for i in range(num_workers):
+            thread = threading.Thread(target=run, name=f"pipeline-{name}-{i}", daemon=True)
+            thread.start()
+            self.threads.append(thread)
+
+    def _segment(self) -> None:
+        sequence = 0
+        while self.running:
+            if self.interim:
+                sequence = self._commit_interim(sequence)
+
+            if self.flush_policy:
+                self._adapt_segmentation()
+
+            segment = self.transcription.get_next_segment()
+            if segment is None:
+                if self.interim:
+                    self.interim.request(self.src_lang)
+                continue
+
+            audio_chunk, speech_timestamps = segment
+            if not speech_timestamps:
+                continue
+
+            # The segment is a view into the capture buffer; keep a copy of its speech only
+            speech = self.transcription.extract_speech(audio_chunk, speech_timestamps)
+            self.asr_queue.put(Utterance(
+                sequence=sequence,
+                audio=speech,
+                speech_timestamps=[{"start": 0, "end": len(speech)}],
+                src_lang=self.src_lang,
+                tgt_langs=list(self.tgt_langs),
+                committed_words=self.interim.finish_segment() if self.interim else [],
+            ))
+            sequence += 1
+
+        if self.interim:
+            self.interim.shutdown()
+
+    def _adapt_segmentation(self) -> None:
+        decision = self.flush_policy.update(backlog=self.asr_queue.qsize() + self.translation_queue.qsize())
+        if decision is not None:
+            self.transcription.set_segmentation(decision.min_silence_ms, decision.max_speech_s)
+
+    def _commit_interim(self, sequence: int) -> int:
+        """Queue newly committed interim text as utterances and show the provisional rest"""
+        for committed, provisional in self.interim.poll():
+            if committed:
+                self.asr_queue.put(Utterance(
+                    sequence=sequence,
+                    src_lang=self.src_lang,
+                    tgt_langs=list(self.tgt_langs),
+                    transcription=committed,
+                ))
+                sequence += 1
+            if self.on_interim:
+                self.sink_queue.put(("interim", provisional))
+        return sequence
+
+    def _transcribe(self) -> None:
+        while True:
+            utterance = self.asr_queue.get()
+            if utterance is None:
+                return
+
+            # Committed interim text arrives already transcribed
+            asr_language = None
+            if utterance.audio is not None:
+                try:
+                    started = time.monotonic()
+                    text, asr_language = self.transcription.process_audio_chunk_with_language(
+                        utterance.audio, utterance.src_lang, utterance.speech_timestamps,
+                        detect_language=self.language_detector.uses_asr,
+                    )
+                    if self.flush_policy:
+                        self.flush_policy.observe_asr(time.monotonic() - started)
+                    if text and utterance.committed_words:
+                        text = drop_committed_prefix(text, utterance.committed_words)
+                    utterance.transcription = text.strip() if text else None
+                except Exception as e:
+                    print(f"Error during transcription: {e}")
+            utterance.audio = None
+            if utterance.src_lang is None and utterance.transcription:
+                utterance.src_lang = self.language_detector.detect(utterance.transcription, asr_language)
+            self.sink_queue.put(("transcription", utterance))
+            self.translation_queue.put(utterance)
+
+    def _translate(self) -> None:
+        while True:
+            utterances, stop = self._take_translation_batch()
+            futures = [
+                (utterance, tgt_lang, self._submit_translation(utterance, tgt_lang))
+                for utterance in utterances if utterance.transcription
+                for tgt_lang in utterance.tgt_langs
+            ]
+            for utterance, tgt_lang, future in futures:
+                try:
+                    utterance.translations[tgt_lang] = future.result()
+                except Exception as e:
+                    print(f"Translation error ({tgt_lang}): {e}")
+                    utterance.translations[tgt_lang] = f"[Error: {e}]"
+                    utterance.failed_translations.add(tgt_lang)
+            for utterance in utterances:
+                self.sink_queue.put(("translation", utterance))
+            if stop:
+                return
+
+    def _take_translation_batch(self) -> Tuple[List[Utterance], bool]:
+        """Next utterance to translate; with batching, also every one already queued behind it.
+
+        The flag is set once this worker's end-of-stream marker was taken.
+        """
+        utterance = self.translation_queue.get()
+        if utterance is None:
+            return [], True
+
+        utterances = [utterance]
+        while self.batcher and len(utterances) < self.batcher.max_segments:
+            try:
+                utterance = self.translation_queue.get_nowait()
+            except queue.Empty:
+                break
+            if utterance is None:
+                return utterances, True
+            utterances.append(utterance)
+        return utterances, False
+
+    def _submit_translation(self, utterance: Utterance, tgt_lang: str) -> Future:
+        if not self.batcher:
+            return self.translation_executor.submit(self._translate_one, utterance, tgt_lang)
+
+        src_lang = utterance.src_lang or "en"  # Nothing was detected
+        future = self.batcher.submit(utterance.transcription, src_lang, tgt_lang)
+        if self.flush_policy:
+            # A batched translation takes as long as its batch, collection window included
+            future.add_done_callback(functools.partial(self._observe_batched_translation, time.monotonic()))
+        return future
+
+    def _observe_batched_translation(self, submitted: float, future: Future) -> None:
+        if not future.cancelled() and future.exception() is None:
+            self.flush_policy.observe_translation(time.monotonic() - submitted)
+
+    def _translate_one(self, utterance: Utterance, tgt_lang: str) -> str:
+        # Timed from when a worker picks it up, not from when its batch was taken
+        started = time.monotonic()
+        translated_text = self._request_translation(utterance, tgt_lang)
+        if self.flush_policy:
+            self.flush_policy.observe_translation(time.monotonic() - started)
+        return translated_text
+
+    def _request_translation(self, utterance: Utterance, tgt_lang: str) -> str:
+        src_lang = utterance.src_lang or "en"  # Nothing was detected
+        if not self.on_translation_delta:
+            return self.translation.translate_text(
+                utterance.transcription, src_lang, tgt_lang, self.translation_context, raise_errors=True
+            )
+
+        stream = self.translation.translate_text_stream(
+            utterance.transcription, src_lang, tgt_lang, self.translation_context, raise_errors=True
+        )
+        while True:
+            try:
+                piece = next(stream)
+            except StopIteration as finished:
+                # The final translation, which may differ from the streamed preview
+                return finished.value
+            self.sink_queue.put(("translation_delta", utterance, tgt_lang, piece))
+
+    def _deliver(self) -> None:
+        reorderers = {"transcription": SequenceReorderer(), "translation": SequenceReorderer()}
+        callbacks = {"transcription": self.on_transcription, "translation": self.on_translation}
+        early_deltas: Dict[int, Tuple[Utterance, List[Tuple[str, str]]]] = {}
+
+        while True:
+            item = self.sink_queue.get()
+            if item is None:
+                self.translation_executor.shutdown(wait=False)
+                return
+
+            kind, utterance = item[:2]
+            if kind == "interim":
+                # Provisional text is not sequenced; it replaces whatever was shown before
+                self._emit_interim(item[1])
+                continue
+            if kind == "translation_delta":
+                if utterance.sequence == reorderers["translation"].next_sequence:
+                    self._emit_deltas(utterance, [item[2:]])
+                else:
+                    early_deltas.setdefault(utterance.sequence, (utterance, []))[1].append(item[2:])
+                continue
+
+            for ready in reorderers[kind].push(utterance.sequence, utterance):
+                if kind == "translation":
+                    self._add_to_context(ready)
+                    if ready.sequence in early_deltas:
+                        self._emit_deltas(*early_deltas.pop(ready.sequence))
+                if callbacks[kind]:
+                    self._emit_result(kind, ready, callbacks[kind])
+                if kind == "transcription" and self.on_interim and ready.speech_timestamps is not None:
+                    # The final transcription of the speech replaces its provisional text
+                    self._emit_interim("")
+
+            # The translation now due may already be streaming
+            next_sequence = reorderers["translation"].next_sequence
+            if kind == "translation" and next_sequence in early_deltas:
+                self._emit_deltas(*early_deltas.pop(next_sequence))
+
+    def _add_to_context(self, utterance: Utterance) -> None:
+        # Batched translations are made without context
+        if self.translation_context is None or self.batcher or not utterance.transcription:
+            return
+        src_lang = utterance.src_lang or "en"  # Nothing was detected
+        for tgt_lang in utterance.tgt_langs:
+            translated_text = utterance.translations.get(tgt_lang)
+            if translated_text and tgt_lang not in utterance.failed_translations:
+                self.translation_context.add(src_lang, tgt_lang, utterance.transcription, translated_text)
+
+    def _emit_result(self, kind: str, utterance: Utterance, callback: Callable) -> None:
+        if kind == "transcription":
+            calls = [(utterance,)] if utterance.transcription else []
+        else:
+            # A streamed translation may come out empty after its preview was shown
+            calls = [
+                (utterance, tgt_lang) for tgt_lang in utterance.tgt_langs
+                if utterance.translations.get(tgt_lang) or (self.on_translation_delta and tgt_lang in utterance.translations)
+            ]
+
+        for args in calls:
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Pipeline sink error: {e}")
+
+    def _emit_interim(self, provisional: str) -> None:
+        try:
+            self.on_interim(provisional)
+        except Exception as e:
+            print(f"Pipeline sink error: {e}")
+
+    def _emit_deltas(self, utterance: Utterance, deltas: List[Tuple[str, str]]) -> None:
+        for tgt_lang, delta in deltas:
+            try:
+                self.on_translation_delta(utterance, tgt_lang, delta)
+            except Exception as e:
+                print(f"Pipeline sink error: {e}")
@@ -0,0 +1,342 @@
+import asyncio
+import bisect
+import contextlib
+import functools
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Callable, Dict, List, Optional, Tuple
+
+from com.mhire.config.config import Config
+from com.mhire.utils.metrics import metrics
+
+# How often waiters re-check whether their request was cancelled, and how
+# often waiters on the asyncio path look whether it is their turn
+POLL_INTERVAL = 0.05
+
+# A process's place in the shared waiting line lapses when not refreshed this
+# long, e.g. because the process died; waiters refresh it twice as often
+STALE_WAITER_SECONDS = 2.0
+
+
+class Priority(IntEnum):
+    """Order in which waiting requests get quota; lower goes first.
+
+    Requests of other processes take part when they share a ``SharedQuota``
+    (``RATE_LIMIT_SHARED_PATH``), so batch jobs give way to live sessions.
+    """
+
+    LIVE_FINAL = 0
+    LIVE_INTERIM = 1
+    BATCH = 2
+
+
+class RequestCancelled(Exception):
+    """The request was cancelled while it waited for quota."""
+
+
+@dataclass
+class RateLimit:
+    """What one request costs against the quota of its endpoint and model."""
+
+    model: Optional[str]
+    tokens: float = 0.0
+    priority: Priority = Priority.LIVE_FINAL
+    # Checked while waiting; once true, the request is dropped before it is sent
+    cancelled: Optional[Callable[[], bool]] = None
+
+
+class TokenBucket:
+    """Refills at ``rate`` per second up to ``capacity``.
+
+    A request larger than the capacity is let through once the bucket is
+    full and leaves it in debt, so long uploads are delayed rather than
+    refused.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def delay(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` can be taken"""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float) -> None:
+        self.level -= amount
+
+
+class SharedQuota:
+    """Bucket levels and waiting priorities in an SQLite file that several processes open.
+
+    Each process keeps its own waiting line; its first request registers
+    with its priority in the file and only takes quota while no other
+    process has a more urgent request registered. The bucket levels and
+    429 pauses are kept in the file, so all processes draw on one quota.
+    Times are wall-clock, the only clock processes have in common.
+    """
+
+    def __init__(self, path: str):
+        import sqlite3  # Only needed when quotas are shared
+
+        self.process = f"{os.getpid()}:{id(self)}"
+        self.lock = threading.Lock()
+        # Transactions are begun explicitly; a writer waits for the file lock up to the timeout
+        self.connection = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS buckets ("
+            " endpoint TEXT, kind TEXT, level REAL, updated REAL, PRIMARY KEY (endpoint, kind))"
+        )
+        self.connection.execute("CREATE TABLE IF NOT EXISTS pauses (endpoint TEXT PRIMARY KEY, until REAL)")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS waiters ("
+            " endpoint TEXT, process TEXT, priority INTEGER, seen REAL, PRIMARY KEY (endpoint, process))"
+        )
+
+    def try_take(self, endpoint: str, priority: int, buckets: List[Tuple[str, Optional[TokenBucket], float]]) -> float:
+        """Take the amounts from the named buckets and return 0, or return how long to wait.
+
+        ``buckets`` only supply rates and capacities; their levels are read
+        from and written back to the file.
+        """
+        with self.lock, self._transaction() as connection:
+            now = time.time()
+            connection.execute(
+                "INSERT OR REPLACE INTO waiters VALUES (?, ?, ?, ?)", (endpoint, self.process, priority, now)
+            )
+            ahead = connection.execute(
+                "SELECT 1 FROM waiters WHERE endpoint = ? AND process != ? AND priority < ? AND seen >= ?",
+                (endpoint, self.process, priority, now - STALE_WAITER_SECONDS),
+            ).fetchone()
+            if ahead:
+                return POLL_INTERVAL
+
+            row = connection.execute("SELECT until FROM pauses WHERE endpoint = ?", (endpoint,)).fetchone()
+            delay = row[0] - now if row else 0.0
+            for kind, bucket, amount in buckets:
+                if bucket is not None and amount:
+                    self._load(connection, endpoint, kind, bucket, now)
+                    delay = max(delay, bucket.delay(amount, now))
+            if delay > 0:
+                return min(delay, STALE_WAITER_SECONDS / 2)
+
+            for kind, bucket, amount in buckets:
+                if bucket is not None and amount:
+                    bucket.take(amount)
+                    connection.execute(
+                        "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?)", (endpoint, kind, bucket.level, now)
+                    )
+            connection.execute("DELETE FROM waiters WHERE endpoint = ? AND process = ?", (endpoint, self.process))
+            return 0.0
+
+    def leave(self, endpoint: str) -> None:
+        """Withdraw this process's waiting request"""
+        with self.lock, self._transaction() as connection:
+            connection.execute("DELETE FROM waiters WHERE endpoint = ? AND process = ?", (endpoint, self.process))
+
+    def pause(self, endpoint: str, seconds: float) -> None:
+        with self.lock, self._transaction() as connection:
+            until = time.time() + seconds
+            connection.execute(
+                "INSERT INTO pauses VALUES (?, ?)"
+                " ON CONFLICT (endpoint) DO UPDATE SET until = MAX(until, excluded.until)",
+                (endpoint, until),
+            )
+            connection.execute("UPDATE buckets SET level = MIN(level, 0) WHERE endpoint = ?", (endpoint,))
+
+    @staticmethod
+    def _load(connection, endpoint: str, kind: str, bucket: TokenBucket, now: float) -> None:
+        row = connection.execute(
+            "SELECT level, updated FROM buckets WHERE endpoint = ? AND kind = ?", (endpoint, kind)
+        ).fetchone()
+        bucket.level, bucket.updated = row if row else (bucket.capacity, now)
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        self.connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.connection
+        except BaseException:
+            self.connection.execute("ROLLBACK")
+            raise
+        self.connection.execute("COMMIT")
+
+
+class EndpointLimiter:
+    """Request and token quota of one endpoint and model, shared by every caller.
+
+    Waiting requests are served in priority order, first come first served
+    within a priority; only the first in line may take quota, so a steady
+    stream of cheap interim requests cannot starve a final one. A 429 from
+    the API pauses the whole endpoint for its Retry-After instead of letting
+    every waiting request run into the same limit. With ``shared``, the
+    quota and the priorities extend to the other processes using it.
+    """
+
+    def __init__(self, name: str, requests_per_second: float, tokens_per_second: float, burst_seconds: float,
+                 shared: Optional[SharedQuota] = None):
+        self.name = name
+        self.shared = shared
+        self.requests = (
+            TokenBucket(requests_per_second, max(1.0, requests_per_second * burst_seconds))
+            if requests_per_second > 0 else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_second, tokens_per_second * burst_seconds)
+            if tokens_per_second > 0 else None
+        )
+        self.paused_until = 0.0
+        self.waiting: List[Tuple[int, int]] = []
+        self.order = itertools.count()
+        self.condition = threading.Condition()
+
+    def acquire(self, tokens: float = 0.0, priority: Priority = Priority.LIVE_FINAL,
+                cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """Block until the request may be sent; False if it was cancelled while waiting"""
+        started = time.monotonic()
+        waiter = self._enqueue(priority)
+        try:
+            with self.condition:
+                while True:
+                    if cancelled is not None and cancelled():
+                        metrics.increment("rate_limit_cancelled")
+                        return False
+                    delay = self._try_take(waiter, tokens)
+                    if delay == 0:
+                        metrics.observe("rate_limit_wait", time.monotonic() - started)
+                        return True
+                    if cancelled is not None:
+                        delay = POLL_INTERVAL if delay is None else min(delay, POLL_INTERVAL)
+                    self.condition.wait(delay)
+        finally:
+            self._dequeue(waiter)
+
+    async def acquire_async(self, tokens: float = 0.0, priority: Priority = Priority.LIVE_FINAL,
+                            cancelled: Optional[Callable[[], bool]] = None) -> bool:
+        """``acquire`` for the event loop: waits by sleeping, never by blocking"""
+        started = time.monotonic()
+        waiter = self._enqueue(priority)
+        try:
+            while True:
+                if cancelled is not None and cancelled():
+                    metrics.increment("rate_limit_cancelled")
+                    return False
+                with self.condition:
+                    delay = self._try_take(waiter, tokens)
+                if delay == 0:
+                    metrics.observe("rate_limit_wait", time.monotonic() - started)
+                    return True
+                await asyncio.sleep(POLL_INTERVAL if delay is None else min(delay, POLL_INTERVAL))
+        finally:
+            self._dequeue(waiter)
+
+    def pause(self, seconds: float) -> None:
+        """Hold back every request for ``seconds``, after the API answered 429.
+
+        The buckets are emptied as well: the API saw more than they allowed
+        for, so requests resume at the configured rate instead of in a burst.
+        """
+        with self.condition:
+            if self.shared is not None:
+                self.shared.pause(self.name, seconds)
+                return
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+            for bucket in (self.requests, self.tokens):
+                if bucket is not None:
+                    bucket.level = min(bucket.level, 0.0)
+
+    def _enqueue(self, priority: Priority) -> Tuple[int, int]:
+        waiter = (int(priority), next(self.order))
+        with self.condition:
+            bisect.insort(self.waiting, waiter)
+        return waiter
+
+    def _dequeue(self, waiter: Tuple[int, int]) -> None:
+        with self.condition:
+            if self.shared is not None and self.waiting[0] == waiter:
+                self.shared.leave(self.name)
+            self.waiting.remove(waiter)
+            # The next in line may be able to go now
+            self.condition.notify_all()
+
+    def _try_take(self, waiter: Tuple[int, int], tokens: float) -> Optional[float]:
+        """Take quota for ``waiter`` and return 0, or return how long to wait; None until it is first in line"""
+        # Called with the condition held
+        if self.waiting[0] != waiter:
+            return None
+        if self.shared is not None:
+            return self.shared.try_take(
+                self.name, waiter[0], [("requests", self.requests, 1), ("tokens", self.tokens, tokens)]
+            )
+        now = time.monotonic()
+        delay = self.paused_until - now
+        if self.requests is not None:
+            delay = max(delay, self.requests.delay(1, now))
+        if self.tokens is not None and tokens:
+            delay = max(delay, self.tokens.delay(tokens, now))
+        if delay > 0:
+            return delay
+        if self.requests is not None:
+            self.requests.take(1)
+        if self.tokens is not None:
+            self.tokens.take(tokens)
+        return 0
+
+
+class RateLimiter:
+    """Client-side quotas of the Groq API, one ``EndpointLimiter`` per endpoint and model.
+
+    Transcription quotas count requests and audio seconds, translation
+    quotas requests and tokens; ``RATE_LIMIT_UTILIZATION`` of them is used,
+    as requests sent exactly at the quota still meet the occasional 429 when
+    network delays bunch them up. Endpoints without configured quotas are
+    only paused after a 429. The API counts per account, so processes using
+    the same key should share their quota through ``RATE_LIMIT_SHARED_PATH``;
+    without it, limits apply per process.
+    """
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.limiters: Dict[Tuple[str, Optional[str]], EndpointLimiter] = {}
+        self.lock = threading.Lock()
+        self.shared = SharedQuota(config.RATE_LIMIT_SHARED_PATH) if config.RATE_LIMIT_SHARED_PATH else None
+
+    def limiter(self, url: str, model: Optional[str]) -> EndpointLimiter:
+        with self.lock:
+            limiter = self.limiters.get((url, model))
+            if limiter is None:
+                limiter = self.limiters[(url, model)] = self._create_limiter(url, model)
+            return limiter
+
+    def _create_limiter(self, url: str, model: Optional[str]) -> EndpointLimiter:
+        config = self.config
+        requests_per_second = tokens_per_second = 0.0
+        if url == config.GROQ_TRANSCRIPTION_ENDPOINT:
+            requests_per_second = config.RATE_LIMIT_ASR_RPM / 60
+            tokens_per_second = config.RATE_LIMIT_ASR_AUDIO_SECONDS_PER_HOUR / 3600
+        elif url == config.GROQ_TRANSLATION_ENDPOINT:
+            requests_per_second = config.RATE_LIMIT_TRANSLATION_RPM / 60
+            tokens_per_second = config.RATE_LIMIT_TRANSLATION_TPM / 60
+        utilization = config.RATE_LIMIT_UTILIZATION
+        return EndpointLimiter(
+            f"{url} ({model})",
+            requests_per_second * utilization,
+            tokens_per_second * utilization,
+            config.RATE_LIMIT_BURST_SECONDS,
+            self.shared,
+        )
+
+
+@functools.lru_cache
+def get_rate_limiter(config: Config) -> RateLimiter:
+    """Returns the rate limiter shared by the sync and async HTTP clients of this config."""
+    return RateLimiter(config)
@@ -0,0 +1,330 @@
+import asyncio
+import json
+from collections import deque
+from dataclasses import dataclass
+from typing import Deque, Dict, List, Optional
+
+import numpy as np
+import websockets
+
+from com.mhire.config.config import Config
+from com.mhire.services.async_transcription import AsyncTranscription
+from com.mhire.services.async_translation import AsyncTranslation
+from com.mhire.services.language_detection import LanguageDetector
+from com.mhire.services.transcription import Transcription
+from com.mhire.services.translation_context import TranslationContext
+from com.mhire.services.vad import BatchedVadScheduler
+
+SAMPLE_FORMATS = {"pcm16": np.dtype("<i2"), "float32": np.dtype("<f4")}
+
+
+@dataclass
+class QueuedUtterance:
+    sequence: int
+    audio: np.ndarray
+    src_lang: Optional[str]
+    tgt_langs: List[str]
+
+
+class ClientSession:
+    """One connected client with its own segmentation, VAD and ASR queue.
+
+    Protocol: the client may first send a JSON ``{"type": "start", ...}``
+    message with ``src_lang``, ``tgt_langs`` (or a single ``tgt_lang``) and
+    ``format`` (``pcm16`` or ``float32``, mono, 16 kHz), then binary audio
+    frames. A later ``{"type": "config", ...}`` message changes the
+    languages; languages the translation prompts do not cover are rejected.
+    The server sends JSON events: ``vad``, ``transcript``,
+    ``translation`` (one per target language, tagged with ``lang``),
+    ``dropped`` and ``error``. Errors about a failed translation carry the
+    ``sequence`` and ``lang`` of the translation event they replace; a
+    failure of the session itself is reported before the connection closes.
+
+    Audio is never buffered without limit: received audio lives in the
+    fixed-size ring buffer of the session's ``Transcription``; when the
+    segmenter falls half a buffer behind, frames stop being read so TCP
+    flow control slows the client down. Once
+    ``SERVER_MAX_PENDING_UTTERANCES`` utterances wait for ASR, new speech is
+    merged into the last waiting utterance, or the oldest one is dropped.
+    Outgoing events wait in a queue of ``SERVER_MAX_OUTGOING_EVENTS``; when
+    the client does not read them, ``vad`` events are dropped and everything
+    else waits for room, which in turn stops audio from being read.
+    """
+
+    def __init__(self, server: "TranslationServer", websocket):
+        self.server = server
+        self.websocket = websocket
+        self.transcription = Transcription(server.config, vad_scheduler=server.vad_scheduler)
+        self.asr = AsyncTranscription(server.config, self.transcription)
+        self.transcription.reset_buffers()
+        self.transcription.vad_event_callback = self._on_vad_event
+        self.sample_rate = self.transcription.sample_rate
+        self.max_utterance_samples = int(self.sample_rate * self.transcription.max_sentence_duration)
+
+        self.src_lang: Optional[str] = None
+        self.tgt_langs: List[str] = ["en"]
+        # Recent translations of this client, sent along as context
+        self.translation_context = (
+            TranslationContext(server.config) if server.config.TRANSLATION_CONTEXT_PAIRS > 0 else None
+        )
+        self.supported_languages = [code for code in server.translation.get_supported_languages().values() if code]
+        # Source language of each utterance while src_lang is None
+        self.language_detector = LanguageDetector(server.config, supported=self.supported_languages)
+        self.sample_format = SAMPLE_FORMATS["pcm16"]
+
+        self.loop = asyncio.get_running_loop()
+        self.audio_ready = asyncio.Event()
+        self.audio_consumed = asyncio.Event()
+        self.pending: Deque[QueuedUtterance] = deque()
+        self.pending_changed = asyncio.Condition()
+        self.outgoing: asyncio.Queue = asyncio.Queue(maxsize=server.config.SERVER_MAX_OUTGOING_EVENTS)
+        self.next_sequence = 0
+        self.translation_tasks = set()
+        self.closed = False
+
+    async def run(self) -> None:
+        receive = asyncio.create_task(self._receive())
+        workers = [
+            asyncio.create_task(self._segment()),
+            asyncio.create_task(self._transcribe()),
+            asyncio.create_task(self._send_events()),
+        ]
+        tasks = [receive] + workers
+        try:
+            # The workers only return by failing; receiving ends when the client leaves
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if not task.cancelled() and task.exception() is not None:
+                    await self._fail(task.exception())
+                    break
+        finally:
+            # Stop everything this client started, including in-flight API calls
+            self.closed = True
+            tasks.extend(self.translation_tasks)
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self.transcription.vad_iterator.close()
+
+    async def _receive(self) -> None:
+        try:
+            async for message in self.websocket:
+                if isinstance(message, bytes):
+                    await self._receive_audio(message)
+                elif not await self._receive_control(message):
+                    break
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _fail(self, error: BaseException) -> None:
+        """Report a failed session to the client and close the connection"""
+        self.server.logger.error(f"Client session failed: {error!r}", exc_info=error)
+        try:
+            # Sent directly: the task sending the queued events may be the one that failed
+            await self.websocket.send(json.dumps({"type": "error", "message": "Internal server error"}))
+            await self.websocket.close(1011, "Internal server error")
+        except websockets.ConnectionClosed:
+            pass
+
+    async def _receive_audio(self, message: bytes) -> None:
+        transcription = self.transcription
+        buffer = transcription.audio_buffer
+        while buffer.write_pos - transcription.read_pos > buffer.capacity // 2:
+            self.audio_consumed.clear()
+            await self.audio_consumed.wait()
+
+        usable = len(message) - len(message) % self.sample_format.itemsize
+        samples = np.frombuffer(message[:usable], dtype=self.sample_format)
+        if self.sample_format.kind == "i":
+            samples = samples.astype(np.float32) / 32768
+        buffer.write(samples)
+        self.audio_ready.set()
+
+    async def _receive_control(self, message: str) -> bool:
+        try:
+            control = json.loads(message)
+        except ValueError:
+            await self._send_event({"type": "error", "message": "Control messages must be JSON"})
+            return True
+
+        error = self._validate_control(control, self.supported_languages)
+        if error:
+            # Rejected as a whole, so a bad field never leaves half the settings applied
+            await self._send_event({"type": "error", "message": error})
+            return True
+
+        if control.get("type") == "stop":
+            return False
+        if "src_lang" in control:
+            self.src_lang = control["src_lang"] or None
+        if "tgt_lang" in control:
+            self.tgt_langs = [control["tgt_lang"]] if control["tgt_lang"] else []
+        if "tgt_langs" in control:
+            self.tgt_langs = list(control["tgt_langs"] or [])
+        if "format" in control:
+            self.sample_format = SAMPLE_FORMATS[control["format"]]
+        if control.get("type") == "start":
+            await self._send_event({"type": "ready", "sample_rate": self.sample_rate})
+        return True
+
+    @staticmethod
+    def _validate_control(control, supported_languages: List[str]) -> Optional[str]:
+        """Why a control message is invalid, or None if it is fine"""
+        if not isinstance(control, dict):
+            return "Control messages must be JSON objects"
+        for key in ("type", "src_lang", "tgt_lang"):
+            if control.get(key) is not None and not isinstance(control[key], str):
+                return f"{key} must be a string"
+        tgt_langs = control.get("tgt_langs")
+        if tgt_langs is not None and (
+            not isinstance(tgt_langs, list) or not all(isinstance(lang, str) for lang in tgt_langs)
+        ):
+            return "tgt_langs must be a list of strings"
+        # An empty src_lang means detecting it, an empty tgt_lang translating into nothing
+        languages = [control.get("src_lang"), control.get("tgt_lang"), *(tgt_langs or [])]
+        unsupported = [lang for lang in languages if lang and lang not in supported_languages]
+        if unsupported:
+            return f"Unsupported language {unsupported[0]}, expected one of {', '.join(supported_languages)}"
+        if "format" in control and (
+            not isinstance(control["format"], str) or control["format"] not in SAMPLE_FORMATS
+        ):
+            return f"Unsupported format {control['format']}"
+        return None
+
+    def _on_vad_event(self, event: dict) -> None:
+        # Called from the segmentation thread
+        kind, sample = next(iter(event.items()))
+        self.loop.call_soon_threadsafe(
+            self._offer_event, {"type": "vad", "event": kind, "time": round(sample / self.sample_rate, 3)}
+        )
+
+    def _offer_event(self, event: dict) -> None:
+        """Queue an event the client can do without, unless it is behind on reading"""
+        try:
+            self.outgoing.put_nowait(event)
+        except asyncio.QueueFull:
+            pass  # A client that does not read its events loses them, not our memory
+
+    async def _send_event(self, event: dict) -> None:
+        """Queue an event, waiting while the client is behind on reading"""
+        await self.outgoing.put(event)
+
+    async def _send_events(self) -> None:
+        while True:
+            event = await self.outgoing.get()
+            await self.websocket.send(json.dumps(event, ensure_ascii=False))
+
+    async def _segment(self) -> None:
+        while True:
+            await self.audio_ready.wait()
+            self.audio_ready.clear()
+            for speech in await asyncio.to_thread(self._drain_segments):
+                await self._enqueue(speech)
+            self.audio_consumed.set()
+
+    def _drain_segments(self) -> List[np.ndarray]:
+        """Segment all audio received so far; returns copies of the speech to transcribe"""
+        transcription = self.transcription
+        speech = []
+        while transcription.read_pos < transcription.audio_buffer.write_pos:
+            segment = transcription.get_next_segment(timeout=0)
+            if segment is not None and segment[1]:
+                speech.append(transcription.extract_speech(*segment))
+        return speech
+
+    async def _enqueue(self, speech: np.ndarray) -> None:
+        dropped = None
+        async with self.pending_changed:
+            if len(self.pending) >= self.server.config.SERVER_MAX_PENDING_UTTERANCES:
+                last = self.pending[-1]
+                if len(last.audio) + len(speech) <= self.max_utterance_samples:
+                    # Coalesce into the last waiting utterance: one request instead of two
+                    last.audio = np.concatenate([last.audio, speech])
+                    return
+                dropped = self.pending.popleft()
+
+            self.pending.append(QueuedUtterance(self.next_sequence, speech, self.src_lang, list(self.tgt_langs)))
+            self.next_sequence += 1
+            self.pending_changed.notify()
+        if dropped is not None:
+            await self._send_event({"type": "dropped", "sequence": dropped.sequence})
+
+    async def _transcribe(self) -> None:
+        previous_translations: Dict[str, asyncio.Task] = {}
+        while True:
+            async with self.pending_changed:
+                await self.pending_changed.wait_for(lambda: self.pending)
+                utterance = self.pending.popleft()
+
+            text, asr_language = await self.asr.process_audio_chunk_with_language(
+                utterance.audio, utterance.src_lang, [{"start": 0, "end": len(utterance.audio)}],
+                detect_language=self.language_detector.uses_asr,
+            )
+            if not text or not text.strip():
+                continue
+
+            text = text.strip()
+            if utterance.src_lang is None:
+                utterance.src_lang = self.language_detector.detect(text, asr_language)
+            await self._send_event({
+                "type": "transcript", "sequence": utterance.sequence, "text": text, "src_lang": utterance.src_lang
+            })
+            for tgt_lang in utterance.tgt_langs:
+                # All target languages are translated concurrently, and while the
+                # next utterance is transcribed; events stay in order per language
+                task = asyncio.create_task(
+                    self._translate(previous_translations.get(tgt_lang), utterance, text, tgt_lang)
+                )
+                self.translation_tasks.add(task)
+                task.add_done_callback(self.translation_tasks.discard)
+                previous_translations[tgt_lang] = task
+
+    async def _translate(
+        self, previous: Optional[asyncio.Task], utterance: QueuedUtterance, text: str, tgt_lang: str
+    ) -> None:
+        error = None
+        try:
+            translation = await self.server.translation.translate_text(
+                text, utterance.src_lang or "en", tgt_lang, self.translation_context, raise_errors=True
+            )
+        except Exception as e:
+            error = e
+        if previous is not None:
+            await previous
+        if error is not None:
+            await self._send_event({
+                "type": "error", "sequence": utterance.sequence, "lang": tgt_lang,
+                "message": f"Translation failed: {error}",
+            })
+        else:
+            if self.translation_context is not None:
+                # Every earlier translation of this language has been added by now
+                self.translation_context.add(utterance.src_lang or "en", tgt_lang, text, translation)
+            await self._send_event({
+                "type": "translation", "sequence": utterance.sequence, "lang": tgt_lang, "text": translation
+            })
+
+
+class TranslationServer:
+    """WebSocket server exposing the live pipeline, one ``ClientSession`` per connection."""
+
+    def __init__(self, config: Config):
+        self.config = config
+        self.translation = AsyncTranslation(config)
+        # The VAD windows of all clients segmenting at the same time run in one batch
+        self.vad_scheduler = BatchedVadScheduler(max_streams=config.SERVER_VAD_BATCH_STREAMS)
+        self.logger = config.get_logger(__name__)
+
+    async def handle(self, websocket) -> None:
+        self.logger.info(f"Client connected: {websocket.remote_address}")
+        await ClientSession(self, websocket).run()
+        self.logger.info(f"Client disconnected: {websocket.remote_address}")
+
+    async def serve(self, host: str, port: int) -> None:
+        async with websockets.serve(self.handle, host, port, max_queue=self.config.SERVER_MAX_QUEUED_FRAMES):
+            self.logger.info(f"Serving on ws://{host}:{port}")
+            await asyncio.Future()
+
+
+def run_server(config: Config, host: str, port: int) -> None:
+    asyncio.run(TranslationServer(config).serve(host, port))
@@ -0,0 +1,80 @@
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+from com.mhire.config.config import Config
+
+
+class StartupReport:
+    """Time of each startup phase since ``started``, logged once all expected phases are done."""
+
+    def __init__(self, config: Config, started: float, expected: Iterable[str] = ()):
+        self.started = started
+        self.expected = set(expected)
+        self.phases: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        self.logger = config.get_logger(__name__)
+
+    def mark(self, phase: str) -> None:
+        with self.lock:
+            self.phases[phase] = time.perf_counter() - self.started
+            done = self.expected.issubset(self.phases)
+        if done:
+            self.log()
+
+    def log(self) -> None:
+        with self.lock:
+            phases = sorted(self.phases.items(), key=lambda item: item[1])
+        self.logger.info("Startup: " + ", ".join(f"{phase} {seconds * 1000:.0f} ms" for phase, seconds in phases))
+
+
+def warm_up_http(config: Config) -> None:
+    """Open pooled keep-alive connections to the API hosts ahead of the first request"""
+    from com.mhire.services.http_client import get_http_client
+
+    http_client = get_http_client(config)
+    origins = {
+        f"{parts.scheme}://{parts.netloc}/"
+        for parts in (urlsplit(url) for url in (config.GROQ_TRANSCRIPTION_ENDPOINT, config.GROQ_TRANSLATION_ENDPOINT) if url)
+    }
+    for origin in origins:
+        try:
+            # Any status will do, only the connection is kept
+            http_client.session.head(origin, timeout=http_client.timeout).close()
+        except Exception as e:
+            http_client.logger.warning(f"Could not pre-connect to {origin}: {e}")
+
+
+def warm_up_vad() -> None:
+    """Create the VAD session pool; every session runs a dummy inference as it is created"""
+    from com.mhire.services.vad import get_vad_pool
+
+    get_vad_pool()
+
+
+def warm_up_in_background(config: Config, report: Optional[StartupReport] = None, http: bool = True) -> List[threading.Thread]:
+    """Warm the VAD sessions (and the HTTP pool) while the caller brings up the UI.
+
+    The steps run on threads of their own, one CPU-bound and one waiting on
+    the network, and mark ``vad_ready``/``http_ready`` in ``report``. A failed
+    step is logged and otherwise left to happen on first use.
+    """
+    steps = [("vad_ready", warm_up_vad)]
+    if http:
+        steps.append(("http_ready", lambda: warm_up_http(config)))
+
+    def run(phase, step):
+        try:
+            step()
+        except Exception as e:
+            config.get_logger(__name__).warning(f"Warm-up step {phase} failed: {e}")
+        if report is not None:
+            report.mark(phase)
+
+    threads = []
+    for phase, step in steps:
+        thread = threading.Thread(target=run, args=(phase, step), name=f"warm-up-{phase}", daemon=True)
+        thread.start()
+        threads.append(thread)
+    return threads
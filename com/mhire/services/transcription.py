@@ -1,53 +1,103 @@
-import os
-import wave
 import numpy as np
-import requests
-from typing import Optional, Dict, Any, List, Tuple
-import queue
-import sounddevice as sd
+from typing import Optional, Dict, Any, Callable, List, Tuple
 from dataclasses import dataclass
-import time
 
 from com.mhire.config.config import Config
-from com.mhire.services.vad import VadOptions, get_speech_timestamps, collect_chunks
+from com.mhire.services.http_client import get_http_client
+from com.mhire.services.rate_limiter import Priority, RateLimit, RequestCancelled
+from com.mhire.utils.audio import encode_audio
+from com.mhire.utils.metrics import metrics
+from com.mhire.utils.ring_buffer import AudioRingBuffer
+from com.mhire.services.vad import (
+    BatchedVadScheduler, VadOptions, VadIterator, get_speech_timestamps, collect_chunks
+)
+
+# Transcription quota is billed for at least this many seconds of audio per request
+ASR_MIN_BILLED_SECONDS = 10.0
 
 class Transcription:
-    def __init__(self, config: Config):
+    def __init__(
+        self,
+        config: Config,
+        priority: Priority = Priority.LIVE_FINAL,
+        vad_scheduler: Optional[BatchedVadScheduler] = None,
+    ):
         self.config = config
+        self.http_client = get_http_client(config)
+        # Rank of this instance's requests when they wait for rate limit quota
+        self.priority = priority
+        self.headers = {"Authorization": f"Bearer {config.GROQ_API_KEY}"}
         self.sample_rate = 16000
-        self.audio_queue = queue.Queue()
         self.running = False
-        self.silence_threshold = 0.01
-        self.min_silence_duration = 0.7
         self.max_sentence_duration = 10.0
         
-        # Initialize VAD options
+        # Initialize VAD options; segments end after min_silence_duration_ms of
+        # non-speech, or when speech has lasted max_speech_duration_s
         self.vad_options = VadOptions(
             threshold=0.5,
             min_speech_duration_ms=250,
             min_silence_duration_ms=700,
             speech_pad_ms=30,
-            max_speech_duration_s=10.0
+            max_speech_duration_s=self.max_sentence_duration
         )
         
-        self.audio_data = []
-        self.silence_frames = 0
-        self.total_frames = 0
-        self.last_processed_time = 0
+        # Captured audio; holds several maximum-length segments of backlog.
+        # Positions below are absolute sample counts into this buffer.
+        longest_segment = self.max_sentence_duration
+        if config.ADAPTIVE_FLUSH:
+            longest_segment = max(longest_segment, config.FLUSH_MAX_SPEECH_S_MAX)
+        self.audio_buffer = AudioRingBuffer(int(self.sample_rate * 3 * longest_segment))
+        self.segment_start = 0
+        self.read_pos = 0
+        self.vad_pos = 0
+
+        # Streaming VAD state, created when the stream starts; its model runs in
+        # vad_scheduler when one is shared with other streams
+        self.vad_scheduler = vad_scheduler
+        self.vad_iterator = None
+        self.speech_segments = []
+        # Optional hook called with every speech start/end event (absolute samples)
+        self.vad_event_callback: Optional[Callable[[dict], None]] = None
 
     def audio_callback(self, indata: np.ndarray, frames: int, time_info: Dict, status: Any) -> None:
         """Callback for audio input"""
         if status:
             print(status)
-        self.audio_queue.put(indata.copy())
+        self.audio_buffer.write(indata[:, 0])
+
+    def reset_buffers(self) -> None:
+        """Clear captured audio and segmentation state for a new stream"""
+        self.audio_buffer.reset()
+        self.segment_start = 0
+        self.read_pos = 0
+        self.vad_pos = 0
+        self.speech_segments = []
+        if self.vad_iterator is None:
+            self.vad_iterator = VadIterator(
+                self.vad_options, sampling_rate=self.sample_rate, scheduler=self.vad_scheduler
+            )
+        else:
+            self.vad_iterator.reset()
+
+    def set_segmentation(self, min_silence_ms: float, max_speech_s: float) -> None:
+        """Change when segments end; takes effect from the next VAD window.
+
+        Call from the thread that calls ``get_next_segment``.
+        """
+        self.vad_options.min_silence_duration_ms = min_silence_ms
+        self.vad_options.max_speech_duration_s = max_speech_s
+        if self.vad_iterator is not None:
+            self.vad_iterator.set_options(self.vad_options)
 
     def start_stream(self) -> None:
         """Start the audio stream"""
+        # Imported here so headless use does not need PortAudio
+        import sounddevice as sd
+
         self.running = True
-        self.audio_data = []
-        self.silence_frames = 0
-        self.total_frames = 0
-        self.last_processed_time = time.time()
+        self.reset_buffers()
+        # Captured audio not yet segmented, sampled when metrics are exported
+        metrics.register_gauge("audio_backlog_seconds", self.backlog_seconds)
         self.stream = sd.InputStream(
             samplerate=self.sample_rate,
             channels=1,
@@ -63,107 +113,261 @@ class Transcription:
                 self.stream.stop()
                 self.stream.close()
 
-    def process_audio_chunk(self, audio_chunk: np.ndarray, selected_src_lang: Optional[str] = None) -> Optional[str]:
+    def backlog_seconds(self) -> float:
+        """Seconds of captured audio waiting for segmentation"""
+        return (self.audio_buffer.write_pos - self.read_pos) / self.sample_rate
+
+    def update_speech_segments(self) -> None:
+        """Run the streaming VAD over complete new windows and record speech in the current segment"""
+        window_size_samples = self.vad_iterator.window_size_samples
+        num_samples = (self.read_pos - self.vad_pos) // window_size_samples * window_size_samples
+        if not num_samples:
+            return
+
+        windows = self.audio_buffer.view(self.vad_pos, self.vad_pos + num_samples)
+        self.vad_pos += num_samples
+        for event in self.vad_iterator(windows):
+            if self.vad_event_callback:
+                self.vad_event_callback(event)
+            if "start" in event:
+                start = max(event["start"] - self.segment_start, 0)
+                self.speech_segments.append({"start": start})
+            elif self.speech_segments and "end" not in self.speech_segments[-1]:
+                self.speech_segments[-1]["end"] = event["end"] - self.segment_start
+
+    def take_speech_segments(self, buffer_length: int) -> List[dict]:
+        """Return the speech timestamps of the first ``buffer_length`` samples of the
+        current segment and start a new segment after them"""
+        min_speech_samples = self.sample_rate * self.vad_options.min_speech_duration_ms / 1000
+        speech_timestamps = []
+        remaining = []
+        for segment in self.speech_segments:
+            start = segment["start"]
+            if start >= buffer_length:
+                remaining.append({key: value - buffer_length for key, value in segment.items()})
+                continue
+
+            end = min(segment.get("end", buffer_length), buffer_length)
+            if end - start > min_speech_samples:
+                speech_timestamps.append({"start": start, "end": end})
+            if segment.get("end", buffer_length + 1) > buffer_length:
+                # Speech that is still going on continues at the start of the next segment
+                remaining.append({key: max(value - buffer_length, 0) for key, value in segment.items()})
+
+        self.speech_segments = remaining
+        self.segment_start += buffer_length
+        return speech_timestamps
+
+    def take_completed_speech(self) -> Optional[Tuple[np.ndarray, List[dict]]]:
+        """End the current segment after its last completed speech, if any.
+
+        Returns the segment and its speech timestamps, or None when the VAD
+        has not closed any speech yet or the speech was too short to keep.
+        Leading silence is dropped as it arrives, so segments never hold
+        more than the speech padding before their first speech.
+        """
+        completed = [segment for segment in self.speech_segments if "end" in segment]
+        if not completed:
+            if not self.speech_segments and not self.vad_iterator.triggered:
+                # Silence only: keep just enough for the padding of the next speech start
+                self.segment_start = max(self.segment_start, self.vad_pos - self.vad_iterator.speech_pad_samples)
+            return None
+
+        buffer_length = completed[-1]["end"]
+        audio_chunk = self.audio_buffer.view(self.segment_start, self.segment_start + buffer_length)
+        speech_timestamps = self.take_speech_segments(buffer_length)
+        if not speech_timestamps:
+            return None
+        return audio_chunk, speech_timestamps
+
+    def peek_open_speech(self) -> Optional[Tuple[np.ndarray, List[dict]]]:
+        """The current segment up to the VAD position, while speech is still going on.
+
+        Nothing is consumed; the segment continues to grow until the VAD
+        closes it.
+        """
+        if not self.vad_iterator.triggered or not self.speech_segments:
+            return None
+        buffer_length = self.vad_pos - self.segment_start
+        speech_timestamps = [
+            {"start": segment["start"], "end": segment.get("end", buffer_length)}
+            for segment in self.speech_segments
+        ]
+        return self.audio_buffer.view(self.segment_start, self.vad_pos), speech_timestamps
+
+    def recover_from_overrun(self) -> None:
+        """Drop the current segment after the consumer fell a whole buffer behind"""
+        oldest = self.audio_buffer.oldest_position()
+        metrics.increment("audio_overruns")
+        print(f"Audio buffer overrun, dropped {(oldest - self.segment_start) / self.sample_rate:.1f}s of audio")
+        self.segment_start = self.read_pos = self.vad_pos = oldest
+        self.speech_segments = []
+        self.vad_iterator.reset(start_sample=oldest)
+
+    def process_audio_chunk(
+        self,
+        audio_chunk: np.ndarray,
+        selected_src_lang: Optional[str] = None,
+        speech_timestamps: Optional[List[dict]] = None,
+        priority: Optional[Priority] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Optional[str]:
         """Process a chunk of audio and return transcription"""
-        # Apply VAD to remove silence and noise
-        speech_timestamps = get_speech_timestamps(
-            audio_chunk,
-            self.vad_options,
-            sampling_rate=self.sample_rate
+        text, _ = self.process_audio_chunk_with_language(
+            audio_chunk, selected_src_lang, speech_timestamps, detect_language=False,
+            priority=priority, cancelled=cancelled,
         )
+        return text
+
+    def process_audio_chunk_with_language(
+        self,
+        audio_chunk: np.ndarray,
+        selected_src_lang: Optional[str] = None,
+        speech_timestamps: Optional[List[dict]] = None,
+        detect_language: bool = True,
+        priority: Optional[Priority] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> Tuple[Optional[str], Optional[str]]:
+        """Process a chunk of audio and return its transcription and the language the ASR detected
+
+        The language comes from a verbose JSON response, requested only with
+        ``detect_language`` set and no source language selected; otherwise it is None.
+        ``priority`` overrides the instance's rate limit priority, and a request
+        still waiting for quota when ``cancelled()`` turns true is dropped.
+        """
+        processed_audio = self.extract_speech(audio_chunk, speech_timestamps)
+        if processed_audio is None:
+            return None, None
+        
+        try:
+            files = self.prepare_upload(processed_audio, selected_src_lang, detect_language)
+
+            # Use Groq's audio transcription API
+            with metrics.span("asr_request"):
+                response = self.http_client.post(
+                    self.config.GROQ_TRANSCRIPTION_ENDPOINT,
+                    headers=self.headers,
+                    files=files,
+                    rate_limit=self.rate_limit(processed_audio, priority, cancelled)
+                )
+            return self.parse_response_with_language(response)
+
+        except RequestCancelled:
+            return None, None
+        except Exception as e:
+            print(f"Error during transcription: {e}")
+            return None, None
+
+    def extract_speech(
+        self, audio_chunk: np.ndarray, speech_timestamps: Optional[List[dict]] = None
+    ) -> Optional[np.ndarray]:
+        """Cut a chunk down to its speech, or return None if it has none"""
+        # Apply VAD to remove silence and noise, unless the stream already did
+        if speech_timestamps is None:
+            speech_timestamps = get_speech_timestamps(
+                audio_chunk,
+                self.vad_options,
+                sampling_rate=self.sample_rate
+            )
         
         if not speech_timestamps:
             return None
 
         # Extract speech segments
         audio_segments, _ = collect_chunks(audio_chunk, speech_timestamps)
-        processed_audio = np.concatenate(audio_segments)
+        return np.concatenate(audio_segments)
+
+    def prepare_upload(
+        self, processed_audio: np.ndarray, selected_src_lang: Optional[str] = None, detect_language: bool = True
+    ) -> Dict[str, tuple]:
+        """Encode speech for upload, asking for the detected language when none is selected"""
+        response_format = "verbose_json" if detect_language and not selected_src_lang else None
+        with metrics.span("audio_encoding"):
+            return self.build_upload_files(processed_audio, selected_src_lang, response_format)
+
+    def build_upload_files(
+        self,
+        processed_audio: np.ndarray,
+        selected_src_lang: Optional[str] = None,
+        response_format: Optional[str] = None,
+    ) -> Dict[str, tuple]:
+        """Build the multipart fields of a transcription request"""
+        # Encode the upload in memory; nothing touches the filesystem
+        file_name, payload, mime_type = encode_audio(
+            processed_audio, self.sample_rate, self.config.AUDIO_UPLOAD_FORMAT
+        )
+        files = {
+            'file': (file_name, payload, mime_type),
+            'model': (None, self.config.GROQ_TRANSCRIPTION_MODEL),
+        }
         
-        # Save processed audio as temporary WAV file
-        temp_wav = "temp_audio.wav"
-        with wave.open(temp_wav, 'wb') as wf:
-            wf.setnchannels(1)
-            wf.setsampwidth(2)
-            wf.setframerate(self.sample_rate)
-            wf.writeframes((processed_audio * 32767).astype(np.int16).tobytes())
+        if selected_src_lang:
+            files['language'] = (None, selected_src_lang)
+        if response_format:
+            files['response_format'] = (None, response_format)
+        return files
 
+    def rate_limit(
+        self,
+        processed_audio: np.ndarray,
+        priority: Optional[Priority] = None,
+        cancelled: Optional[Callable[[], bool]] = None,
+    ) -> RateLimit:
+        """Quota a transcription request uses: one request and its audio seconds"""
+        seconds = max(len(processed_audio) / self.sample_rate, ASR_MIN_BILLED_SECONDS)
+        return RateLimit(
+            self.config.GROQ_TRANSCRIPTION_MODEL, seconds, self.priority if priority is None else priority, cancelled
+        )
+
+    def transcribe_verbose(self, processed_audio: np.ndarray, selected_src_lang: Optional[str] = None) -> Optional[Dict]:
+        """Transcribe speech and return the verbose JSON response, including segment timings"""
         try:
-            # Use Groq's audio transcription API
-            with open(temp_wav, 'rb') as audio_file:
-                files = {
-                    'file': ('audio.wav', audio_file, 'audio/wav'),
-                    'model': (None, self.config.GROQ_TRANSCRIPTION_MODEL),
-                }
-                
-                if selected_src_lang:
-                    files['language'] = (None, selected_src_lang)
-                
-                response = requests.post(
-                    self.config.GROQ_TRANSCRIPTION_ENDPOINT,
-                    headers={"Authorization": f"Bearer {self.config.GROQ_API_KEY}"},
-                    files=files
-                )
-            
-            if os.path.exists(temp_wav):
-                os.remove(temp_wav)
-                
+            response = self.http_client.post(
+                self.config.GROQ_TRANSCRIPTION_ENDPOINT,
+                headers=self.headers,
+                files=self.build_upload_files(processed_audio, selected_src_lang, "verbose_json"),
+                rate_limit=self.rate_limit(processed_audio)
+            )
             if response.status_code == 200:
-                return response.json()['text']
-            else:
-                print(f"Transcription error: {response.text}")
-                return None
+                return response.json()
+            print(f"Transcription error: {response.text}")
+            return None
 
         except Exception as e:
             print(f"Error during transcription: {e}")
-            if os.path.exists(temp_wav):
-                os.remove(temp_wav)
             return None
 
-    def get_next_transcription(self, selected_src_lang: Optional[str] = None) -> Optional[str]:
-        """Get next transcription from the audio stream"""
+    def parse_response_with_language(self, response) -> Tuple[Optional[str], Optional[str]]:
+        """Extract the transcribed text and, from verbose responses, the detected language"""
+        if response.status_code == 200:
+            result = response.json()
+            return result['text'], result.get('language')
+        else:
+            print(f"Transcription error: {response.text}")
+            return None, None
+
+    def get_next_segment(self, timeout: float = 0.1) -> Optional[Tuple[np.ndarray, List[dict]]]:
+        """Get the next audio segment to transcribe and its speech timestamps
+
+        Waits up to ``timeout`` seconds for new audio. Segments end where the
+        streaming VAD closes speech: after ``min_silence_duration_ms`` of
+        non-speech, or once speech has lasted ``max_speech_duration_s``.
+        Audio without speech is never returned. The segment is a view into
+        the ring buffer; copy it if it has to outlive a few more segments of
+        capture.
+        """
         try:
-            data = self.audio_queue.get(timeout=0.1)
-            current_frame = data.flatten()
-            self.audio_data.append(current_frame)
-            self.total_frames += len(current_frame)
-            
-            # Calculate audio energy for silence detection
-            frame_energy = np.sqrt(np.mean(current_frame**2))
-            
-            # Update silence counter
-            if frame_energy < self.silence_threshold:
-                self.silence_frames += len(current_frame)
-            else:
-                self.silence_frames = 0
-            
-            # Convert frames to duration
-            silence_duration = self.silence_frames / self.sample_rate
-            total_duration = self.total_frames / self.sample_rate
-            current_time = time.time()
-            
-            # Check if we should process the current audio
-            should_process = (
-                (silence_duration >= self.min_silence_duration and total_duration > 1.0) or
-                total_duration >= self.max_sentence_duration or
-                (total_duration >= 2.0 and current_time - self.last_processed_time >= 2.0)
-            )
-            
-            if should_process and self.audio_data:
-                audio_chunk = np.concatenate(self.audio_data)
-                transcription = self.process_audio_chunk(audio_chunk, selected_src_lang)
-                
-                # Reset buffers and counters
-                self.audio_data = []
-                self.silence_frames = 0
-                self.total_frames = 0
-                self.last_processed_time = current_time
-                
-                if transcription:
-                    return transcription.strip()
+            write_pos = self.audio_buffer.wait_for_data(self.read_pos, timeout=timeout)
+            if write_pos == self.read_pos:
+                return None  # No new audio data
+            if self.segment_start < self.audio_buffer.oldest_position():
+                self.recover_from_overrun()
+
+            self.read_pos = write_pos
+            self.update_speech_segments()
+            return self.take_completed_speech()
             
-        except queue.Empty:
-            pass  # No new audio data
         except Exception as e:
             print(f"Error during processing: {e}")
         
-        return None
\ No newline at end of file
+        return None
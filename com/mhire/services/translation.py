@@ -1,11 +1,228 @@
-import requests
-from typing import Dict, Optional
+import json
+import re
+import time
+from dataclasses import dataclass
+from typing import Dict, Generator, List, Optional, Tuple
 
 from com.mhire.config.config import Config
+from com.mhire.services.http_client import get_http_client
+from com.mhire.services.rate_limiter import Priority, RateLimit
+from com.mhire.services.translation_cache import (
+    CacheKey, TranslationCache, create_translation_cache, make_cache_key
+)
+from com.mhire.services.translation_context import TranslationContext, estimate_tokens
+from com.mhire.utils.metrics import metrics
+
+# Common prefixes that might appear before the translated text
+TRANSLATION_PREFIXES = [
+    "Translation:", "Here's the translation:", "Translated text:",
+    "Here is the translation:", "Arabic translation:", "English translation:",
+    "German translation:", "The translation is:", "Please find the translation below:",
+]
+
+# Lines containing any of these look like instructions or meta text
+META_LINE_INDICATORS = [
+    "translate", "translation", "please", "here", "you would like", "text:", "note:"
+]
+
+
+# A sentence ends in the text, so it is more than a preamble like "Here you go:"
+_SENTENCE_END = re.compile(r"[.!?]\s|[\u3002\uff01\uff1f]")
+
+
+def is_meta_line(line: str) -> bool:
+    lowered = line.lower()
+    return any(indicator in lowered for indicator in META_LINE_INDICATORS)
+
+
+def clean_translation(text: str) -> str:
+    """Clean up translation output to remove any meta text"""
+    # Remove common prefixes that might appear
+    cleaned = text.strip()
+    for prefix in TRANSLATION_PREFIXES:
+        if cleaned.lower().startswith(prefix.lower()):
+            cleaned = cleaned[len(prefix):].strip()
+
+    # Remove any lines that look like instructions or meta text
+    lines = cleaned.split('\n')
+    content_lines = [line for line in lines if not is_meta_line(line)]
+
+    return ' '.join(content_lines).strip()
+
+
+def parse_sse_delta(line: str) -> Optional[str]:
+    """Return the content delta of one server-sent event line of a streamed completion"""
+    if not line.startswith("data:"):
+        return None
+    data = line[len("data:"):].strip()
+    if not data or data == "[DONE]":
+        return None
+    choices = json.loads(data).get("choices") or []
+    if not choices:
+        return None
+    return (choices[0].get("delta") or {}).get("content")
+
+
+class StreamingTranslationCleaner:
+    """Applies the rules of ``clean_translation`` to streamed text.
+
+    Text is held back while it could still be one of the meta prefixes. The
+    first line is then held until it ends, or until it holds a complete
+    sentence without meta text, after which it is shown as it arrives; a
+    preamble such as "Sure, here is the German text:" thus never reaches
+    the client or the cache. Later lines are released whole once their
+    newline arrives, so trailing notes are dropped the same way as in
+    ``clean_translation``.
+
+    What it shows is a preview: a first line that turns into meta text
+    after its first sentence has already been shown, and blank lines are
+    treated differently. ``CompletionStream`` therefore cleans the whole
+    completion again at the end for the final translation.
+    """
+
+    def __init__(self):
+        self.pending = ""
+        self.prefix_done = False
+        self.first_line = True
+        self.streaming_line = False
+        self.emitted = False
+
+    def feed(self, delta: str) -> str:
+        """Add a streamed delta and return the text that is safe to show now"""
+        self.pending += delta
+        return self._release(final=False)
+
+    def finish(self) -> str:
+        """Return whatever was still held back once the stream has ended"""
+        return self._release(final=True)
+
+    def _release(self, final: bool) -> str:
+        if not self.prefix_done and not self._strip_prefixes(final):
+            return ""
+
+        out = []
+        while True:
+            newline = self.pending.find('\n')
+            if self.streaming_line:
+                line = self.pending if newline == -1 else self.pending[:newline]
+                out.append(line)
+                self.emitted = self.emitted or bool(line)
+                if newline == -1:
+                    self.pending = ""
+                    break
+                self.pending = self.pending[newline + 1:]
+                self.streaming_line = False
+                self.first_line = False
+                continue
+
+            if newline == -1:
+                if final:
+                    out.append(self._complete_line(self.pending))
+                    self.pending = ""
+                elif self.first_line and _SENTENCE_END.search(self.pending) and not is_meta_line(self.pending):
+                    self.streaming_line = True
+                    continue
+                break
+
+            out.append(self._complete_line(self.pending[:newline]))
+            self.pending = self.pending[newline + 1:]
+            self.first_line = False
+
+        text = ''.join(out)
+        return text.rstrip() if final else text
+
+    def _strip_prefixes(self, final: bool) -> bool:
+        stripped = self.pending.lstrip()
+        while True:
+            lowered = stripped.lower()
+            could_grow = any(
+                len(lowered) < len(prefix) and prefix.lower().startswith(lowered)
+                for prefix in TRANSLATION_PREFIXES
+            )
+            if could_grow and not final and '\n' not in stripped:
+                self.pending = stripped
+                return False
+            prefix = next((p for p in TRANSLATION_PREFIXES if lowered.startswith(p.lower())), None)
+            if prefix is None:
+                break
+            stripped = stripped[len(prefix):].lstrip()
+        self.pending = stripped
+        self.prefix_done = True
+        return True
+
+    def _complete_line(self, line: str) -> str:
+        if not line.strip() or is_meta_line(line):
+            return ""
+        separator = ' ' if self.emitted else ''
+        self.emitted = True
+        return separator + (line if separator else line.lstrip())
+
+
+class TranslationError(Exception):
+    """The API answered a translation request with an error status."""
+
+    def __init__(self, status_code: int):
+        super().__init__(f"Translation API returned status {status_code}")
+        self.status_code = status_code
+
+
+@dataclass
+class PendingTranslation:
+    """A translation that needs an API request, and what to do with its result."""
+
+    text: str
+    src_lang: str
+    tgt_lang: str
+    request: Dict
+    # None when the result must not be cached
+    cache_key: Optional[CacheKey]
+
+
+class CompletionStream:
+    """Turns the server-sent event lines of a streamed completion into cleaned text.
+
+    The pieces returned while streaming are a preview; ``text`` is the
+    final translation once ``finish`` was called, the whole completion
+    cleaned by ``clean_translation`` exactly as an unstreamed one.
+    """
+
+    def __init__(self):
+        self.cleaner = StreamingTranslationCleaner()
+        self.deltas: List[str] = []
+        self.shown = False
+        self.text = ""
+        self.started = time.perf_counter()
+
+    def feed_line(self, line: str) -> str:
+        """Text of one event line that is safe to show now"""
+        delta = parse_sse_delta(line) if line else None
+        if not delta:
+            return ""
+        self.deltas.append(delta)
+        return self._show(self.cleaner.feed(delta))
+
+    def finish(self) -> str:
+        piece = self._show(self.cleaner.finish())
+        self.text = clean_translation(''.join(self.deltas))
+        metrics.observe("translation_request", time.perf_counter() - self.started)
+        return piece
+
+    def _show(self, piece: str) -> str:
+        if piece and not self.shown:
+            self.shown = True
+            metrics.observe("translation_first_delta", time.perf_counter() - self.started)
+        return piece
+
 
 class Translation:
-    def __init__(self, config: Config):
+    def __init__(
+        self, config: Config, cache: Optional[TranslationCache] = None, priority: Priority = Priority.LIVE_FINAL
+    ):
         self.config = config
+        self.http_client = get_http_client(config)
+        # Rank of this instance's requests when they wait for rate limit quota
+        self.priority = priority
+        self.cache = cache if cache is not None else create_translation_cache(config)
         self.headers = {
             "Authorization": f"Bearer {self.config.GROQ_API_KEY}",
             "Content-Type": "application/json"
@@ -29,67 +246,238 @@ class Translation:
             "German": "de"
         }
 
-    def translate_text(self, text: str, src_lang: str, tgt_lang: str) -> str:
-        """Translate text using Groq's LLaMA API"""
+    def translate_text(
+        self,
+        text: str,
+        src_lang: str,
+        tgt_lang: str,
+        context: Optional[TranslationContext] = None,
+        raise_errors: bool = False,
+    ) -> str:
+        """Translate text using Groq's LLaMA API
+
+        The request carries the history of ``context``; adding the result to
+        it is up to the caller, in transcript order. Failures come back as
+        bracketed error text, or are raised with ``raise_errors``, an error
+        status as ``TranslationError``.
+        """
+        result = self.immediate_result(text, src_lang, tgt_lang)
+        if result is not None:
+            return result
+
+        try:
+            cache_key, cached = self.get_cached(text, src_lang, tgt_lang, context)
+            if cached is not None:
+                return cached
+            return self.request_translation(text, src_lang, tgt_lang, cache_key, context, raise_errors)
+
+        except Exception as e:
+            if raise_errors:
+                raise
+            return self.error_result(e)
+
+    def request_translation(
+        self,
+        text: str,
+        src_lang: str,
+        tgt_lang: str,
+        cache_key: Optional[CacheKey] = None,
+        context: Optional[TranslationContext] = None,
+        raise_errors: bool = False,
+    ) -> str:
+        """Translate a supported pair through the API, without a cache lookup
+
+        A successful result is stored under ``cache_key``.
+        """
+        pending = self.prepare(text, src_lang, tgt_lang, cache_key, context)
+        with metrics.span("translation_request"):
+            completion = self.http_client.post(
+                self.config.GROQ_TRANSLATION_ENDPOINT,
+                headers=self.headers,
+                json=pending.request,
+                rate_limit=self.rate_limit(pending.request)
+            )
+        if raise_errors and completion.status_code != 200:
+            print(f"Translation error: {completion.text}")
+            raise TranslationError(completion.status_code)
+        translated_text = self.parse_completion(completion)
+        self.record(pending, completion.status_code == 200, translated_text)
+        return translated_text
+
+    def translate_text_stream(
+        self,
+        text: str,
+        src_lang: str,
+        tgt_lang: str,
+        context: Optional[TranslationContext] = None,
+        raise_errors: bool = False,
+    ) -> Generator[str, None, str]:
+        """Translate text and yield the cleaned translation as it is generated
+
+        The pieces are a preview; the generator returns the final
+        translation, which can differ from them where ``clean_translation``
+        drops text that was already shown. Context and errors are handled
+        as in ``translate_text``.
+        """
+        result = self.immediate_result(text, src_lang, tgt_lang)
+        if result is not None:
+            if result:
+                yield result
+            return result
+
+        try:
+            cache_key, cached = self.get_cached(text, src_lang, tgt_lang, context)
+            if cached is not None:
+                yield cached
+                return cached
+
+            pending = self.prepare(text, src_lang, tgt_lang, cache_key, context, stream=True)
+            stream = CompletionStream()
+            completion = self.http_client.post(
+                self.config.GROQ_TRANSLATION_ENDPOINT,
+                headers=self.headers,
+                json=pending.request,
+                stream=True,
+                rate_limit=self.rate_limit(pending.request)
+            )
+            with completion:
+                if completion.status_code != 200:
+                    print(f"Translation error: {completion.text}")
+                    if raise_errors:
+                        raise TranslationError(completion.status_code)
+                    result = f"[Translation error: {completion.status_code}]"
+                    yield result
+                    return result
+
+                # Server-sent events are UTF-8, whatever the content type says
+                completion.encoding = "utf-8"
+                for line in completion.iter_lines(decode_unicode=True):
+                    piece = stream.feed_line(line)
+                    if piece:
+                        yield piece
+                piece = stream.finish()
+                if piece:
+                    yield piece
+                self.record(pending, True, stream.text)
+                return stream.text
+
+        except Exception as e:
+            if raise_errors:
+                raise
+            result = self.error_result(e)
+            yield result
+            return result
+
+    def immediate_result(self, text: str, src_lang: str, tgt_lang: str) -> Optional[str]:
+        """The result of a translation that needs no request, or None if it does"""
         if not text.strip():
             return ""
-            
         if src_lang == tgt_lang:
             return text
-        
-        try:
-            # Get the appropriate translation prompt
-            lang_pair = (src_lang, tgt_lang)
-            if lang_pair in self.translation_prompts:
-                completion = requests.post(
-                    self.config.GROQ_TRANSLATION_ENDPOINT,
-                    headers=self.headers,
-                    json={
-                        "model": self.config.GROQ_TRANSLATION_MODEL,
-                        "messages": [
-                            {"role": "system", "content": self.translation_prompts[lang_pair]},
-                            {"role": "user", "content": text}
-                        ],
-                        "temperature": 0.3,
-                        "max_tokens": 2048
-                    }
-                )
-                
-                if completion.status_code == 200:
-                    translated_text = completion.json()['choices'][0]['message']['content']
-                    return self.clean_translation(translated_text).strip()
-                else:
-                    print(f"Translation error: {completion.text}")
-                    return f"[Translation error: {completion.status_code}]"
-            else:
-                return f"[Unsupported language pair: {src_lang}->{tgt_lang}]"
-                
-        except Exception as e:
-            print(f"Translation error: {e}")
-            return f"[Error: {str(e)}]"
+        if not self.supports(src_lang, tgt_lang):
+            return f"[Unsupported language pair: {src_lang}->{tgt_lang}]"
+        return None
+
+    def prepare(
+        self,
+        text: str,
+        src_lang: str,
+        tgt_lang: str,
+        cache_key: Optional[CacheKey] = None,
+        context: Optional[TranslationContext] = None,
+        stream: bool = False,
+    ) -> PendingTranslation:
+        """Build the request for a supported pair, with the context's history"""
+        history = self.context_messages(context, src_lang, tgt_lang)
+        if history and context.needs_history(src_lang, tgt_lang, text):
+            cache_key = None  # Depends on this conversation's history, not reusable elsewhere
+        request = self.build_request(text, src_lang, tgt_lang, stream=stream, history=history)
+        return PendingTranslation(text, src_lang, tgt_lang, request, cache_key)
+
+    def record(self, pending: PendingTranslation, succeeded: bool, translated_text: str) -> None:
+        """Cache a successful translation; errors and empty results are never kept"""
+        if succeeded and translated_text and pending.cache_key is not None:
+            self.cache.put(pending.cache_key, translated_text)
+
+    @staticmethod
+    def error_result(error: Exception) -> str:
+        print(f"Translation error: {error}")
+        return f"[Error: {str(error)}]"
+
+    def build_request(
+        self,
+        text: str,
+        src_lang: str,
+        tgt_lang: str,
+        stream: bool = False,
+        history: Optional[List[Dict[str, str]]] = None,
+    ) -> Optional[Dict]:
+        """Build the chat completion request body, or None for an unsupported pair
+
+        ``history`` holds earlier turns of the conversation; they go between
+        the system prompt and the text, so the prompt prefix stays the same.
+        """
+        lang_pair = (src_lang, tgt_lang)
+        if lang_pair not in self.translation_prompts:
+            return None
+        return {
+            "model": self.config.GROQ_TRANSLATION_MODEL,
+            "messages": [
+                {"role": "system", "content": self.translation_prompts[lang_pair]},
+                *(history or []),
+                {"role": "user", "content": text}
+            ],
+            "temperature": 0.3,
+            "max_tokens": 2048,
+            "stream": stream
+        }
+
+    def rate_limit(self, request: Dict) -> RateLimit:
+        """Quota a chat completion uses: one request, its prompt and about as many tokens again for the reply"""
+        messages = request["messages"]
+        tokens = sum(estimate_tokens(message["content"]) for message in messages) + estimate_tokens(messages[-1]["content"])
+        return RateLimit(self.config.GROQ_TRANSLATION_MODEL, tokens, self.priority)
+
+    def supports(self, src_lang: str, tgt_lang: str) -> bool:
+        return (src_lang, tgt_lang) in self.translation_prompts
+
+    def get_cached(
+        self, text: str, src_lang: str, tgt_lang: str, context: Optional[TranslationContext] = None
+    ) -> Tuple[Optional[CacheKey], Optional[str]]:
+        """Look up a previous translation of the same normalized text
+
+        Skipped when ``context`` says the translation depends on its history,
+        e.g. for a fragment that continues a sentence: it is then neither
+        reused nor stored.
+        """
+        if self.cache is None or (context is not None and context.needs_history(src_lang, tgt_lang, text)):
+            return None, None
+        cache_key = make_cache_key(text, src_lang, tgt_lang, self.config.GROQ_TRANSLATION_MODEL)
+        cached = self.cache.get(cache_key)
+        metrics.increment("translation_cache_misses" if cached is None else "translation_cache_hits")
+        return cache_key, cached
+
+    def store_cached(self, cache_key: Optional[CacheKey], completion, translated_text: str) -> None:
+        """Remember a successful translation; errors and empty results are never cached"""
+        if cache_key is not None and completion.status_code == 200 and translated_text:
+            self.cache.put(cache_key, translated_text)
+
+    @staticmethod
+    def context_messages(context: Optional[TranslationContext], src_lang: str, tgt_lang: str) -> Optional[List[Dict[str, str]]]:
+        return context.messages(src_lang, tgt_lang) if context is not None else None
+
+    def parse_completion(self, completion) -> str:
+        """Extract and clean the translated text from an API response"""
+        if completion.status_code == 200:
+            translated_text = completion.json()['choices'][0]['message']['content']
+            return self.clean_translation(translated_text).strip()
+        else:
+            print(f"Translation error: {completion.text}")
+            return f"[Translation error: {completion.status_code}]"
 
     def clean_translation(self, text: str) -> str:
         """Clean up translation output to remove any meta text"""
-        # Remove common prefixes that might appear
-        prefixes_to_remove = [
-            "Translation:", "Here's the translation:", "Translated text:",
-            "Here is the translation:", "Arabic translation:", "English translation:",
-            "German translation:", "The translation is:", "Please find the translation below:",
-        ]
-        
-        cleaned = text.strip()
-        for prefix in prefixes_to_remove:
-            if cleaned.lower().startswith(prefix.lower()):
-                cleaned = cleaned[len(prefix):].strip()
-        
-        # Remove any lines that look like instructions or meta text
-        lines = cleaned.split('\n')
-        content_lines = [line for line in lines if not any(
-            indicator in line.lower() for indicator in 
-            ["translate", "translation", "please", "here", "you would like", "text:", "note:"]
-        )]
-        
-        return ' '.join(content_lines).strip()
+        return clean_translation(text)
 
     def get_language_code(self, language_name: str) -> Optional[str]:
         """Get language code from language name"""
@@ -0,0 +1,229 @@
+import re
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from com.mhire.config.config import Config
+from com.mhire.services.translation import Translation
+from com.mhire.services.translation_cache import CacheKey
+from com.mhire.services.translation_context import estimate_tokens
+from com.mhire.utils.metrics import metrics
+
+BATCH_INSTRUCTIONS = (
+    " The input consists of {count} numbered segments, each starting with a marker like [[1]]."
+    " Translate every segment on its own and output each translation on its own line, starting"
+    " with the same marker as its segment. Output exactly {count} marked lines and nothing else."
+)
+
+_SEGMENT_MARKER = re.compile(r"\[\[(\d+)\]\]")
+
+
+def format_batch(texts: List[str]) -> str:
+    """Number the segments so the translations can be matched back to them"""
+    return '\n'.join(f"[[{i}]] {' '.join(text.split())}" for i, text in enumerate(texts, start=1))
+
+
+def split_batch(content: str, count: int) -> Optional[List[str]]:
+    """Split a batched completion into its segments; None unless every marker appears exactly once"""
+    markers = list(_SEGMENT_MARKER.finditer(content))
+    numbers = [int(marker.group(1)) for marker in markers]
+    if numbers != list(range(1, count + 1)):
+        return None
+
+    segments = []
+    for marker, following in zip(markers, markers[1:] + [None]):
+        end = following.start() if following is not None else len(content)
+        segments.append(content[marker.end():end])
+    return segments
+
+
+@dataclass
+class PendingSegment:
+    text: str
+    cache_key: Optional[CacheKey]
+    future: Future
+
+
+class TranslationBatcher:
+    """Packs short segments of the same language pair into one completion request.
+
+    Segments are collected for up to ``TRANSLATION_BATCH_WINDOW_MS`` or until
+    the batch reaches ``TRANSLATION_BATCH_MAX_TOKENS`` (estimated) or
+    ``TRANSLATION_BATCH_MAX_SEGMENTS``, then sent as one numbered request
+    sharing a single system prompt. If the reply cannot be split back into
+    exactly one translation per segment, every segment of the batch is
+    translated on its own instead.
+
+    ``submit`` returns a future, so callers can queue several segments before
+    waiting; ``translate_text`` is the blocking counterpart of
+    ``Translation.translate_text``. ``close`` sends the open batches and
+    stops the dispatcher and workers; segments submitted after it are
+    translated on their own in the calling thread.
+    """
+
+    def __init__(self, config: Config, translation: Translation):
+        self.config = config
+        self.translation = translation
+        self.window = config.TRANSLATION_BATCH_WINDOW_MS / 1000
+        self.max_tokens = config.TRANSLATION_BATCH_MAX_TOKENS
+        self.max_segments = config.TRANSLATION_BATCH_MAX_SEGMENTS
+
+        # Open batches per (source, target) pair, with their flush deadlines
+        self.batches: Dict[Tuple[str, str], List[PendingSegment]] = {}
+        self.deadlines: Dict[Tuple[str, str], float] = {}
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(
+            max_workers=config.HTTP_POOL_MAXSIZE, thread_name_prefix="translation-batch"
+        )
+        self.dispatcher: Optional[threading.Thread] = None
+        self.closed = False
+
+        self.stats_lock = threading.Lock()
+        self.requests = 0
+        self.segments = 0
+        self.fallbacks = 0
+
+    def translate_text(self, text: str, src_lang: str, tgt_lang: str) -> str:
+        return self.submit(text, src_lang, tgt_lang).result()
+
+    def submit(self, text: str, src_lang: str, tgt_lang: str) -> "Future[str]":
+        """Queue a segment for translation and return a future for its translated text"""
+        future: "Future[str]" = Future()
+
+        # Empty text, same language and unsupported pairs need no request
+        if not text.strip() or src_lang == tgt_lang or not self.translation.supports(src_lang, tgt_lang):
+            future.set_result(self.translation.translate_text(text, src_lang, tgt_lang))
+            return future
+
+        cache_key, cached = self.translation.get_cached(text, src_lang, tgt_lang)
+        if cached is not None:
+            future.set_result(cached)
+            return future
+
+        pair = (src_lang, tgt_lang)
+        segment = PendingSegment(text, cache_key, future)
+        with self.condition:
+            if not self.closed:
+                self._ensure_dispatcher()
+                batch = self.batches.setdefault(pair, [])
+                if not batch:
+                    self.deadlines[pair] = time.monotonic() + self.window
+                batch.append(segment)
+
+                batch_tokens = sum(estimate_tokens(pending.text) for pending in batch)
+                if len(batch) >= self.max_segments or batch_tokens >= self.max_tokens:
+                    self._flush(pair)
+                else:
+                    self.condition.notify()
+                return future
+        self._send(pair, [segment])
+        return future
+
+    def close(self) -> None:
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            for pair in list(self.batches):
+                self._flush(pair)
+            self.condition.notify_all()
+        if self.dispatcher is not None:
+            self.dispatcher.join()
+        # Batches already handed to the workers are still sent
+        self.executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, float]:
+        with self.stats_lock:
+            return {
+                "requests": self.requests,
+                "segments": self.segments,
+                "segments_per_request": self.segments / self.requests if self.requests else 0.0,
+                "fallbacks": self.fallbacks,
+            }
+
+    def _ensure_dispatcher(self) -> None:
+        if self.dispatcher is None:
+            self.dispatcher = threading.Thread(target=self._dispatch, name="translation-batcher", daemon=True)
+            self.dispatcher.start()
+
+    def _dispatch(self) -> None:
+        """Flush every batch whose collection window has passed"""
+        with self.condition:
+            while not self.closed:
+                if not self.deadlines:
+                    self.condition.wait()
+                    continue
+
+                now = time.monotonic()
+                for pair, deadline in list(self.deadlines.items()):
+                    if deadline <= now:
+                        self._flush(pair)
+                if self.deadlines:
+                    self.condition.wait(timeout=max(0.0, min(self.deadlines.values()) - now))
+
+    def _flush(self, pair: Tuple[str, str]) -> None:
+        # Called with the condition held
+        batch = self.batches.pop(pair)
+        del self.deadlines[pair]
+        self.executor.submit(self._send, pair, batch)
+
+    def _send(self, pair: Tuple[str, str], batch: List[PendingSegment]) -> None:
+        src_lang, tgt_lang = pair
+        self._count(segments=len(batch))
+        try:
+            if len(batch) == 1:
+                self._count(requests=1)
+                translations = [self._translate_one(batch[0], src_lang, tgt_lang)]
+            else:
+                translations = self._translate_batch(batch, src_lang, tgt_lang)
+            for segment, translated_text in zip(batch, translations):
+                segment.future.set_result(translated_text)
+        except Exception as e:
+            for segment in batch:
+                if not segment.future.done():
+                    segment.future.set_exception(e)
+
+    def _translate_batch(self, batch: List[PendingSegment], src_lang: str, tgt_lang: str) -> List[str]:
+        request = self.translation.build_request(format_batch([segment.text for segment in batch]), src_lang, tgt_lang)
+        request["messages"][0]["content"] += BATCH_INSTRUCTIONS.format(count=len(batch))
+
+        self._count(requests=1)
+        metrics.increment("translation_batched_segments", len(batch))
+        with metrics.span("translation_batch_request"):
+            completion = self.translation.http_client.post(
+                self.config.GROQ_TRANSLATION_ENDPOINT,
+                headers=self.translation.headers,
+                json=request,
+                rate_limit=self.translation.rate_limit(request)
+            )
+        segments = None
+        if completion.status_code == 200:
+            content = completion.json()['choices'][0]['message']['content']
+            segments = split_batch(content, len(batch))
+
+        if segments is None or not all(segment.strip() for segment in segments):
+            # Unusable reply: translate each segment on its own
+            self._count(requests=len(batch), fallbacks=1)
+            metrics.increment("translation_batch_fallbacks")
+            return [self._translate_one(segment, src_lang, tgt_lang) for segment in batch]
+
+        translations = [self.translation.clean_translation(segment).strip() for segment in segments]
+        for segment, translated_text in zip(batch, translations):
+            self.translation.store_cached(segment.cache_key, completion, translated_text)
+        return translations
+
+    def _translate_one(self, segment: PendingSegment, src_lang: str, tgt_lang: str) -> str:
+        # The cache was already looked up in submit
+        try:
+            return self.translation.request_translation(segment.text, src_lang, tgt_lang, segment.cache_key)
+        except Exception as e:
+            print(f"Translation error: {e}")
+            return f"[Error: {str(e)}]"
+
+    def _count(self, requests: int = 0, segments: int = 0, fallbacks: int = 0) -> None:
+        with self.stats_lock:
+            self.requests += requests
+            self.segments += segments
+            self.fallbacks += fallbacks
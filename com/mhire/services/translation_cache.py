@@ -0,0 +1,196 @@
+import abc
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from com.mhire.config.config import Config
+
+# (source language, target language, model, normalized text)
+CacheKey = Tuple[str, str, str, str]
+
+_WHITESPACE = re.compile(r"\s+")
+_EDGE_PUNCTUATION = re.compile(r"^[\W_]+|[\W_]+$")
+_TRAILING_PUNCTUATION = re.compile(r"[\W_]+$")
+
+# Rows of the on-disk cache are pruned by age and count after this many
+# inserts, or this many seconds, whichever comes first
+SQLITE_PRUNE_INSERTS = 100
+SQLITE_PRUNE_SECONDS = 60.0
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace and strip surrounding punctuation so trivial variants share an entry.
+
+    A final question or exclamation mark is kept, as it changes the translation.
+    """
+    text = _WHITESPACE.sub(" ", text).strip()
+    normalized = _EDGE_PUNCTUATION.sub("", text)
+    if not normalized:
+        return text
+    trailing = _TRAILING_PUNCTUATION.search(text)
+    if trailing:
+        if "?" in trailing.group() or "\uff1f" in trailing.group():
+            normalized += "?"
+        elif "!" in trailing.group() or "\uff01" in trailing.group():
+            normalized += "!"
+    return normalized
+
+
+def make_cache_key(text: str, src_lang: str, tgt_lang: str, model: Optional[str]) -> CacheKey:
+    return (src_lang, tgt_lang, model or "", normalize_text(text))
+
+
+class TranslationCache(abc.ABC):
+    """Base class for translation caches; counts hits and misses.
+
+    Backends implement ``_get`` and ``_put``, which are called with
+    ``self.lock`` held.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get(self, key: CacheKey) -> Optional[str]:
+        with self.lock:
+            value = self._get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key: CacheKey, value: str) -> None:
+        with self.lock:
+            self._put(key, value)
+
+    def stats(self) -> Dict[str, float]:
+        with self.lock:
+            hits, misses = self.hits, self.misses
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+    @abc.abstractmethod
+    def _get(self, key: CacheKey) -> Optional[str]:
+        """The value stored under ``key``, or None if it is missing or expired"""
+
+    @abc.abstractmethod
+    def _put(self, key: CacheKey, value: str) -> None:
+        """Store ``value`` under ``key``"""
+
+
+class LRUTranslationCache(TranslationCache):
+    """In-process cache bounded by entry count and entry age."""
+
+    def __init__(self, max_size: int = 1024, ttl: float = 3600.0):
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.entries: "OrderedDict[CacheKey, Tuple[float, str]]" = OrderedDict()
+
+    def _get(self, key: CacheKey) -> Optional[str]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        stored_at, value = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return value
+
+    def _put(self, key: CacheKey, value: str) -> None:
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+
+class SQLiteTranslationCache(TranslationCache):
+    """On-disk cache that survives restarts, bounded by entry age and count.
+
+    Expired rows are never returned; they and the rows over ``max_size``
+    are deleted every ``SQLITE_PRUNE_INSERTS`` inserts or
+    ``SQLITE_PRUNE_SECONDS``, so the table may briefly hold more.
+    """
+
+    def __init__(self, path: str, max_size: int = 100000, ttl: float = 7 * 24 * 3600.0):
+        super().__init__()
+        self.max_size = max_size
+        self.ttl = ttl
+        self.inserts_since_prune = 0
+        self.pruned_at = time.monotonic()
+        import sqlite3  # Only needed when the on-disk cache is selected
+
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        # Commits append to the write-ahead log without waiting for a sync to disk
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS translations ("
+            " src_lang TEXT, tgt_lang TEXT, model TEXT, text TEXT,"
+            " translation TEXT, stored_at REAL,"
+            " PRIMARY KEY (src_lang, tgt_lang, model, text))"
+        )
+        self.connection.execute(
+            "CREATE INDEX IF NOT EXISTS translations_stored_at ON translations (stored_at)"
+        )
+        self.connection.commit()
+
+    def _get(self, key: CacheKey) -> Optional[str]:
+        row = self.connection.execute(
+            "SELECT translation FROM translations"
+            " WHERE src_lang = ? AND tgt_lang = ? AND model = ? AND text = ? AND stored_at >= ?",
+            (*key, time.time() - self.ttl),
+        ).fetchone()
+        return None if row is None else row[0]
+
+    def _put(self, key: CacheKey, value: str) -> None:
+        self.connection.execute(
+            "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+            (*key, value, time.time()),
+        )
+        self.inserts_since_prune += 1
+        if (
+            self.inserts_since_prune >= SQLITE_PRUNE_INSERTS
+            or time.monotonic() - self.pruned_at >= SQLITE_PRUNE_SECONDS
+        ):
+            self._prune()
+        self.connection.commit()
+
+    def _prune(self) -> None:
+        self.connection.execute("DELETE FROM translations WHERE stored_at < ?", (time.time() - self.ttl,))
+        self.connection.execute(
+            "DELETE FROM translations WHERE rowid IN (SELECT rowid FROM translations"
+            " ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_size,),
+        )
+        self.inserts_since_prune = 0
+        self.pruned_at = time.monotonic()
+
+    def close(self) -> None:
+        with self.lock:
+            self._prune()
+            self.connection.commit()
+            self.connection.close()
+
+
+def create_translation_cache(config: Config) -> Optional[TranslationCache]:
+    """Builds the cache selected by TRANSLATION_CACHE: memory, sqlite or none."""
+    backend = config.TRANSLATION_CACHE.lower()
+    if backend == "memory":
+        return LRUTranslationCache(config.TRANSLATION_CACHE_SIZE, config.TRANSLATION_CACHE_TTL)
+    if backend == "sqlite":
+        return SQLiteTranslationCache(
+            config.TRANSLATION_CACHE_PATH, config.TRANSLATION_CACHE_SIZE, config.TRANSLATION_CACHE_TTL
+        )
+    if backend == "none":
+        return None
+    raise ValueError(f"Unknown TRANSLATION_CACHE backend '{config.TRANSLATION_CACHE}'")
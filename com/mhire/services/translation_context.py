@@ -0,0 +1,88 @@
+import re
+import threading
+from typing import Dict, List, Tuple
+
+from com.mhire.config.config import Config
+
+
+# Sentence-final punctuation, possibly followed by closing quotes or brackets
+_SENTENCE_END = re.compile(r"[.!?\u2026\u3002\uff01\uff1f][\"'\u201d\u2019)\]]*$")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count; about four characters per token for the languages we translate"""
+    return len(text) // 4 + 1
+
+
+class TranslationContext:
+    """The last source/translation pairs of one session, sent along as conversation turns.
+
+    Each language pair keeps its own history, so requests read: the system
+    prompt, then earlier fragments and their translations as user and
+    assistant turns, then the current fragment. A fragment cut mid-sentence
+    is thus translated knowing how the sentence began.
+
+    History is capped at ``TRANSLATION_CONTEXT_PAIRS`` pairs and
+    ``TRANSLATION_CONTEXT_MAX_TOKENS`` estimated tokens. Consecutive requests
+    only differ at the end, so provider-side prompt caching can reuse their
+    common prefix; to keep it that way for several requests in a row, the
+    oldest pairs are dropped together down to three quarters of the cap
+    instead of one per request.
+
+    Callers add a pair once its translation is final and every earlier
+    fragment has been added, so the history follows the transcript order
+    even when translations complete out of order.
+    """
+
+    def __init__(self, config: Config):
+        self.max_pairs = config.TRANSLATION_CONTEXT_PAIRS
+        self.max_tokens = config.TRANSLATION_CONTEXT_MAX_TOKENS
+        self.histories: Dict[Tuple[str, str], List[Tuple[str, str]]] = {}
+        self.lock = threading.Lock()
+
+    def messages(self, src_lang: str, tgt_lang: str) -> List[Dict[str, str]]:
+        """Earlier pairs of this language pair as chat messages, oldest first"""
+        with self.lock:
+            history = list(self.histories.get((src_lang, tgt_lang), ()))
+        messages = []
+        for text, translation in history:
+            messages.append({"role": "user", "content": text})
+            messages.append({"role": "assistant", "content": translation})
+        return messages
+
+    def needs_history(self, src_lang: str, tgt_lang: str, text: str) -> bool:
+        """Whether the translation of ``text`` may depend on the history of the pair.
+
+        A fragment that is a whole sentence, after one that ended a sentence
+        too, is translated the same with or without history, so it can be
+        cached; one that continues or leaves open a sentence cannot.
+        """
+        with self.lock:
+            history = self.histories.get((src_lang, tgt_lang))
+            previous = history[-1][0] if history else None
+        if previous is None:
+            return False
+        return not (_SENTENCE_END.search(previous) and _SENTENCE_END.search(text.strip()))
+
+    def add(self, src_lang: str, tgt_lang: str, text: str, translation: str) -> None:
+        if not text.strip() or not translation.strip():
+            return
+        with self.lock:
+            history = self.histories.setdefault((src_lang, tgt_lang), [])
+            history.append((text.strip(), translation.strip()))
+            if len(history) > self.max_pairs or self._tokens(history) > self.max_tokens:
+                self._trim(history)
+
+    def clear(self) -> None:
+        with self.lock:
+            self.histories.clear()
+
+    def _trim(self, history: List[Tuple[str, str]]) -> None:
+        max_pairs = max(1, self.max_pairs * 3 // 4)
+        max_tokens = self.max_tokens * 3 // 4
+        while history and (len(history) > max_pairs or self._tokens(history) > max_tokens):
+            del history[0]
+
+    @staticmethod
+    def _tokens(history: List[Tuple[str, str]]) -> int:
+        return sum(estimate_tokens(text) + estimate_tokens(translation) for text, translation in history)
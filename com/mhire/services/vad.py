@@ -1,12 +1,16 @@
 import bisect
+import contextlib
 import functools
 import os
+import queue
+import threading
 
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 
+from com.mhire.utils.metrics import metrics
 from com.mhire.utils.utils import get_assets_path
 
 
@@ -21,6 +25,41 @@ class VadOptions:
     speech_pad_ms: int = 400
 
 
+@dataclass
+class VadRuntimeOptions:
+    """ONNX Runtime settings of the VAD sessions."""
+
+    intra_op_num_threads: int = 1
+    inter_op_num_threads: int = 1
+    enable_cpu_mem_arena: bool = False
+    # disabled, basic, extended or all
+    graph_optimization: str = "all"
+    # Where graph-optimized models are saved and loaded from; None to always optimize at load
+    optimized_model_dir: Optional[str] = None
+    pool_size: int = 2
+
+
+_runtime_options = VadRuntimeOptions()
+
+
+def configure_vad(config) -> None:
+    """Apply the VAD runtime settings of ``config`` to sessions created from now on"""
+    global _runtime_options
+    runtime_options = VadRuntimeOptions(
+        intra_op_num_threads=config.VAD_INTRA_OP_THREADS,
+        inter_op_num_threads=config.VAD_INTER_OP_THREADS,
+        enable_cpu_mem_arena=config.VAD_CPU_MEM_ARENA,
+        graph_optimization=config.VAD_GRAPH_OPTIMIZATION,
+        optimized_model_dir=config.VAD_OPTIMIZED_MODEL_DIR or None,
+        pool_size=config.VAD_POOL_SIZE,
+    )
+    if runtime_options == _runtime_options:
+        return
+    _runtime_options = runtime_options
+    get_vad_model.cache_clear()
+    _create_vad_pool.cache_clear()
+
+
 def get_speech_timestamps(
     audio: np.ndarray,
     vad_options: Optional[VadOptions] = None,
@@ -31,37 +70,63 @@ def get_speech_timestamps(
     if vad_options is None:
         vad_options = VadOptions(**kwargs)
 
-    threshold = vad_options.threshold
-    neg_threshold = vad_options.neg_threshold
-    min_speech_duration_ms = vad_options.min_speech_duration_ms
-    max_speech_duration_s = vad_options.max_speech_duration_s
-    min_silence_duration_ms = vad_options.min_silence_duration_ms
-    window_size_samples = 512
-    speech_pad_ms = vad_options.speech_pad_ms
-    min_speech_samples = sampling_rate * min_speech_duration_ms / 1000
-    speech_pad_samples = sampling_rate * speech_pad_ms / 1000
-    max_speech_samples = (
-        sampling_rate * max_speech_duration_s
-        - window_size_samples
-        - 2 * speech_pad_samples
-    )
-    min_silence_samples = sampling_rate * min_silence_duration_ms / 1000
-    min_silence_samples_at_max_speech = sampling_rate * 98 / 1000
-
-    audio_length_samples = len(audio)
+    with metrics.span("vad_speech_timestamps"):
+        speech_probs = get_speech_probs(audio)
+        return speech_probs_to_timestamps(
+            speech_probs, len(audio), vad_options, sampling_rate
+        )
 
-    model = get_vad_model()
 
+def get_speech_probs(audio: np.ndarray, window_size_samples: int = 512) -> np.ndarray:
+    """Runs the VAD model over a whole recording and returns one probability per window."""
     padded_audio = np.pad(
         audio, (0, window_size_samples - audio.shape[0] % window_size_samples)
     )
-    speech_probs = model(padded_audio.reshape(1, -1)).squeeze(0)
+    with get_vad_pool().checkout() as model:
+        return model(padded_audio.reshape(1, -1)).squeeze(0)
+
+
+class _TimestampParams:
+    """Sample-domain thresholds shared by both timestamp backends and ``VadIterator``."""
+
+    window_size_samples = 512
+
+    def __init__(self, vad_options: VadOptions, sampling_rate: int):
+        self.threshold = vad_options.threshold
+        self.neg_threshold = vad_options.neg_threshold
+        if self.neg_threshold is None:
+            self.neg_threshold = max(self.threshold - 0.15, 0.01)
+        self.min_speech_samples = sampling_rate * vad_options.min_speech_duration_ms / 1000
+        self.speech_pad_samples = sampling_rate * vad_options.speech_pad_ms / 1000
+        self.max_speech_samples = (
+            sampling_rate * vad_options.max_speech_duration_s
+            - self.window_size_samples
+            - 2 * self.speech_pad_samples
+        )
+        self.min_silence_samples = sampling_rate * vad_options.min_silence_duration_ms / 1000
+        self.min_silence_samples_at_max_speech = sampling_rate * 98 / 1000
+
+
+def speech_probs_to_timestamps(
+    speech_probs: np.ndarray,
+    audio_length_samples: int,
+    vad_options: VadOptions,
+    sampling_rate: int = 16000,
+) -> List[dict]:
+    """Turns per-window speech probabilities into padded speech segments."""
+    params = _TimestampParams(vad_options, sampling_rate)
+    threshold = params.threshold
+    neg_threshold = params.neg_threshold
+    window_size_samples = params.window_size_samples
+    min_speech_samples = params.min_speech_samples
+    speech_pad_samples = params.speech_pad_samples
+    max_speech_samples = params.max_speech_samples
+    min_silence_samples = params.min_silence_samples
+    min_silence_samples_at_max_speech = params.min_silence_samples_at_max_speech
 
     triggered = False
     speeches = []
     current_speech = {}
-    if neg_threshold is None:
-        neg_threshold = max(threshold - 0.15, 0.01)
 
     # to save potential segment end (and tolerate some silence)
     temp_end = 0
@@ -152,6 +217,237 @@ def get_speech_timestamps(
     return speeches
 
 
+def speech_probs_to_timestamps_array(
+    speech_probs: np.ndarray,
+    audio_length_samples: int,
+    vad_options: VadOptions,
+    sampling_rate: int = 16000,
+) -> np.ndarray:
+    """Vectorized equivalent of ``speech_probs_to_timestamps``.
+
+    Threshold crossings and silence runs are located with array operations,
+    so the cost no longer grows with a Python loop over every window. Only
+    segments longer than ``max_speech_duration_s`` are split with the scalar
+    state machine, one segment at a time. Returns an ``(N, 2)`` int array.
+    """
+    params = _TimestampParams(vad_options, sampling_rate)
+    window_size_samples = params.window_size_samples
+
+    if params.neg_threshold > params.threshold:
+        # A window can then be speech and silence at once, which the run
+        # detection below does not model; use the reference loop instead.
+        speeches = speech_probs_to_timestamps(
+            speech_probs, audio_length_samples, vad_options, sampling_rate
+        )
+        return np.array(
+            [[speech["start"], speech["end"]] for speech in speeches], dtype=np.int64
+        ).reshape(-1, 2)
+
+    speech_probs = np.asarray(speech_probs).reshape(-1)
+    num_windows = speech_probs.shape[0]
+    is_speech = speech_probs >= params.threshold
+    speech_idx = np.flatnonzero(is_speech)
+    if not speech_idx.size:
+        return np.zeros((0, 2), dtype=np.int64)
+
+    # Last speech window at or before each window; a silence run starts at the
+    # first window below neg_threshold after it (the "temp_end" of the loop).
+    last_speech = np.maximum.accumulate(
+        np.where(is_speech, np.arange(num_windows), -1)
+    )
+    silence_idx = np.flatnonzero((speech_probs < params.neg_threshold) & (last_speech >= 0))
+    silence_group = last_speech[silence_idx]
+    group_start = np.empty(silence_idx.shape, dtype=bool)
+    group_start[:1] = True
+    group_start[1:] = silence_group[1:] != silence_group[:-1]
+    temp_end_idx = silence_idx[group_start][np.cumsum(group_start) - 1]
+
+    # A segment ends at the first silent window of a run that is long enough
+    long_silence = np.flatnonzero(
+        (silence_idx - temp_end_idx) * window_size_samples >= params.min_silence_samples
+    )
+    first_in_group = np.empty(long_silence.shape, dtype=bool)
+    first_in_group[:1] = True
+    first_in_group[1:] = silence_group[long_silence[1:]] != silence_group[long_silence[:-1]]
+    long_silence = long_silence[first_in_group]
+    end_idx = silence_idx[long_silence]
+    end_group = silence_group[long_silence]
+    end_samples = temp_end_idx[long_silence] * window_size_samples
+
+    # Each segment starts at the first speech window after the previous end
+    next_speech = np.searchsorted(speech_idx, end_idx, side="right")
+    start_idx = np.concatenate(
+        [speech_idx[:1], speech_idx[next_speech[next_speech < speech_idx.size]]]
+    )
+
+    last_window_idx = np.append(end_idx, num_windows - 1)[: start_idx.size]
+    too_long = (last_window_idx - start_idx) * window_size_samples > params.max_speech_samples
+
+    if too_long.any():
+        first_long = int(np.argmax(too_long))
+        speeches = _segments_from_bounds(
+            start_idx[:first_long] * window_size_samples,
+            end_samples[:first_long],
+            params,
+        )
+        speeches.extend(
+            _walk_speech_segments(
+                speech_probs,
+                int(start_idx[first_long]),
+                speech_idx,
+                end_idx,
+                end_group,
+                end_samples,
+                audio_length_samples,
+                params,
+            )
+        )
+        speeches = np.array(speeches, dtype=np.int64).reshape(-1, 2)
+    else:
+        speeches = _segments_from_bounds(
+            start_idx[: end_idx.size] * window_size_samples, end_samples, params
+        )
+        if start_idx.size > end_idx.size:
+            open_start = int(start_idx[-1]) * window_size_samples
+            if audio_length_samples - open_start > params.min_speech_samples:
+                speeches.append((open_start, audio_length_samples))
+        speeches = np.array(speeches, dtype=np.int64).reshape(-1, 2)
+
+    return _pad_speech_timestamps(speeches, params.speech_pad_samples, audio_length_samples)
+
+
+def _segments_from_bounds(
+    starts: np.ndarray, ends: np.ndarray, params: _TimestampParams
+) -> List[Tuple[int, int]]:
+    keep = (ends - starts) > params.min_speech_samples
+    return list(zip(starts[keep].tolist(), ends[keep].tolist()))
+
+
+def _walk_speech_segments(
+    speech_probs: np.ndarray,
+    start_window: int,
+    speech_idx: np.ndarray,
+    end_idx: np.ndarray,
+    end_group: np.ndarray,
+    end_samples: np.ndarray,
+    audio_length_samples: int,
+    params: _TimestampParams,
+) -> List[Tuple[int, int]]:
+    """Jumps from segment to segment, splitting the ones that run too long."""
+    window_size_samples = params.window_size_samples
+    num_windows = speech_probs.shape[0]
+    speeches = []
+
+    i = start_window
+    while True:
+        j = np.searchsorted(speech_idx, i)
+        if j == speech_idx.size:
+            return speeches
+        start = int(speech_idx[j])
+
+        # The first segment end whose silence run follows speech in this segment
+        k = np.searchsorted(end_group, start)
+        last_window = int(end_idx[k]) if k < end_idx.size else num_windows - 1
+
+        if (last_window - start) * window_size_samples > params.max_speech_samples:
+            split, resume = _split_long_speech(
+                speech_probs, start, audio_length_samples, params
+            )
+            speeches.extend(split)
+            if resume is None:
+                return speeches
+            i = resume + 1
+        elif k < end_idx.size:
+            if end_samples[k] - start * window_size_samples > params.min_speech_samples:
+                speeches.append((start * window_size_samples, int(end_samples[k])))
+            i = last_window + 1
+        else:
+            if audio_length_samples - start * window_size_samples > params.min_speech_samples:
+                speeches.append((start * window_size_samples, audio_length_samples))
+            return speeches
+
+
+def _split_long_speech(
+    speech_probs: np.ndarray,
+    start_window: int,
+    audio_length_samples: int,
+    params: _TimestampParams,
+) -> Tuple[List[Tuple[int, int]], Optional[int]]:
+    """Runs the scalar state machine from a segment start until speech stops.
+
+    Returns the segments found and the window at which the detector went
+    back to silence, or ``None`` if speech lasted until the end of the audio.
+    """
+    window_size_samples = params.window_size_samples
+    speeches = []
+    current_start = start_window * window_size_samples
+    temp_end = 0
+    prev_end = next_start = 0
+
+    for i in range(start_window + 1, speech_probs.shape[0]):
+        speech_prob = speech_probs[i]
+        position = window_size_samples * i
+
+        if (speech_prob >= params.threshold) and temp_end:
+            temp_end = 0
+            if next_start < prev_end:
+                next_start = position
+
+        if position - current_start > params.max_speech_samples:
+            if prev_end:
+                speeches.append((current_start, prev_end))
+                if next_start < prev_end:
+                    return speeches, i
+                current_start = next_start
+                prev_end = next_start = temp_end = 0
+            else:
+                speeches.append((current_start, position))
+                return speeches, i
+
+        if speech_prob < params.neg_threshold:
+            if not temp_end:
+                temp_end = position
+            if position - temp_end > params.min_silence_samples_at_max_speech:
+                prev_end = temp_end
+            if position - temp_end < params.min_silence_samples:
+                continue
+            if temp_end - current_start > params.min_speech_samples:
+                speeches.append((current_start, temp_end))
+            return speeches, i
+
+    if audio_length_samples - current_start > params.min_speech_samples:
+        speeches.append((current_start, audio_length_samples))
+    return speeches, None
+
+
+def _pad_speech_timestamps(
+    speeches: np.ndarray, speech_pad_samples: float, audio_length_samples: int
+) -> np.ndarray:
+    if not speeches.size:
+        return speeches
+
+    starts = speeches[:, 0].astype(np.float64)
+    ends = speeches[:, 1].astype(np.float64)
+    silence = speeches[1:, 0] - speeches[:-1, 1]
+    short_gap = silence < 2 * speech_pad_samples
+    half_gap = silence // 2
+
+    starts[0] = max(0, starts[0] - speech_pad_samples)
+    ends[:-1] = np.where(
+        short_gap,
+        ends[:-1] + half_gap,
+        np.minimum(audio_length_samples, ends[:-1] + speech_pad_samples),
+    )
+    starts[1:] = np.where(
+        short_gap,
+        np.maximum(0, starts[1:] - half_gap),
+        np.maximum(0, starts[1:] - speech_pad_samples),
+    )
+    ends[-1] = min(audio_length_samples, ends[-1] + speech_pad_samples)
+
+    return np.stack([starts, ends], axis=1).astype(np.int64)
+
+
 def collect_chunks(
     audio: np.ndarray, chunks: List[dict], sampling_rate: int = 16000
 ) -> Tuple[List[np.ndarray], List[Dict[str, int]]]:
@@ -213,16 +509,38 @@ class SpeechTimestampsMap:
         )
 
 
-@functools.lru_cache
-def get_vad_model():
-    """Returns the VAD model instance."""
+def _load_vad_model(runtime_options: Optional[VadRuntimeOptions] = None) -> "SileroVADModel":
     encoder_path = os.path.join(get_assets_path(), "silero_encoder_v5.onnx")
     decoder_path = os.path.join(get_assets_path(), "silero_decoder_v5.onnx")
-    return SileroVADModel(encoder_path, decoder_path)
+    return SileroVADModel(encoder_path, decoder_path, runtime_options or _runtime_options)
+
+
+@functools.lru_cache
+def get_vad_model():
+    """Returns a standalone VAD model instance, for single-threaded use."""
+    return _load_vad_model()
+
+
+_vad_pool_lock = threading.Lock()
+
+
+@functools.lru_cache
+def _create_vad_pool():
+    return VadSessionPool(_runtime_options)
+
+
+def get_vad_pool():
+    """Returns the pool of VAD sessions shared by all streams.
+
+    Created on first use; callers arriving while a background warm-up is
+    still creating it wait for that pool instead of building another.
+    """
+    with _vad_pool_lock:
+        return _create_vad_pool()
 
 
 class SileroVADModel:
-    def __init__(self, encoder_path, decoder_path):
+    def __init__(self, encoder_path, decoder_path, runtime_options: Optional[VadRuntimeOptions] = None):
         try:
             import onnxruntime
         except ImportError as e:
@@ -230,22 +548,78 @@ class SileroVADModel:
                 "Applying the VAD filter requires the onnxruntime package"
             ) from e
 
+        if runtime_options is None:
+            runtime_options = VadRuntimeOptions()
+        self.encoder_session = self._create_session(onnxruntime, encoder_path, runtime_options)
+        self.decoder_session = self._create_session(onnxruntime, decoder_path, runtime_options)
+
+    @staticmethod
+    def _create_session(onnxruntime, model_path: str, runtime_options: VadRuntimeOptions):
         opts = onnxruntime.SessionOptions()
-        opts.inter_op_num_threads = 1
-        opts.intra_op_num_threads = 1
-        opts.enable_cpu_mem_arena = False
+        opts.inter_op_num_threads = runtime_options.inter_op_num_threads
+        opts.intra_op_num_threads = runtime_options.intra_op_num_threads
+        opts.enable_cpu_mem_arena = runtime_options.enable_cpu_mem_arena
         opts.log_severity_level = 4
 
-        self.encoder_session = onnxruntime.InferenceSession(
-            encoder_path,
-            providers=["CPUExecutionProvider"],
-            sess_options=opts,
-        )
-        self.decoder_session = onnxruntime.InferenceSession(
-            decoder_path,
-            providers=["CPUExecutionProvider"],
-            sess_options=opts,
+        levels = {
+            "disabled": onnxruntime.GraphOptimizationLevel.ORT_DISABLE_ALL,
+            "basic": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+            "extended": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+            "all": onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL,
+        }
+        if runtime_options.graph_optimization not in levels:
+            raise ValueError(
+                f"Unknown graph optimization level: {runtime_options.graph_optimization}"
+            )
+        opts.graph_optimization_level = levels[runtime_options.graph_optimization]
+
+        if not runtime_options.optimized_model_dir or runtime_options.graph_optimization == "disabled":
+            return onnxruntime.InferenceSession(
+                model_path, providers=["CPUExecutionProvider"], sess_options=opts
+            )
+
+        # Optimizing takes part of the load time; reuse the result of an
+        # earlier run with the same level and runtime version when there is one
+        name = os.path.splitext(os.path.basename(model_path))[0]
+        cached_path = os.path.join(
+            runtime_options.optimized_model_dir,
+            f"{name}.{runtime_options.graph_optimization}.ort{onnxruntime.__version__}.onnx",
         )
+        if os.path.exists(cached_path):
+            level = opts.graph_optimization_level
+            opts.graph_optimization_level = levels["disabled"]
+            try:
+                return onnxruntime.InferenceSession(
+                    cached_path, providers=["CPUExecutionProvider"], sess_options=opts
+                )
+            except Exception as e:
+                print(f"Could not load optimized VAD model {cached_path}, optimizing again: {e}")
+                opts.graph_optimization_level = level
+
+        # Written under a name of its own and renamed when complete, so other
+        # processes starting at the same time never load a partial file
+        os.makedirs(runtime_options.optimized_model_dir, exist_ok=True)
+        temp_path = f"{cached_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        opts.optimized_model_filepath = temp_path
+        try:
+            session = onnxruntime.InferenceSession(
+                model_path, providers=["CPUExecutionProvider"], sess_options=opts
+            )
+            try:
+                os.replace(temp_path, cached_path)
+            except OSError as e:
+                print(f"Could not save optimized VAD model {cached_path}: {e}")
+        finally:
+            with contextlib.suppress(OSError):
+                os.remove(temp_path)
+        return session
+
+    @staticmethod
+    def get_initial_states(batch_size: int, context_size_samples: int = 64):
+        """Returns zeroed decoder state and audio context for a new stream."""
+        state = np.zeros((2, batch_size, 128), dtype="float32")
+        context = np.zeros((batch_size, context_size_samples), dtype="float32")
+        return state, context
 
     def __call__(
         self, audio: np.ndarray, num_samples: int = 512, context_size_samples: int = 64
@@ -259,11 +633,7 @@ class SileroVADModel:
 
         batch_size = audio.shape[0]
 
-        state = np.zeros((2, batch_size, 128), dtype="float32")
-        context = np.zeros(
-            (batch_size, context_size_samples),
-            dtype="float32",
-        )
+        state, context = self.get_initial_states(batch_size, context_size_samples)
 
         batched_audio = audio.reshape(batch_size, -1, num_samples)
         context = batched_audio[..., -context_size_samples:]
@@ -271,7 +641,54 @@ class SileroVADModel:
         context = np.roll(context, 1, 1)
         batched_audio = np.concatenate([context, batched_audio], 2)
 
-        batched_audio = batched_audio.reshape(-1, num_samples + context_size_samples)
+        with metrics.span("vad_model"):
+            encoder_output = self._encode(batched_audio)
+            out, _ = self._decode(encoder_output, state)
+        return out
+
+    def stream(
+        self,
+        audio: np.ndarray,
+        state: np.ndarray,
+        context: np.ndarray,
+        num_samples: int = 512,
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Runs the next windows of a live stream.
+
+        Unlike ``__call__``, the decoder state and the trailing audio context
+        are taken from the previous call and returned for the next one, so
+        every sample is encoded and decoded exactly once.
+        """
+        assert (
+            audio.ndim == 2
+        ), "Input should be a 2D array with size (batch_size, num_samples)"
+        assert (
+            audio.shape[1] % num_samples == 0
+        ), "Input size should be a multiple of num_samples"
+
+        batch_size = audio.shape[0]
+        context_size_samples = context.shape[1]
+
+        windows = audio.reshape(batch_size, -1, num_samples)
+        contexts = np.concatenate(
+            [context[:, None, :], windows[:, :-1, -context_size_samples:]], axis=1
+        )
+        batched_audio = np.concatenate([contexts, windows], 2)
+
+        with metrics.span("vad_model_stream"):
+            encoder_output = self._encode(batched_audio)
+            out, state = self._decode(encoder_output, state)
+        return out, state, windows[:, -1, -context_size_samples:].copy()
+
+    def warm_up(self) -> None:
+        """Runs one silent window so the first real call does not pay for allocation."""
+        state, context = self.get_initial_states(batch_size=1)
+        window = np.zeros((1, 1, context.shape[1] + 512), dtype=np.float32)
+        self._decode(self._encode(window), state)
+
+    def _encode(self, batched_audio: np.ndarray) -> np.ndarray:
+        batch_size = batched_audio.shape[0]
+        batched_audio = batched_audio.reshape(-1, batched_audio.shape[-1])
 
         encoder_batch_size = 10000
         num_segments = batched_audio.shape[0]
@@ -283,8 +700,11 @@ class SileroVADModel:
             encoder_outputs.append(encoder_output)
 
         encoder_output = np.concatenate(encoder_outputs, axis=0)
-        encoder_output = encoder_output.reshape(batch_size, -1, 128)
+        return encoder_output.reshape(batch_size, -1, 128)
 
+    def _decode(
+        self, encoder_output: np.ndarray, state: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
         decoder_outputs = []
         for window in np.split(encoder_output, encoder_output.shape[1], axis=1):
             out, state = self.decoder_session.run(
@@ -293,7 +713,388 @@ class SileroVADModel:
             decoder_outputs.append(out)
 
         out = np.stack(decoder_outputs, axis=1).squeeze(-1)
-        return out
+        return out, state
+
+
+class VadSessionPool:
+    """Pre-warmed VAD models that concurrent streams check out and return.
+
+    ``checkout`` blocks while every model is in use. The models hold no
+    stream state, so a stream may use a different one on every call.
+    """
+
+    def __init__(self, runtime_options: Optional[VadRuntimeOptions] = None):
+        if runtime_options is None:
+            runtime_options = VadRuntimeOptions()
+        self.size = max(1, runtime_options.pool_size)
+        self.models: "queue.LifoQueue[SileroVADModel]" = queue.LifoQueue()
+        for _ in range(self.size):
+            model = _load_vad_model(runtime_options)
+            model.warm_up()
+            self.models.put(model)
+
+    @contextlib.contextmanager
+    def checkout(self) -> Iterator[SileroVADModel]:
+        model = self.models.get()
+        try:
+            yield model
+        finally:
+            self.models.put(model)
+
+
+class VadIterator:
+    """Streaming speech detector that emits speech start and end events.
+
+    Audio can be fed in blocks of any size. Complete 512-sample windows are
+    passed to ``SileroVADModel.stream`` and the remainder is kept for the next
+    call. Event positions are absolute sample indices, counted from the last
+    reset.
+
+    With a ``scheduler``, the model runs in the ``BatchedVadScheduler``
+    shared with other streams instead, batched with the windows they feed at
+    the same time; ``close`` gives its slot back. When every slot is taken,
+    the iterator falls back to the shared session pool.
+    """
+
+    window_size_samples = 512
+
+    def __init__(
+        self,
+        vad_options: Optional[VadOptions] = None,
+        sampling_rate: int = 16000,
+        model: Optional["SileroVADModel"] = None,
+        scheduler: Optional["BatchedVadScheduler"] = None,
+    ):
+        if vad_options is None:
+            vad_options = VadOptions()
+
+        self.scheduler = None
+        if scheduler is not None and model is None:
+            try:
+                self.stream_id = scheduler.add_stream()
+                self.scheduler = scheduler
+            except RuntimeError:
+                pass
+
+        # Without a dedicated model or scheduler, every call runs on a model from the shared pool
+        self.model = model
+        self.pool = get_vad_pool() if model is None and self.scheduler is None else None
+        self.sampling_rate = sampling_rate
+        self.set_options(vad_options)
+
+        self.reset()
+
+    def set_options(self, vad_options: VadOptions) -> None:
+        """Applies new detection options; they take effect from the next window."""
+        params = _TimestampParams(vad_options, self.sampling_rate)
+        self.threshold = params.threshold
+        self.neg_threshold = params.neg_threshold
+        self.min_speech_samples = params.min_speech_samples
+        self.min_silence_samples = params.min_silence_samples
+        self.min_silence_samples_at_max_speech = params.min_silence_samples_at_max_speech
+        self.speech_pad_samples = int(params.speech_pad_samples)
+        self.max_speech_samples = params.max_speech_samples
+
+    def reset(self, start_sample: int = 0) -> None:
+        """Clears the model state and the speech detection state.
+
+        Event positions are counted from ``start_sample``.
+        """
+        self.state, self.context = SileroVADModel.get_initial_states(batch_size=1)
+        self.pending = np.zeros(0, dtype=np.float32)
+        if self.scheduler is not None:
+            self.scheduler.reset_stream(self.stream_id)
+        self.triggered = False
+        # Whether the start of the current speech has been emitted; it is
+        # held back until the speech is known to last min_speech_duration_ms
+        self.start_emitted = False
+        self.temp_end = 0
+        self.speech_start = 0
+        # Last silence long enough to split at, and where speech resumed after it
+        self.prev_end = self.next_start = 0
+        self.last_end = 0
+        self.current_sample = start_sample
+
+    def __call__(self, audio: np.ndarray) -> List[dict]:
+        """Feeds a block of audio and returns the events it completed.
+
+        Each event is either ``{"start": sample}`` or ``{"end": sample}``,
+        with speech padding already applied.
+        """
+        if self.scheduler is not None:
+            return self.process_probs(self.scheduler.process(self.stream_id, audio))
+
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        if self.pending.size:
+            audio = np.concatenate([self.pending, audio])
+
+        num_windows = audio.shape[0] // self.window_size_samples
+        num_samples = num_windows * self.window_size_samples
+        self.pending = audio[num_samples:].copy()
+        if not num_windows:
+            return []
+
+        session = self.pool.checkout() if self.pool is not None else contextlib.nullcontext(self.model)
+        with session as model:
+            speech_probs, self.state, self.context = model.stream(
+                audio[:num_samples].reshape(1, -1), self.state, self.context
+            )
+        return self.process_probs(speech_probs[0])
+
+    def close(self) -> None:
+        """Releases the scheduler slot of this stream; the iterator is not used afterwards."""
+        if self.scheduler is not None:
+            self.scheduler.remove_stream(self.stream_id)
+
+    def process_probs(self, speech_probs: np.ndarray) -> List[dict]:
+        """Advances the detector over speech probabilities computed elsewhere.
+
+        Used when the model runs outside the iterator, e.g. in a
+        ``BatchedVadScheduler`` shared by many streams.
+        """
+        events = []
+        for speech_prob in np.asarray(speech_probs).reshape(-1):
+            events.extend(self._process_window(speech_prob))
+        return events
+
+    def _process_window(self, speech_prob: float) -> List[dict]:
+        # Same decisions as speech_probs_to_timestamps, made one window at a time
+        window_start = self.current_sample
+        self.current_sample += self.window_size_samples
+
+        if speech_prob >= self.threshold and self.temp_end:
+            self.temp_end = 0
+            if self.next_start < self.prev_end:
+                self.next_start = window_start
+
+        if speech_prob >= self.threshold and not self.triggered:
+            self._trigger(window_start)
+            return self._confirm_start()
+
+        events = []
+        if (
+            self.triggered
+            and window_start - self.speech_start > self.max_speech_samples
+        ):
+            if self.prev_end:
+                # Split at the last pause instead of in the middle of a word
+                resumed = self.next_start >= self.prev_end
+                pad = self.speech_pad_samples
+                if resumed:
+                    pad = min(pad, (self.next_start - self.prev_end) // 2)
+                events.extend(self._end(self.prev_end + pad))
+                if resumed:
+                    self._trigger(self.next_start)
+                self.prev_end = self.next_start = self.temp_end = 0
+            else:
+                # No pause to split at: cut here, without padding into the speech that follows
+                self.prev_end = self.next_start = self.temp_end = 0
+                return self._end(window_start)
+
+        if speech_prob < self.neg_threshold and self.triggered:
+            if not self.temp_end:
+                self.temp_end = window_start
+            if window_start - self.temp_end > self.min_silence_samples_at_max_speech:
+                self.prev_end = self.temp_end
+            if window_start - self.temp_end >= self.min_silence_samples:
+                speech_end = self.temp_end
+                self.prev_end = self.next_start = self.temp_end = 0
+                if speech_end - self.speech_start > self.min_speech_samples:
+                    events.extend(self._end(speech_end + self.speech_pad_samples))
+                else:
+                    # Too short to keep; its start was never emitted
+                    self.triggered = False
+                return events
+
+        events.extend(self._confirm_start())
+        return events
+
+    def _trigger(self, speech_start: int) -> None:
+        self.triggered = True
+        self.start_emitted = False
+        self.speech_start = speech_start
+
+    def _confirm_start(self) -> List[dict]:
+        """Emits the start of the current speech once it cannot end up too short."""
+        if not self.triggered or self.start_emitted:
+            return []
+        # The speech ends at the current silence, or later if none has begun
+        earliest_end = self.temp_end or self.current_sample
+        if earliest_end - self.speech_start <= self.min_speech_samples:
+            return []
+        return self._start()
+
+    def _start(self) -> List[dict]:
+        self.start_emitted = True
+        # Padding never reaches back into the previous speech
+        start = max(self.speech_start - self.speech_pad_samples, self.last_end)
+        return [{"start": int(start)}]
+
+    def _end(self, end: int) -> List[dict]:
+        """Ends the current speech at ``end``, emitting its start first if still held back."""
+        events = [] if self.start_emitted else self._start()
+        self.triggered = False
+        self.start_emitted = False
+        self.last_end = int(end)
+        events.append({"end": int(end)})
+        return events
+
+
+class BatchedVadScheduler:
+    """Runs the VAD for many concurrent streams in shared ONNX batches.
+
+    Each stream owns a slot holding its decoder state and audio context.
+    Pending windows of all streams go through one encoder run, and the
+    decoder is run once per timestep over every stream that still has a
+    window at that step, instead of once per window per stream.
+
+    Streams are driven either by ``feed`` and ``step`` from one thread, or
+    by ``process`` from one thread per stream: a caller arriving while a
+    step runs waits for it, and the callers that queued up meanwhile are
+    then run together in the next step. Stream ids are never reused, so a
+    late call for a removed stream fails instead of touching the slot of
+    another one.
+    """
+
+    window_size_samples = 512
+    context_size_samples = 64
+
+    def __init__(self, max_streams: int = 64, model: Optional["SileroVADModel"] = None):
+        self.model = model
+        self.pool = get_vad_pool() if model is None else None
+        self.max_streams = max_streams
+        self.state, self.context = SileroVADModel.get_initial_states(
+            max_streams, self.context_size_samples
+        )
+        # Stream id -> slot, and the audio of each slot waiting for a step
+        self.slots: Dict[int, int] = {}
+        self.buffers: Dict[int, np.ndarray] = {}
+        self.free_slots = list(range(max_streams - 1, -1, -1))
+        self.next_stream = 0
+        # Probabilities computed for ``process`` callers by another caller's step
+        self.results: Dict[int, List[np.ndarray]] = {}
+        # Guards the stream tables and buffers; step_lock serializes the model runs
+        self.lock = threading.Lock()
+        self.step_lock = threading.Lock()
+
+    def add_stream(self) -> int:
+        """Reserves a slot for a new stream and returns its id."""
+        with self.step_lock, self.lock:
+            if not self.free_slots:
+                raise RuntimeError(f"All {self.max_streams} VAD stream slots are in use")
+            stream = self.next_stream
+            self.next_stream += 1
+            self.slots[stream] = self.free_slots.pop()
+            self._clear(stream)
+            return stream
+
+    def reset_stream(self, stream: int) -> None:
+        """Clears the model state and pending audio of a stream."""
+        with self.step_lock, self.lock:
+            self._clear(stream)
+
+    def remove_stream(self, stream: int) -> None:
+        """Releases the slot of a finished stream."""
+        with self.step_lock, self.lock:
+            slot = self.slots.pop(stream, None)
+            if slot is not None:
+                del self.buffers[slot]
+                self.results.pop(stream, None)
+                self.free_slots.append(slot)
+
+    def feed(self, stream: int, audio: np.ndarray) -> None:
+        """Queues audio for a stream; it is processed by the next ``step``."""
+        audio = np.asarray(audio, dtype=np.float32).reshape(-1)
+        with self.lock:
+            slot = self.slots[stream]
+            self.buffers[slot] = np.concatenate([self.buffers[slot], audio])
+
+    def step(self) -> Dict[int, np.ndarray]:
+        """Runs all complete pending windows and returns speech probabilities per stream."""
+        with self.step_lock:
+            return self._step()
+
+    def process(self, stream: int, audio: np.ndarray) -> np.ndarray:
+        """Feeds audio of one stream and returns the speech probabilities of its complete windows.
+
+        Samples short of a whole window are kept for the next call.
+        """
+        self.feed(stream, audio)
+        with self.step_lock:
+            for other, speech_probs in self._step().items():
+                self.results.setdefault(other, []).append(speech_probs)
+            speech_probs = self.results.pop(stream, [])
+        if not speech_probs:
+            return np.zeros(0, dtype=np.float32)
+        return np.concatenate(speech_probs)
+
+    def _clear(self, stream: int) -> None:
+        slot = self.slots[stream]
+        self.state[:, slot] = 0
+        self.context[slot] = 0
+        self.buffers[slot] = np.zeros(0, dtype=np.float32)
+        self.results.pop(stream, None)
+
+    def _step(self) -> Dict[int, np.ndarray]:
+        streams = []
+        slots = []
+        encoder_inputs = []
+        with self.lock:
+            for stream, slot in self.slots.items():
+                buffer = self.buffers[slot]
+                num_windows = buffer.shape[0] // self.window_size_samples
+                if not num_windows:
+                    continue
+                num_samples = num_windows * self.window_size_samples
+                windows = buffer[:num_samples].reshape(num_windows, self.window_size_samples)
+                contexts = np.concatenate(
+                    [self.context[slot][None], windows[:-1, -self.context_size_samples :]]
+                )
+                encoder_inputs.append(np.concatenate([contexts, windows], 1))
+                self.context[slot] = windows[-1, -self.context_size_samples :]
+                self.buffers[slot] = buffer[num_samples:].copy()
+                streams.append(stream)
+                slots.append(slot)
+
+        if not slots:
+            return {}
+
+        if self.pool is None:
+            speech_probs = self._run(self.model, slots, encoder_inputs)
+        else:
+            with self.pool.checkout() as model:
+                speech_probs = self._run(model, slots, encoder_inputs)
+        return dict(zip(streams, speech_probs))
+
+    def _run(
+        self, model: "SileroVADModel", slots: List[int], encoder_inputs: List[np.ndarray]
+    ) -> List[np.ndarray]:
+        counts = np.array([len(windows) for windows in encoder_inputs])
+        encoder_output = model._encode(np.concatenate(encoder_inputs)[None])[0]
+
+        # Lay the encoder output out as (streams, timesteps, features)
+        max_windows = counts.max()
+        offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        batched = np.zeros((len(slots), max_windows, 128), dtype=np.float32)
+        for i, (offset, count) in enumerate(zip(offsets, counts)):
+            batched[i, :count] = encoder_output[offset : offset + count]
+
+        slot_ids = np.array(slots)
+        speech_probs = np.zeros((len(slots), max_windows), dtype=np.float32)
+        for t in range(max_windows):
+            active = np.flatnonzero(counts > t)
+            active_slots = slot_ids[active]
+            out, state = model.decoder_session.run(
+                None,
+                {
+                    "input": batched[active, t],
+                    "state": np.ascontiguousarray(self.state[:, active_slots]),
+                },
+            )
+            self.state[:, active_slots] = state
+            speech_probs[active, t] = out.reshape(-1)
+
+        return [speech_probs[i, :count] for i, count in enumerate(counts)]
 
 
 def merge_segments(segments_list, vad_options: VadOptions, sampling_rate: int = 16000):
@@ -0,0 +1,109 @@
+import io
+import struct
+import wave
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+
+
+def encode_wav(audio: np.ndarray, sample_rate: int) -> bytes:
+    """Encodes float audio as a mono 16-bit PCM WAV file in memory; samples beyond [-1, 1] are clipped."""
+    num_samples = audio.shape[0]
+    data_size = num_samples * 2
+    wav = bytearray(44 + data_size)
+    struct.pack_into(
+        "<4sI4s4sIHHIIHH4sI", wav, 0,
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, 1, sample_rate, sample_rate * 2, 2, 16,
+        b"data", data_size,
+    )
+    # Convert straight into the payload, without an intermediate int16 array;
+    # the cast is unchecked, so out-of-range samples must not reach it
+    samples = np.frombuffer(wav, dtype="<i2", count=num_samples, offset=44)
+    np.multiply(np.clip(audio, -1.0, 1.0), 32767, out=samples, casting="unsafe")
+    return bytes(wav)
+
+
+def encode_flac(audio: np.ndarray, sample_rate: int) -> bytes:
+    """Encodes float audio as 16-bit FLAC in memory (lossless, roughly half the size of WAV)."""
+    return _encode_with_soundfile(audio, sample_rate, "FLAC", "PCM_16")
+
+
+def encode_opus(audio: np.ndarray, sample_rate: int) -> bytes:
+    """Encodes float audio as Ogg/Opus in memory (lossy, for slow uplinks)."""
+    return _encode_with_soundfile(audio, sample_rate, "OGG", "OPUS")
+
+
+def _encode_with_soundfile(audio: np.ndarray, sample_rate: int, fmt: str, subtype: str) -> bytes:
+    try:
+        import soundfile
+    except ImportError as e:
+        raise RuntimeError(
+            f"Encoding uploads as {fmt}/{subtype} requires the soundfile package"
+        ) from e
+
+    buffer = io.BytesIO()
+    soundfile.write(buffer, audio, sample_rate, format=fmt, subtype=subtype)
+    return buffer.getvalue()
+
+
+# Upload format name -> (encoder, file name, MIME type)
+AUDIO_ENCODINGS: Dict[str, Tuple[Callable[[np.ndarray, int], bytes], str, str]] = {
+    "wav": (encode_wav, "audio.wav", "audio/wav"),
+    "flac": (encode_flac, "audio.flac", "audio/flac"),
+    "opus": (encode_opus, "audio.ogg", "audio/ogg"),
+}
+
+
+def encode_audio(audio: np.ndarray, sample_rate: int, fmt: str = "wav") -> Tuple[str, bytes, str]:
+    """Encodes audio for upload; returns a ``(file name, payload, MIME type)`` tuple."""
+    if fmt not in AUDIO_ENCODINGS:
+        raise ValueError(
+            f"Unsupported audio upload format '{fmt}', expected one of {', '.join(AUDIO_ENCODINGS)}"
+        )
+    encoder, file_name, mime_type = AUDIO_ENCODINGS[fmt]
+    return file_name, encoder(audio, sample_rate), mime_type
+
+
+def load_audio(path: str, sample_rate: int = 16000) -> np.ndarray:
+    """Reads a WAV or FLAC file as mono float32 audio at ``sample_rate``.
+
+    Uses soundfile when it is installed; plain PCM WAV files are also read
+    without it.
+    """
+    try:
+        import soundfile
+    except ImportError:
+        soundfile = None
+
+    if soundfile is not None:
+        audio, file_rate = soundfile.read(path, dtype="float32", always_2d=True)
+    elif path.lower().endswith(".wav"):
+        audio, file_rate = _read_pcm_wav(path)
+    else:
+        raise RuntimeError(f"Reading {path} requires the soundfile package")
+
+    audio = audio.mean(axis=1, dtype=np.float32)
+    if file_rate != sample_rate:
+        duration = audio.shape[0] / file_rate
+        target_times = np.arange(int(duration * sample_rate)) / sample_rate
+        audio = np.interp(target_times, np.arange(audio.shape[0]) / file_rate, audio).astype(np.float32)
+    return audio
+
+
+def _read_pcm_wav(path: str) -> Tuple[np.ndarray, int]:
+    with wave.open(path, "rb") as wf:
+        sample_width = wf.getsampwidth()
+        channels = wf.getnchannels()
+        file_rate = wf.getframerate()
+        frames = wf.readframes(wf.getnframes())
+
+    if sample_width == 1:
+        audio = (np.frombuffer(frames, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif sample_width == 2:
+        audio = np.frombuffer(frames, dtype="<i2").astype(np.float32) / 32768
+    elif sample_width == 4:
+        audio = np.frombuffer(frames, dtype="<i4").astype(np.float32) / 2147483648
+    else:
+        raise RuntimeError(f"Unsupported WAV sample width {sample_width} in {path}")
+    return audio.reshape(-1, channels), file_rate
@@ -0,0 +1,221 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, List, Optional
+
+# Upper bounds in seconds, from VAD windows (sub-millisecond) to slow API calls
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+METRIC_PREFIX = "live_translation"
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in the Prometheus sense."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def summary(self) -> Dict[str, Optional[float]]:
+        return {
+            "count": self.count,
+            "mean": self.sum / self.count if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class _Span:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics: "Metrics", stage: str):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Metrics:
+    """Stage latency histograms, counters and sampled gauges for the whole process.
+
+    Disabled by default: ``span`` then returns a shared no-op context manager
+    and ``observe``/``increment`` return immediately, so instrumented code
+    pays one attribute check. Gauges are callables evaluated only when a
+    snapshot is taken, keeping queue-depth tracking off the hot path.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.histograms: Dict[str, Histogram] = {}
+        self.counters: Dict[str, float] = {}
+        self.gauges: Dict[str, Callable[[], float]] = {}
+
+    def span(self, stage: str):
+        """Context manager timing a block as one observation of ``stage``"""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, stage)
+
+    def observe(self, stage: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.histograms.get(stage)
+            if histogram is None:
+                histogram = self.histograms[stage] = Histogram()
+            histogram.observe(seconds)
+
+    def increment(self, name: str, amount: float = 1) -> None:
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def register_gauge(self, name: str, read: Callable[[], float]) -> None:
+        """Sample ``read()`` as gauge ``name`` whenever metrics are exported"""
+        self.gauges[name] = read
+
+    def unregister_gauge(self, name: str) -> None:
+        self.gauges.pop(name, None)
+
+    def reset(self) -> None:
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            stages = {stage: histogram.summary() for stage, histogram in self.histograms.items()}
+            counters = dict(self.counters)
+        return {"stages": stages, "counters": counters, "gauges": self._read_gauges()}
+
+    def prometheus_text(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines: List[str] = []
+        with self.lock:
+            histograms = {stage: (list(h.counts), h.count, h.sum) for stage, h in self.histograms.items()}
+            counters = dict(self.counters)
+
+        name = f"{METRIC_PREFIX}_stage_seconds"
+        lines.append(f"# TYPE {name} histogram")
+        for stage, (counts, count, total) in sorted(histograms.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS, counts):
+                cumulative += bucket_count
+                lines.append(f'{name}_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{stage="{stage}",le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{stage="{stage}"}} {total}')
+            lines.append(f'{name}_count{{stage="{stage}"}} {count}')
+
+        for counter, value in sorted(counters.items()):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{counter}_total counter")
+            lines.append(f"{METRIC_PREFIX}_{counter}_total {value}")
+
+        for gauge, value in sorted(self._read_gauges().items()):
+            lines.append(f"# TYPE {METRIC_PREFIX}_{gauge} gauge")
+            lines.append(f"{METRIC_PREFIX}_{gauge} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _read_gauges(self) -> Dict[str, float]:
+        values = {}
+        for name, read in list(self.gauges.items()):
+            try:
+                values[name] = read()
+            except Exception:
+                continue  # The owner of the gauge may be shutting down
+        return values
+
+
+# Shared by every module; enabled by configure_metrics
+metrics = Metrics()
+
+
+def start_metrics_server(host: str, port: int):
+    """Serve ``/metrics`` for Prometheus from a daemon thread"""
+    # Imported here so processes without the endpoint do not load the HTTP server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = metrics.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # Scrapes would flood the log
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
+
+
+def start_metrics_logging(logger, interval: float) -> threading.Thread:
+    """Log a JSON snapshot of all metrics every ``interval`` seconds"""
+    def run():
+        while True:
+            time.sleep(interval)
+            logger.info("metrics %s", json.dumps(metrics.snapshot(), sort_keys=True))
+
+    thread = threading.Thread(target=run, name="metrics-logger", daemon=True)
+    thread.start()
+    return thread
+
+
+def configure_metrics(config) -> None:
+    """Enable metrics and start the exporters selected in ``config``"""
+    metrics.enabled = config.METRICS_ENABLED
+    if not metrics.enabled:
+        return
+    logger = config.get_logger("metrics")
+    if config.METRICS_PORT:
+        start_metrics_server(config.METRICS_HOST, config.METRICS_PORT)
+        logger.info(f"Prometheus metrics on http://{config.METRICS_HOST}:{config.METRICS_PORT}/metrics")
+    if config.METRICS_LOG_INTERVAL > 0:
+        start_metrics_logging(logger, config.METRICS_LOG_INTERVAL)
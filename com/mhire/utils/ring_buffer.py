@@ -0,0 +1,67 @@
+import threading
+
+import numpy as np
+
+
+class AudioRingBuffer:
+    """Preallocated float32 ring buffer between an audio callback and its consumer.
+
+    Every sample is stored twice, at ``i`` and ``i + capacity``, so any span
+    of up to ``capacity`` samples is a single contiguous slice and can be
+    handed out as a view without copying. Positions are absolute sample
+    counts since the last reset; spans older than ``capacity`` samples have
+    been overwritten.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.data = np.zeros(2 * capacity, dtype=np.float32)
+        self.write_pos = 0
+        self.condition = threading.Condition()
+
+    def reset(self) -> None:
+        with self.condition:
+            self.write_pos = 0
+
+    def write(self, samples: np.ndarray) -> None:
+        """Append samples; safe to call from the audio callback thread."""
+        samples = samples.reshape(-1)
+        num_samples = samples.shape[0]
+        skipped = 0
+        if num_samples > self.capacity:
+            skipped = num_samples - self.capacity
+            samples = samples[skipped:]
+            num_samples = self.capacity
+
+        start = (self.write_pos + skipped) % self.capacity
+        first = min(num_samples, self.capacity - start)
+        rest = num_samples - first
+        for offset in (0, self.capacity):
+            self.data[offset + start : offset + start + first] = samples[:first]
+            self.data[offset : offset + rest] = samples[first:]
+
+        with self.condition:
+            self.write_pos += skipped + num_samples
+            self.condition.notify_all()
+
+    def wait_for_data(self, position: int, timeout: float) -> int:
+        """Wait until samples past ``position`` are available; returns the write position."""
+        with self.condition:
+            if self.write_pos <= position:
+                self.condition.wait(timeout)
+            return self.write_pos
+
+    def oldest_position(self) -> int:
+        """First position that has not been overwritten yet."""
+        return max(0, self.write_pos - self.capacity)
+
+    def view(self, start: int, end: int) -> np.ndarray:
+        """Zero-copy view of samples ``[start, end)``.
+
+        The view stays valid until the writer has moved ``capacity`` samples
+        past ``start``; copy it if it has to outlive that.
+        """
+        if end - start > self.capacity or start < self.oldest_position():
+            raise ValueError(f"Samples [{start}, {end}) are no longer in the ring buffer")
+        offset = start % self.capacity
+        return self.data[offset : offset + end - start]
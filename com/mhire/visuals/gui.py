@@ -1,11 +1,12 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext
-import threading
-from typing import Optional
+from typing import Dict, List, Optional
 
 from com.mhire.config.config import Config
+from com.mhire.services.pipeline import Pipeline, Utterance
 from com.mhire.services.transcription import Transcription
 from com.mhire.services.translation import Translation
+from com.mhire.visuals.renderer import TextRenderer
 
 class GUI:
     def __init__(self, config: Config, transcription: Transcription, translation: Translation):
@@ -13,6 +14,14 @@ class GUI:
         self.config = config
         self.transcription = transcription
         self.translation = translation
+        self.pipeline: Optional[Pipeline] = None
+        self.translation_areas: Dict[str, scrolledtext.ScrolledText] = {}
+        self.renderer = TextRenderer(
+            self.root,
+            config.GUI_FRAME_INTERVAL_MS,
+            config.GUI_SCROLLBACK_LINES,
+            archive_path=config.GUI_ARCHIVE_PATH or None,
+        )
         
         # Initialize main window
         self.root.title("Real-time Multilingual Speech Translation (Groq API)")
@@ -20,6 +29,7 @@ class GUI:
         self.root.state('zoomed')
         
         self.setup_gui()
+        self.renderer.start()
         
         # Bind window close event
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
@@ -59,14 +69,16 @@ class GUI:
                                state="readonly", width=10)
         src_combo.pack(padx=5, pady=5)
         
-        # Target language selection
-        tgt_frame = ttk.LabelFrame(lang_frame, text="Target Language")
+        # Target language selection, several languages can be selected
+        tgt_frame = ttk.LabelFrame(lang_frame, text="Target Languages")
         tgt_frame.pack(side=tk.RIGHT, padx=5)
-        self.tgt_lang_var = tk.StringVar(value="English")
-        tgt_combo = ttk.Combobox(tgt_frame, textvariable=self.tgt_lang_var,
-                               values=[lang for lang in self.translation.get_supported_languages().keys() if lang != "Auto"],
-                               state="readonly", width=10)
-        tgt_combo.pack(padx=5, pady=5)
+        self.tgt_lang_names = [lang for lang in self.translation.get_supported_languages().keys() if lang != "Auto"]
+        self.tgt_lang_list = tk.Listbox(tgt_frame, selectmode=tk.MULTIPLE, exportselection=False,
+                                        height=len(self.tgt_lang_names), width=12)
+        for lang in self.tgt_lang_names:
+            self.tgt_lang_list.insert(tk.END, lang)
+        self.tgt_lang_list.selection_set(self.tgt_lang_names.index("English"))
+        self.tgt_lang_list.pack(padx=5, pady=5)
 
     def _setup_text_areas(self, main_frame):
         """Set up text areas for transcription and translation"""
@@ -85,15 +97,40 @@ class GUI:
         
         self.text_area = scrolledtext.ScrolledText(trans_frame)
         self.text_area.grid(row=0, column=0, padx=5, pady=5, sticky=(tk.W, tk.E, tk.N, tk.S))
-        
-        # Translation text area
-        tran_frame = ttk.LabelFrame(text_frame, text="Translation")
-        tran_frame.grid(row=0, column=1, padx=5, sticky=(tk.W, tk.E, tk.N, tk.S))
-        tran_frame.columnconfigure(0, weight=1)
-        tran_frame.rowconfigure(0, weight=1)
-        
-        self.translation_area = scrolledtext.ScrolledText(tran_frame)
-        self.translation_area.grid(row=0, column=0, padx=5, pady=5, sticky=(tk.W, tk.E, tk.N, tk.S))
+        # Interim text that later results replace
+        self.text_area.tag_configure("provisional", foreground="gray")
+        self.renderer.add_area(self.text_area, "transcription")
+        
+        # Translation text areas, one per target language
+        self.translations_frame = ttk.Frame(text_frame)
+        self.translations_frame.grid(row=0, column=1, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.translations_frame.columnconfigure(0, weight=1)
+        self._setup_translation_areas(self._selected_target_languages())
+
+    def _setup_translation_areas(self, tgt_langs: List[str]) -> None:
+        """Create one translation text area per target language"""
+        for translation_area in self.translation_areas.values():
+            self.renderer.remove_area(translation_area)
+        for child in self.translations_frame.winfo_children():
+            child.destroy()
+        self.translation_areas = {}
+
+        for row, tgt_lang in enumerate(tgt_langs):
+            tran_frame = ttk.LabelFrame(self.translations_frame, text=f"Translation ({tgt_lang})")
+            tran_frame.grid(row=row, column=0, padx=5, sticky=(tk.W, tk.E, tk.N, tk.S))
+            tran_frame.columnconfigure(0, weight=1)
+            tran_frame.rowconfigure(0, weight=1)
+            self.translations_frame.rowconfigure(row, weight=1)
+
+            translation_area = scrolledtext.ScrolledText(tran_frame, height=1)
+            translation_area.grid(row=0, column=0, padx=5, pady=5, sticky=(tk.W, tk.E, tk.N, tk.S))
+            tgt_code = self.translation.get_language_code(tgt_lang)
+            self.translation_areas[tgt_code] = translation_area
+            self.renderer.add_area(translation_area, tgt_code)
+
+    def _selected_target_languages(self) -> List[str]:
+        """Names of the selected target languages"""
+        return [self.tgt_lang_names[i] for i in self.tgt_lang_list.curselection()]
 
     def _setup_buttons(self, main_frame):
         """Set up control buttons"""
@@ -111,78 +148,100 @@ class GUI:
         self.stop_button.grid(row=0, column=1, padx=5, sticky=(tk.W, tk.E))
 
     def update_gui_safely(self, widget: tk.Text, text: str) -> None:
-        """Thread-safe method to update GUI widgets"""
-        try:
-            self.root.after(0, lambda: widget.insert(tk.END, text))
-            self.root.after(0, lambda: widget.see(tk.END))
-        except Exception as e:
-            print(f"GUI update error: {e}")
+        """Thread-safe method to update GUI widgets; the text is shown with the next frame"""
+        self.renderer.append(widget, text)
 
     def start_transcription(self) -> None:
         """Start the transcription process"""
-        self.transcription.start_stream()
-        
-        # Start processing thread
-        self.process_thread = threading.Thread(target=self._process_audio)
-        self.process_thread.start()
+        tgt_langs = self._selected_target_languages()
+        self._setup_translation_areas(tgt_langs)
+        self.pipeline = Pipeline(
+            self.config,
+            self.transcription,
+            self.translation,
+            src_lang=self.translation.get_language_code(self.src_lang_var.get()),
+            tgt_langs=list(self.translation_areas),
+            on_transcription=self._show_transcription,
+            on_translation=self._show_translation,
+            on_translation_delta=self._show_translation_delta if self._streams_translations() else None,
+            on_interim=self._show_interim if self.config.INTERIM_RESULTS else None,
+        )
+        self.pipeline.start()
         
         # Update button states
         self.start_button.config(state=tk.DISABLED)
         self.stop_button.config(state=tk.NORMAL)
+        self.tgt_lang_list.config(state=tk.DISABLED)
         
         # Add initial message
         src_lang = self.src_lang_var.get()
-        tgt_lang = self.tgt_lang_var.get()
         self.text_area.insert(tk.END, f"Listening... Speak something! (Source: {src_lang})\n")
-        self.translation_area.insert(tk.END, f"Translation will appear here (Target: {tgt_lang})\n")
+        for tgt_lang, translation_area in zip(tgt_langs, self.translation_areas.values()):
+            translation_area.insert(tk.END, f"Translation will appear here (Target: {tgt_lang})\n")
 
     def stop_transcription(self) -> None:
         """Stop the transcription process"""
-        self.transcription.stop_stream()
-        if hasattr(self, 'process_thread'):
-            self.process_thread.join(timeout=1.0)
+        if self.pipeline:
+            self.pipeline.stop(timeout=1.0)
         
         # Update button states safely
         try:
             self.start_button.config(state=tk.NORMAL)
             self.stop_button.config(state=tk.DISABLED)
+            self.tgt_lang_list.config(state=tk.NORMAL)
             
             # Add stopped message safely
             self.update_gui_safely(self.text_area, "\nTranscription stopped.\n")
-            self.update_gui_safely(self.translation_area, "\nTranslation stopped.\n")
+            for translation_area in self.translation_areas.values():
+                self.update_gui_safely(translation_area, "\nTranslation stopped.\n")
         except:
             pass
 
-    def _process_audio(self) -> None:
-        """Process audio and update GUI with results in real-time"""
-        selected_src_lang = self.translation.get_language_code(self.src_lang_var.get())
-        
-        while self.transcription.running:
-            transcription = self.transcription.get_next_transcription(selected_src_lang)
-            
-            if transcription:
-                # Add newline only if transcription ends with sentence-ending punctuation
-                ends_sentence = any(transcription.rstrip().endswith(p) for p in '.!?')
-                newline = '\n' if ends_sentence else ' '
-                
-                # Update transcription area safely
-                self.update_gui_safely(self.text_area, transcription + newline)
-                
-                # Get selected languages
-                selected_tgt_lang = self.translation.get_language_code(self.tgt_lang_var.get())
-                
-                # Perform translation and update translation area safely
-                translation = self.translation.translate_text(
-                    transcription,
-                    selected_src_lang or "en",  # Default to English if Auto
-                    selected_tgt_lang
-                )
-                # Add newline to translation only for complete sentences
-                self.update_gui_safely(self.translation_area, translation + newline)
+    def _streams_translations(self) -> bool:
+        """Batched translations arrive whole, so streaming only applies without batching"""
+        return self.config.TRANSLATION_STREAMING and not self.config.TRANSLATION_BATCHING
+
+    @staticmethod
+    def _line_end(transcription: str) -> str:
+        """Add newline only if transcription ends with sentence-ending punctuation"""
+        ends_sentence = any(transcription.rstrip().endswith(p) for p in '.!?')
+        return '\n' if ends_sentence else ' '
+
+    def _show_transcription(self, utterance: Utterance) -> None:
+        """Pipeline sink for transcriptions, called in utterance order"""
+        text = utterance.transcription + self._line_end(utterance.transcription)
+        if not self.config.INTERIM_RESULTS:
+            self.update_gui_safely(self.text_area, text)
+            return
+        # Committed text goes before the provisional text still on screen
+        self.renderer.insert_before_tag(self.text_area, text, "provisional")
+
+    def _show_interim(self, provisional: str) -> None:
+        """Pipeline sink for provisional text of the ongoing speech"""
+        self.renderer.replace_tag(self.text_area, provisional, "provisional")
+
+    def _show_translation(self, utterance: Utterance, tgt_lang: str) -> None:
+        """Pipeline sink for translations, called in utterance order per target language"""
+        text = utterance.translations[tgt_lang]
+        # Add newline to translation only for complete sentences
+        if text:
+            text += self._line_end(utterance.transcription)
+        area = self.translation_areas[tgt_lang]
+        if not self._streams_translations():
+            self.update_gui_safely(area, text)
+            return
+        # The final translation replaces its streamed preview
+        self.renderer.insert_before_tag(area, text, "streaming")
+        self.renderer.replace_tag(area, "", "streaming")
+
+    def _show_translation_delta(self, utterance: Utterance, tgt_lang: str, delta: str) -> None:
+        """Pipeline sink for streamed translation text as it arrives"""
+        self.renderer.append(self.translation_areas[tgt_lang], delta, "streaming")
 
     def on_closing(self) -> None:
         """Handle window closing event"""
         self.stop_transcription()
+        self.renderer.stop()
         self.root.destroy()
 
     def run(self) -> None:
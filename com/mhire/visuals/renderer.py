@@ -0,0 +1,154 @@
+import os
+import queue
+import time
+import tkinter as tk
+from typing import Dict, List, Optional, Tuple
+
+from com.mhire.utils.metrics import metrics
+
+# Render operations
+APPEND = "append"
+INSERT_BEFORE_TAG = "insert_before_tag"
+REPLACE_TAG = "replace_tag"
+
+
+class TextRenderer:
+    """Applies text updates from any thread to Tk text widgets in batches.
+
+    Updates are queued without touching Tk. A loop on the Tk thread drains
+    the queue every ``frame_interval_ms``, merges consecutive appends to the
+    same widget into one insert and scrolls each changed widget once per
+    frame, so the cost per frame does not grow with the rate of updates.
+
+    Widgets are kept to ``scrollback_lines`` lines. Once a widget grows past
+    that, its oldest lines are deleted down to 90% of the limit, so trimming
+    happens once per batch of lines rather than on every frame. With
+    ``archive_path`` set, trimmed text is appended to a file per widget next
+    to it, e.g. ``transcript.en.txt`` for the area named ``en``.
+    """
+
+    def __init__(self, root: tk.Tk, frame_interval_ms: float, scrollback_lines: int,
+                 archive_path: Optional[str] = None):
+        self.root = root
+        self.frame_interval = max(1, int(frame_interval_ms))
+        self.scrollback_lines = scrollback_lines
+        self.archive_path = archive_path
+        self.names: Dict[tk.Text, str] = {}
+        self.updates: "queue.SimpleQueue[Tuple[str, tk.Text, str, Optional[str], float]]" = queue.SimpleQueue()
+        self.frame: Optional[str] = None
+
+    def add_area(self, widget: tk.Text, name: str) -> None:
+        """Register a widget; ``name`` identifies its archive file"""
+        self.names[widget] = name
+
+    def remove_area(self, widget: tk.Text) -> None:
+        self.names.pop(widget, None)
+
+    def append(self, widget: tk.Text, text: str, tag: Optional[str] = None) -> None:
+        self.updates.put((APPEND, widget, text, tag, time.perf_counter()))
+
+    def insert_before_tag(self, widget: tk.Text, text: str, tag: str) -> None:
+        """Insert text before the first text carrying ``tag``, or at the end if there is none"""
+        self.updates.put((INSERT_BEFORE_TAG, widget, text, tag, time.perf_counter()))
+
+    def replace_tag(self, widget: tk.Text, text: str, tag: str) -> None:
+        """Replace all text carrying ``tag`` with ``text`` at the end, tagged the same way"""
+        self.updates.put((REPLACE_TAG, widget, text, tag, time.perf_counter()))
+
+    def start(self) -> None:
+        if self.frame is None:
+            self.frame = self.root.after(self.frame_interval, self._render)
+
+    def stop(self) -> None:
+        """Stop the loop after rendering what is queued; call from the Tk thread"""
+        if self.frame is not None:
+            self.root.after_cancel(self.frame)
+            self.frame = None
+        self._render_pending()
+
+    def _render(self) -> None:
+        self._render_pending()
+        self.frame = self.root.after(self.frame_interval, self._render)
+
+    def _render_pending(self) -> None:
+        updates = self._drain()
+        if not updates:
+            return
+
+        start = time.perf_counter()
+        if metrics.enabled:
+            for update in updates:
+                metrics.observe("gui_queue_wait", start - update[4])
+
+        changed = []
+        for operation, widget, text, tag in self._coalesce(updates):
+            try:
+                self._apply(operation, widget, text, tag)
+            except tk.TclError:
+                continue  # The widget was destroyed while the update was queued
+            if widget not in changed:
+                changed.append(widget)
+
+        for widget in changed:
+            try:
+                self._trim(widget)
+                widget.see(tk.END)
+            except tk.TclError:
+                continue
+        metrics.observe("gui_insert", time.perf_counter() - start)
+
+    def _drain(self) -> list:
+        updates = []
+        while True:
+            try:
+                updates.append(self.updates.get_nowait())
+            except queue.Empty:
+                return updates
+
+    @staticmethod
+    def _coalesce(updates: list) -> List[Tuple[str, tk.Text, str, Optional[str]]]:
+        """Merge runs of appends to the same widget with the same tag"""
+        merged: List[Tuple[str, tk.Text, str, Optional[str]]] = []
+        for operation, widget, text, tag, _ in updates:
+            if merged and operation == APPEND and merged[-1][0] == APPEND and merged[-1][1] is widget and merged[-1][3] == tag:
+                merged[-1] = (APPEND, widget, merged[-1][2] + text, tag)
+            else:
+                merged.append((operation, widget, text, tag))
+        return merged
+
+    @staticmethod
+    def _apply(operation: str, widget: tk.Text, text: str, tag: Optional[str]) -> None:
+        if operation == APPEND:
+            if tag:
+                widget.insert(tk.END, text, tag)
+            else:
+                widget.insert(tk.END, text)
+            return
+
+        ranges = widget.tag_ranges(tag)
+        if operation == INSERT_BEFORE_TAG:
+            widget.insert(ranges[0] if ranges else tk.END, text)
+            return
+        if ranges:
+            widget.delete(ranges[0], ranges[-1])
+        if text:
+            widget.insert(tk.END, text, tag)
+
+    def _trim(self, widget: tk.Text) -> None:
+        lines = int(widget.index("end-1c").split(".")[0])
+        if lines <= self.scrollback_lines:
+            return
+
+        cut = f"{lines - self.scrollback_lines * 9 // 10 + 1}.0"
+        if self.archive_path:
+            self._archive(widget, widget.get("1.0", cut))
+        widget.delete("1.0", cut)
+
+    def _archive(self, widget: tk.Text, text: str) -> None:
+        base, extension = os.path.splitext(self.archive_path)
+        path = f"{base}.{self.names.get(widget, 'text')}{extension or '.txt'}"
+        try:
+            with open(path, "a", encoding="utf-8") as archive:
+                archive.write(text)
+        except OSError as e:
+            print(f"Transcript archive error: {e}")
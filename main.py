@@ -1,20 +1,93 @@
 #!/usr/bin/env python3
+import time
+
+STARTED = time.perf_counter()
+
+import argparse
+
 from com.mhire.config.config import Config
-from com.mhire.services.transcription import Transcription
-from com.mhire.services.translation import Translation
-from com.mhire.visuals.gui import GUI
+from com.mhire.utils.metrics import configure_metrics
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Real-time multilingual speech translation")
+    subparsers = parser.add_subparsers(dest="command")
+
+    # Headless batch mode for recorded sessions
+    batch_parser = subparsers.add_parser("batch", help="Transcribe and translate WAV/FLAC files offline")
+    batch_parser.add_argument("paths", nargs="+", help="Audio files or directories containing them")
+    batch_parser.add_argument("--src", help="Source language code (default: detected by the ASR)")
+    batch_parser.add_argument("--tgt", help="Target language code; omit to only transcribe")
+    batch_parser.add_argument("--output-dir", help="Where to write transcripts (default: next to each file)")
+    batch_parser.add_argument("--processes", type=int, default=2, help="Files processed in parallel")
+    batch_parser.add_argument("--chunk-workers", type=int, default=4, help="Concurrent API requests per file")
+    batch_parser.add_argument("--chunk-seconds", type=float, default=30.0, help="Maximum speech per request")
+
+    # WebSocket server for remote clients
+    serve_parser = subparsers.add_parser("serve", help="Stream audio from remote clients over WebSocket")
+    serve_parser.add_argument("--host", default="0.0.0.0")
+    serve_parser.add_argument("--port", type=int, default=8765)
+
+    return parser.parse_args()
+
+def run_gui(config: Config, report):
+    from com.mhire.services.startup import warm_up_in_background
+    from com.mhire.services.transcription import Transcription
+    from com.mhire.services.translation import Translation
+    from com.mhire.visuals.gui import GUI
+
+    # The VAD sessions and API connections get ready while the window comes up
+    warm_up_in_background(config, report)
 
-def main():
-    # Initialize configuration
-    config = Config()
-    
     # Initialize services
     transcription_service = Transcription(config)
     translation_service = Translation(config)
-    
+
     # Initialize and run GUI
     gui = GUI(config, transcription_service, translation_service)
+    gui.root.after(0, lambda: report.mark("ui_ready"))
     gui.run()
 
+def run_batch(args):
+    from com.mhire.services.batch import run_batch
+
+    run_batch(
+        args.paths,
+        src_lang=args.src,
+        tgt_lang=args.tgt,
+        output_dir=args.output_dir,
+        processes=args.processes,
+        chunk_workers=args.chunk_workers,
+        chunk_seconds=args.chunk_seconds,
+    )
+
+def run_server(config: Config, args, report):
+    from com.mhire.services.server import run_server
+    from com.mhire.services.startup import warm_up_in_background
+
+    # Clients go through the async API client, only the VAD needs warming
+    warm_up_in_background(config, report, http=False)
+    run_server(config, args.host, args.port)
+
+def main():
+    args = parse_args()
+
+    # Initialize configuration
+    config = Config()
+    configure_metrics(config)
+
+    if args.command == "batch":
+        run_batch(args)
+        return
+
+    # Not needed in batch mode, whose worker processes configure the VAD themselves
+    from com.mhire.services.startup import StartupReport
+    from com.mhire.services.vad import configure_vad
+
+    configure_vad(config)
+    if args.command == "serve":
+        run_server(config, args, StartupReport(config, STARTED, expected=("vad_ready",)))
+    else:
+        run_gui(config, StartupReport(config, STARTED, expected=("ui_ready", "vad_ready", "http_ready")))
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
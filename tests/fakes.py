@@ -0,0 +1,99 @@
+"""Stand-ins for the Groq API, so services can be tested without a network."""
+import json
+from typing import Callable, List, Optional
+
+
+class FakeResponse:
+    def __init__(self, status_code: int = 200, payload=None, headers=None, lines: Optional[List[str]] = None):
+        self.status_code = status_code
+        self.payload = payload if payload is not None else {}
+        self.headers = headers or {}
+        self.text = json.dumps(self.payload)
+        self.lines = lines or []
+        self.encoding = None
+
+    def json(self):
+        return self.payload
+
+    def iter_lines(self, decode_unicode: bool = False):
+        return iter(self.lines)
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def chat_completion(content: str) -> FakeResponse:
+    return FakeResponse(payload={"choices": [{"message": {"content": content}}]})
+
+
+def streamed_completion(pieces: List[str]) -> FakeResponse:
+    lines = [
+        "data: " + json.dumps({"choices": [{"delta": {"content": piece}}]})
+        for piece in pieces
+    ]
+    return FakeResponse(lines=lines + ["data: [DONE]"])
+
+
+class FakeChatClient:
+    """Answers chat completions with ``reply(text)`` of the last user message and records the requests."""
+
+    def __init__(self, reply: Callable[[str], str] = str.upper):
+        self.reply = reply
+        self.requests: List[dict] = []
+
+    def post(self, url, headers=None, json=None, rate_limit=None, stream=False, **kwargs):
+        self.requests.append(json)
+        content = self.reply(json["messages"][-1]["content"])
+        if stream:
+            return streamed_completion([content[i:i + 3] for i in range(0, len(content), 3)])
+        return chat_completion(content)
+
+
+class FakeTranscription:
+    """Hands out one prepared segment per call and transcribes it as ``transcripts[first sample]``.
+
+    Each segment's audio holds its index, so the fake ASR knows which
+    transcript it is looking at.
+    """
+
+    sample_rate = 16000
+
+    def __init__(self, transcripts: List[str], asr_delay: Callable[[], float] = lambda: 0.0):
+        import queue
+        import numpy as np
+
+        self.transcripts = transcripts
+        self.asr_delay = asr_delay
+        self.segments = queue.Queue()
+        for index in range(len(transcripts)):
+            self.segments.put((np.full(160, index, dtype=np.float32), [{"start": 0, "end": 160}]))
+
+    def start_stream(self) -> None:
+        pass
+
+    def stop_stream(self) -> None:
+        pass
+
+    def get_next_segment(self, timeout: float = 0.01):
+        import queue
+
+        try:
+            return self.segments.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def extract_speech(self, audio_chunk, speech_timestamps=None):
+        return audio_chunk
+
+    def process_audio_chunk_with_language(self, audio_chunk, selected_src_lang=None, speech_timestamps=None,
+                                          detect_language=True, **kwargs):
+        import time
+
+        time.sleep(self.asr_delay())
+        return self.transcripts[int(audio_chunk[0])], None
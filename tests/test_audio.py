@@ -0,0 +1,31 @@
+import io
+import wave
+
+import numpy as np
+
+from com.mhire.utils.audio import encode_audio, encode_wav
+
+
+def decode_wav(payload: bytes):
+    with wave.open(io.BytesIO(payload)) as wav:
+        assert (wav.getnchannels(), wav.getsampwidth()) == (1, 2)
+        return wav.getframerate(), np.frombuffer(wav.readframes(wav.getnframes()), dtype="<i2")
+
+
+def test_encode_wav_round_trip():
+    audio = np.sin(np.linspace(0, 20, 1000)).astype(np.float32)
+    sample_rate, samples = decode_wav(encode_wav(audio, 16000))
+    assert sample_rate == 16000
+    np.testing.assert_allclose(samples / 32767, audio, atol=1 / 32767)
+
+
+def test_encode_wav_clips_instead_of_wrapping_around():
+    audio = np.array([0.0, 1.0, 1.5, 40.0, -1.0, -1.5, -40.0], dtype=np.float32)
+    _, samples = decode_wav(encode_wav(audio, 16000))
+    assert samples.tolist() == [0, 32767, 32767, 32767, -32767, -32767, -32767]
+
+
+def test_encode_audio_names_the_upload():
+    file_name, payload, mime_type = encode_audio(np.zeros(10, dtype=np.float32), 16000)
+    assert (file_name, mime_type) == ("audio.wav", "audio/wav")
+    assert decode_wav(payload)[1].tolist() == [0] * 10
@@ -0,0 +1,62 @@
+import numpy as np
+
+from com.mhire.services.batch import FileResult, TranscriptSegment, _transcribe_chunk, write_transcript
+
+SAMPLE_RATE = 16000
+
+
+class FakeVerboseTranscription:
+    sample_rate = SAMPLE_RATE
+
+    def __init__(self, result: dict):
+        self.result = result
+        self.uploads = []
+
+    def transcribe_verbose(self, audio, src_lang=None):
+        self.uploads.append(audio)
+        return self.result
+
+
+def transcribe(result: dict, chunk: dict):
+    audio = np.arange(5 * SAMPLE_RATE, dtype=np.float32)
+    transcription = FakeVerboseTranscription(result)
+    segments = _transcribe_chunk(audio, chunk, transcription, None, None, "en", None)
+    return segments, transcription.uploads
+
+
+def test_segment_times_are_mapped_back_to_the_recording():
+    # Speech from 1s to 2s and from 3s to 4s, uploaded as 2s of speech
+    chunk = {"segments": [(16000, 32000), (48000, 64000)]}
+    result = {"segments": [
+        {"start": 0.0, "end": 1.0, "text": " one "},
+        {"start": 1.2, "end": 2.5, "text": "two"},
+        {"start": 2.0, "end": 2.0, "text": " "},
+    ]}
+
+    segments, uploads = transcribe(result, chunk)
+    assert uploads[0].shape[0] == 2 * SAMPLE_RATE
+    assert uploads[0][0] == 16000 and uploads[0][SAMPLE_RATE] == 48000
+    # A segment ending on the cut stays in the first piece of speech
+    assert segments == [TranscriptSegment(1.0, 2.0, "one"), TranscriptSegment(3.2, 4.0, "two")]
+
+
+def test_chunks_without_timed_segments_span_the_whole_speech():
+    chunk = {"segments": [(16000, 32000), (48000, 64000)]}
+    segments, _ = transcribe({"text": " one two "}, chunk)
+    assert segments == [TranscriptSegment(1.0, 4.0, "one two")]
+    assert transcribe({}, chunk)[0] == []
+
+
+def test_write_transcript(tmp_path):
+    result = FileResult(str(tmp_path / "talk.wav"), 4000.0, [
+        TranscriptSegment(1.0, 2.5, "Hello", "Hallo"),
+        TranscriptSegment(3661.0, 3662.25, "Bye"),
+    ])
+    path = write_transcript(result, str(tmp_path / "out"))
+    assert path == str(tmp_path / "out" / "talk.transcript.txt")
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == (
+            "[00:00:01.00 --> 00:00:02.50] Hello\n"
+            "    Hallo\n"
+            "[01:01:01.00 --> 01:01:02.25] Bye\n"
+        )
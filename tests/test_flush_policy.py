@@ -0,0 +1,61 @@
+import pytest
+
+from com.mhire.config.config import Config
+from com.mhire.services.flush_policy import AdaptiveFlushPolicy
+
+
+def make_policy() -> AdaptiveFlushPolicy:
+    config = Config()
+    config.FLUSH_TARGET_LATENCY_MS = 1000
+    config.FLUSH_UPDATE_INTERVAL_MS = 0
+    config.PIPELINE_QUEUE_SIZE = 4
+    return AdaptiveFlushPolicy(config)
+
+
+def settle(policy: AdaptiveFlushPolicy, backlog: int = 0):
+    for _ in range(50):
+        decision = policy.update(backlog)
+    return decision
+
+
+def test_idle_pipelines_get_the_shortest_segments():
+    policy = make_policy()
+    policy.observe_asr(0.4)
+    policy.observe_translation(0.8)
+    decision = settle(policy)
+    assert decision.pressure == 0
+    assert decision.min_silence_ms == policy.min_silence_range[0]
+    assert decision.max_speech_s == policy.max_speech_range[0]
+
+
+def test_full_queues_get_the_longest_segments():
+    policy = make_policy()
+    decision = settle(policy, backlog=4)
+    assert decision.pressure == pytest.approx(1)
+    assert decision.min_silence_ms == pytest.approx(policy.min_silence_range[1])
+
+
+def test_pressure_follows_the_slowest_service():
+    policy = make_policy()
+    policy.observe_asr(0.5)
+    policy.observe_translation(1.5)
+    decision = settle(policy, backlog=1)
+    assert decision.pressure == pytest.approx(0.5)
+    low, high = policy.max_speech_range
+    assert decision.max_speech_s == pytest.approx((low + high) / 2)
+
+
+def test_pressure_and_latency_are_smoothed():
+    policy = make_policy()
+    policy.observe_asr(1.0)
+    policy.observe_asr(6.0)
+    assert policy.asr_latency == pytest.approx(2.0)
+    # One slow update moves the segmentation part of the way only
+    assert 0 < policy.update(backlog=4).pressure < 0.5
+
+
+def test_updates_are_rate_limited():
+    policy = make_policy()
+    policy.update_interval = 60
+    assert policy.update(backlog=4) is not None
+    assert policy.update(backlog=4) is None
@@ -0,0 +1,91 @@
+import email.utils
+import time
+
+import pytest
+import requests
+
+from com.mhire.config.config import Config
+from com.mhire.services.http_client import HttpClient, RetryPolicy, parse_retry_after
+
+from tests.fakes import FakeResponse
+
+
+class FakeSession:
+    """Answers each POST with the next of ``outcomes``, raising it if it is an exception."""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def post(self, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(time, "sleep", delays.append)
+    return delays
+
+
+def client_with(outcomes) -> HttpClient:
+    client = HttpClient(Config())
+    client.session = FakeSession(outcomes)
+    return client
+
+
+def test_parse_retry_after():
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("") is None
+    assert parse_retry_after("2.5") == 2.5
+    assert parse_retry_after("-3") == 0.0
+    assert parse_retry_after("soon") is None
+    retry_at = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 < parse_retry_after(retry_at) <= 60
+    assert parse_retry_after(email.utils.formatdate(0, usegmt=True)) == 0.0
+
+
+def test_retry_policy_honours_retry_after_up_to_its_limit():
+    policy = RetryPolicy(Config())
+    assert policy.response_delay(429, {"Retry-After": "3"}, 0) == 3.0
+    assert policy.response_delay(503, {"Retry-After": "3"}, policy.max_retries) is None
+    assert policy.response_delay(400, {"Retry-After": "3"}, 0) is None
+    # Waiting longer than allowed gives the response back instead
+    assert policy.response_delay(429, {"Retry-After": "600"}, 0) is None
+    assert 0 <= policy.response_delay(500, {}, 2) <= min(policy.backoff_max, policy.backoff_base * 4)
+
+
+def test_post_retries_transient_failures(sleeps):
+    ok = FakeResponse(payload={"text": "Hallo"})
+    client = client_with([
+        requests.ConnectionError("reset"),
+        FakeResponse(status_code=429, headers={"Retry-After": "1"}),
+        FakeResponse(status_code=502),
+        ok,
+    ])
+    assert client.post("https://api.example.com/v1") is ok
+    assert client.session.calls == 4
+    assert len(sleeps) == 3 and sleeps[1] == 1.0
+
+
+def test_post_returns_the_last_response_once_retries_run_out(sleeps):
+    client = client_with([FakeResponse(status_code=503) for _ in range(4)])
+    assert client.post("https://api.example.com/v1").status_code == 503
+    assert client.session.calls == 4
+
+
+def test_post_gives_up_on_errors_after_the_last_retry(sleeps):
+    client = client_with([requests.Timeout("slow") for _ in range(4)])
+    with pytest.raises(requests.Timeout):
+        client.post("https://api.example.com/v1")
+    assert client.session.calls == 4
+
+
+def test_post_does_not_retry_client_errors(sleeps):
+    client = client_with([FakeResponse(status_code=400)])
+    assert client.post("https://api.example.com/v1").status_code == 400
+    assert sleeps == []
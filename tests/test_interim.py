@@ -0,0 +1,40 @@
+import pytest
+
+from com.mhire.services.interim import StablePrefixCommitter, drop_committed_prefix
+
+
+@pytest.mark.parametrize("text, committed, expected", [
+    ("Hello, world. How are you?", ["hello", "world"], "How are you?"),
+    ("I think we should go", ["I", "think", "that", "we"], "should go"),
+    ("I think that we should go", ["I", "think", "we"], "should go"),
+    ("I think we could go now", ["I", "think", "that", "we", "should"], "go now"),
+    ("Totally different words", ["Hello", "world"], "Totally different words"),
+    ("Hello", ["Hello", "world"], ""),
+    ("Hello world", [], "Hello world"),
+    ("I think I think so", ["I", "think"], "I think so"),
+])
+def test_drop_committed_prefix(text, committed, expected):
+    assert drop_committed_prefix(text, committed) == expected
+
+
+def test_committer_commits_words_two_hypotheses_agree_on():
+    committer = StablePrefixCommitter()
+    assert committer.update("I think") == ("", "I think")
+    assert committer.update("I think we") == ("I think", "we")
+    assert committer.update("I think we should") == ("we", "should")
+    assert committer.committed == ["I", "think", "we"]
+
+
+def test_committer_ignores_case_and_punctuation_but_never_the_last_word():
+    committer = StablePrefixCommitter()
+    committer.update("hello world")
+    assert committer.update("Hello, world") == ("Hello,", "world")
+
+
+def test_committed_words_are_never_taken_back():
+    committer = StablePrefixCommitter()
+    committer.update("the cat sat")
+    assert committer.update("the cat sat down") == ("the cat sat", "down")
+    # The hypothesis changed its mind about "cat"; what was committed stays
+    assert committer.update("the hat sat down here") == ("down", "here")
+    assert committer.committed == ["the", "cat", "sat", "down"]
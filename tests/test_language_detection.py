@@ -0,0 +1,60 @@
+import pytest
+
+from com.mhire.config.config import Config
+from com.mhire.services.language_detection import LanguageDetector, asr_language_code, detect_text_language
+
+
+def make_detector(mode: str, **options) -> LanguageDetector:
+    config = Config()
+    config.SOURCE_LANGUAGE_DETECTION = mode
+    return LanguageDetector(config, **options)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Where are you going with that?", "en"),
+    ("Wo bist du, und was machst du heute?", "de"),
+    ("Schöne Grüße", "de"),
+    ("مرحبا، كيف حالك؟", "ar"),
+    ("OK", None),
+    ("1234 ...", None),
+])
+def test_detect_text_language(text, expected):
+    assert detect_text_language(text) == expected
+
+
+def test_asr_language_code():
+    assert asr_language_code(" German ") == "de"
+    assert asr_language_code("ar") == "ar"
+    assert asr_language_code("french") == "french"
+    assert asr_language_code(None) is None
+
+
+def test_asr_language_wins_and_text_is_the_fallback():
+    detector = make_detector("asr")
+    assert detector.detect("Where are you going?", "german") == "de"
+    assert detector.detect("Where are you going?", "french") == "en"
+    assert detector.detect("Wo bist du?", None) == "de"
+
+
+def test_text_mode_ignores_the_asr_language():
+    detector = make_detector("text")
+    assert not detector.uses_asr
+    assert detector.detect("Where are you going?", "german") == "en"
+
+
+def test_unclear_segments_keep_the_last_language():
+    detector = make_detector("text")
+    assert detector.detect("OK") == "en"
+    assert detector.detect("Das ist gut") == "de"
+    assert detector.detect("OK") == "de"
+    assert detector.detect("") == "de"
+
+
+def test_unsupported_languages_are_not_chosen():
+    detector = make_detector("asr", supported=("en", "de"))
+    assert detector.detect("مرحبا، كيف حالك؟", "arabic") == "en"
+
+
+def test_detection_can_be_switched_off():
+    detector = make_detector("off", default="de")
+    assert detector.detect("Where are you going?", "english") == "de"
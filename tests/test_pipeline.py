@@ -0,0 +1,102 @@
+import random
+import threading
+import time
+
+from com.mhire.config.config import Config
+from com.mhire.services.pipeline import Pipeline, SequenceReorderer
+from com.mhire.services.translation import Translation
+
+from tests.fakes import FakeChatClient, FakeTranscription
+
+
+def slow_upper(text: str) -> str:
+    """Uppercases, after a random delay, so translations finish out of order"""
+    time.sleep(random.uniform(0, 0.03))
+    return text.upper()
+
+
+def run_pipeline(config: Config, transcripts, **pipeline_options):
+    translation = Translation(config)
+    client = translation.http_client = FakeChatClient(slow_upper)
+    delivered = []
+    done = threading.Event()
+
+    def on_translation(utterance, tgt_lang):
+        delivered.append((utterance.sequence, tgt_lang, utterance.translations[tgt_lang]))
+        if len(delivered) == len(transcripts) * len(pipeline.tgt_langs):
+            done.set()
+
+    pipeline = Pipeline(
+        config, FakeTranscription(transcripts, lambda: random.uniform(0, 0.02)), translation,
+        src_lang="en", on_translation=on_translation, **pipeline_options,
+    )
+    pipeline.start()
+    assert done.wait(10)
+    pipeline.stop(timeout=5)
+    return pipeline, client, delivered
+
+
+def test_reorderer_holds_back_early_items():
+    reorderer = SequenceReorderer()
+    assert reorderer.push(1, "b") == []
+    assert reorderer.push(2, "c") == []
+    assert reorderer.push(0, "a") == ["a", "b", "c"]
+    assert reorderer.push(4, "e") == []
+    assert reorderer.push(3, "d") == ["d", "e"]
+
+
+def test_results_are_delivered_in_order_whatever_order_workers_finish_in():
+    random.seed(0)
+    config = Config()
+    config.PIPELINE_ASR_WORKERS = 3
+    config.PIPELINE_TRANSLATION_WORKERS = 4
+    config.TRANSLATION_BATCHING = False
+    config.TRANSLATION_CONTEXT_PAIRS = 0
+    transcripts = [f"part {i}" for i in range(20)]
+    transcribed = []
+
+    _, _, delivered = run_pipeline(
+        config, transcripts, tgt_langs=("de", "ar"),
+        on_transcription=lambda utterance: transcribed.append(utterance.transcription),
+    )
+
+    assert transcribed == transcripts
+    for tgt_lang in ("de", "ar"):
+        assert [text for _, lang, text in delivered if lang == tgt_lang] == [text.upper() for text in transcripts]
+
+
+def test_context_follows_the_transcript_order():
+    random.seed(1)
+    config = Config()
+    config.PIPELINE_TRANSLATION_WORKERS = 4
+    config.TRANSLATION_CONTEXT_PAIRS = 100
+    config.TRANSLATION_CONTEXT_MAX_TOKENS = 10000
+    transcripts = [f"and then part {i}" for i in range(20)]
+
+    pipeline, client, _ = run_pipeline(config, transcripts, tgt_langs=("de",))
+
+    history = [message["content"] for message in pipeline.translation_context.messages("en", "de")[::2]]
+    assert history == transcripts
+    for request in client.requests:
+        # Whatever a request saw of the history is a gap-free run from the start
+        sent = [message["content"] for message in request["messages"][1:-1:2]]
+        assert sent == transcripts[:len(sent)]
+
+
+def test_streamed_translations_end_with_the_cleaned_text():
+    random.seed(2)
+    config = Config()
+    config.TRANSLATION_BATCHING = False
+    transcripts = ["good morning.", "fine. here we go.", "see you.\nnote: later"]
+    deltas = {}
+
+    def on_translation_delta(utterance, tgt_lang, delta):
+        deltas[utterance.sequence] = deltas.get(utterance.sequence, "") + delta
+
+    _, _, delivered = run_pipeline(
+        config, transcripts, tgt_langs=("de",), on_translation_delta=on_translation_delta
+    )
+
+    assert [text for _, _, text in sorted(delivered)] == ["GOOD MORNING.", "", "SEE YOU."]
+    # The empty final translation still reaches the sink, to take back its preview
+    assert deltas[1] == "FINE. HERE WE GO."
@@ -0,0 +1,111 @@
+import threading
+import time
+
+import pytest
+
+from com.mhire.services.rate_limiter import EndpointLimiter, Priority, SharedQuota, TokenBucket
+
+
+def test_token_bucket_refills_at_its_rate():
+    bucket = TokenBucket(rate=2.0, capacity=4.0)
+    now = bucket.updated
+    assert bucket.delay(4, now) == 0
+    bucket.take(4)
+    assert bucket.delay(1, now) == pytest.approx(0.5)
+    assert bucket.delay(1, now + 0.5) == 0
+    # Never fuller than its capacity
+    assert bucket.delay(4, now + 100) == 0
+    assert bucket.level == 4.0
+
+
+def test_token_bucket_lets_oversized_requests_through_into_debt():
+    bucket = TokenBucket(rate=1.0, capacity=2.0)
+    now = bucket.updated
+    assert bucket.delay(10, now) == 0
+    bucket.take(10)
+    assert bucket.delay(1, now) == pytest.approx(9.0)
+
+
+def start_waiters(limiter: EndpointLimiter, priorities, granted, **acquire_options):
+    """Start one thread per priority, each queueing behind the previous one"""
+    threads = []
+    for priority in priorities:
+        def wait(priority=priority):
+            if limiter.acquire(priority=priority, **acquire_options):
+                granted.append(priority)
+
+        thread = threading.Thread(target=wait)
+        thread.start()
+        threads.append(thread)
+        while len(limiter.waiting) < len(threads):
+            time.sleep(0.001)
+    return threads
+
+
+def test_waiting_requests_get_quota_in_priority_order():
+    # One request every 20 ms, and the only one is taken
+    limiter = EndpointLimiter("test", requests_per_second=50, tokens_per_second=0, burst_seconds=0)
+    assert limiter.acquire()
+
+    granted = []
+    threads = start_waiters(limiter, [Priority.BATCH, Priority.LIVE_INTERIM, Priority.LIVE_FINAL, Priority.BATCH], granted)
+    for thread in threads:
+        thread.join(5)
+    assert granted == [Priority.LIVE_FINAL, Priority.LIVE_INTERIM, Priority.BATCH, Priority.BATCH]
+
+
+def test_cancelled_requests_leave_the_line():
+    limiter = EndpointLimiter("test", requests_per_second=20, tokens_per_second=0, burst_seconds=0)
+    assert limiter.acquire()
+
+    cancel = threading.Event()
+    granted = []
+    cancelled = start_waiters(limiter, [Priority.LIVE_INTERIM], granted, cancelled=cancel.is_set)
+    behind = start_waiters(limiter, [Priority.BATCH], granted)
+    cancel.set()
+    for thread in cancelled + behind:
+        thread.join(5)
+    # The cancelled request never took quota; the one behind it did
+    assert granted == [Priority.BATCH]
+    assert limiter.waiting == []
+
+
+def shared_limiter(path, requests_per_second: float) -> EndpointLimiter:
+    """A limiter as another process would have it: its own SharedQuota connection on the same file"""
+    return EndpointLimiter("test", requests_per_second, 0, burst_seconds=0, shared=SharedQuota(str(path)))
+
+
+def test_processes_sharing_a_quota_draw_on_one_bucket(tmp_path):
+    live = shared_limiter(tmp_path / "quota.sqlite3", requests_per_second=2)
+    batch = shared_limiter(tmp_path / "quota.sqlite3", requests_per_second=2)
+    assert live.acquire()
+
+    started = time.monotonic()
+    assert batch.acquire(priority=Priority.BATCH)
+    # The request the live process took leaves the batch one waiting for the refill
+    assert time.monotonic() - started == pytest.approx(0.5, abs=0.2)
+
+
+def test_batch_requests_give_way_to_live_ones_of_another_process(tmp_path):
+    live = shared_limiter(tmp_path / "quota.sqlite3", requests_per_second=20)
+    batch = shared_limiter(tmp_path / "quota.sqlite3", requests_per_second=20)
+    assert batch.acquire(priority=Priority.BATCH)
+
+    granted = []
+    batch_threads = start_waiters(batch, [Priority.BATCH], granted)
+    # Let the batch request register in the shared line first
+    time.sleep(0.02)
+    live_threads = start_waiters(live, [Priority.LIVE_FINAL], granted)
+    for thread in batch_threads + live_threads:
+        thread.join(5)
+    assert granted == [Priority.LIVE_FINAL, Priority.BATCH]
+
+
+def test_a_429_pauses_every_process(tmp_path):
+    first = shared_limiter(tmp_path / "quota.sqlite3", requests_per_second=0)
+    second = shared_limiter(tmp_path / "quota.sqlite3", requests_per_second=0)
+    first.pause(0.3)
+
+    started = time.monotonic()
+    assert second.acquire()
+    assert time.monotonic() - started == pytest.approx(0.3, abs=0.15)
@@ -0,0 +1,94 @@
+import tkinter as tk
+
+from com.mhire.visuals.renderer import TextRenderer
+
+
+class FakeText:
+    """The part of ``tk.Text`` the renderer uses, over a list of (character, tag) pairs"""
+
+    def __init__(self):
+        self.chars = []
+        self.inserts = 0
+
+    @property
+    def text(self) -> str:
+        return ''.join(char for char, _ in self.chars)
+
+    def _offset(self, index) -> int:
+        if isinstance(index, int):
+            return index
+        if index == tk.END:
+            return len(self.chars)
+        line, column = map(int, index.split("."))
+        lines = self.text.split("\n")
+        return sum(len(text) + 1 for text in lines[:line - 1]) + column
+
+    def index(self, index: str) -> str:
+        assert index == "end-1c"
+        return f"{self.text.count(chr(10)) + 1}.0"
+
+    def get(self, start, end) -> str:
+        return self.text[self._offset(start):self._offset(end)]
+
+    def insert(self, index, text: str, tag=None) -> None:
+        self.inserts += 1
+        offset = self._offset(index)
+        self.chars[offset:offset] = [(char, tag) for char in text]
+
+    def delete(self, start, end) -> None:
+        del self.chars[self._offset(start):self._offset(end)]
+
+    def tag_ranges(self, tag: str):
+        offsets = [offset for offset, (_, char_tag) in enumerate(self.chars) if char_tag == tag]
+        return (offsets[0], offsets[-1] + 1) if offsets else ()
+
+    def see(self, index) -> None:
+        pass
+
+
+def make_renderer(scrollback_lines: int = 100, archive_path=None):
+    renderer = TextRenderer(root=None, frame_interval_ms=50, scrollback_lines=scrollback_lines,
+                            archive_path=archive_path)
+    widget = FakeText()
+    renderer.add_area(widget, "en")
+    return renderer, widget
+
+
+def test_appends_are_merged_into_one_insert_per_frame():
+    renderer, widget = make_renderer()
+    for word in ["one ", "two ", "three"]:
+        renderer.append(widget, word)
+    renderer.append(widget, "!", "streaming")
+    renderer._render_pending()
+    assert widget.text == "one two three!"
+    assert widget.inserts == 2
+
+
+def test_streamed_preview_is_replaced_by_the_final_text():
+    renderer, widget = make_renderer()
+    renderer.append(widget, "Hallo.\n")
+    renderer.append(widget, "Gut", "streaming")
+    renderer.append(widget, "en Mor", "streaming")
+    renderer._render_pending()
+    renderer.insert_before_tag(widget, "Guten Morgen.\n", "streaming")
+    renderer.replace_tag(widget, "", "streaming")
+    renderer._render_pending()
+    assert widget.text == "Hallo.\nGuten Morgen.\n"
+
+
+def test_long_sessions_are_trimmed_and_archived(tmp_path):
+    renderer, widget = make_renderer(scrollback_lines=10, archive_path=str(tmp_path / "transcript.txt"))
+    lines = [f"line {i}\n" for i in range(25)]
+    # The line after the last newline counts, as in Tk
+    for line in lines[:9]:
+        renderer.append(widget, line)
+    renderer._render_pending()
+    assert widget.text == ''.join(lines[:9])
+
+    for line in lines[9:]:
+        renderer.append(widget, line)
+    renderer._render_pending()
+    # Trimmed down to 90% of the limit, oldest lines first
+    assert widget.text == ''.join(lines[17:])
+    with open(tmp_path / "transcript.en.txt", encoding="utf-8") as archive:
+        assert archive.read() == ''.join(lines[:17])
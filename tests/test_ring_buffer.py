@@ -0,0 +1,24 @@
+import numpy as np
+import pytest
+
+from com.mhire.utils.ring_buffer import AudioRingBuffer
+
+
+def test_ring_buffer_views_wrap_without_copying():
+    buffer = AudioRingBuffer(8)
+    buffer.write(np.arange(6, dtype=np.float32))
+    buffer.write(np.arange(6, 11, dtype=np.float32))
+
+    view = buffer.view(3, 11)
+    assert view.tolist() == list(range(3, 11))
+    assert np.shares_memory(view, buffer.data)
+    assert buffer.oldest_position() == 3
+
+
+def test_ring_buffer_keeps_the_end_of_oversized_writes():
+    buffer = AudioRingBuffer(4)
+    buffer.write(np.arange(10, dtype=np.float32))
+    assert buffer.write_pos == 10
+    assert buffer.view(6, 10).tolist() == [6, 7, 8, 9]
+    with pytest.raises(ValueError):
+        buffer.view(5, 9)
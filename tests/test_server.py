@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+
+from com.mhire.config.config import Config
+from com.mhire.services.async_translation import AsyncTranslation
+from com.mhire.services.server import ClientSession
+from com.mhire.services.vad import BatchedVadScheduler
+
+SUPPORTED = ["ar", "en", "de"]
+
+
+class FakeServer:
+    def __init__(self, config: Config):
+        self.config = config
+        self.translation = AsyncTranslation(config)
+        # Sessions never run the VAD here, so no model has to be loaded
+        self.vad_scheduler = BatchedVadScheduler(max_streams=4, model=object())
+
+
+def run_session(test, **settings):
+    """Runs ``test(session)`` on a session whose websocket is never used"""
+    async def main():
+        config = Config()
+        for name, value in settings.items():
+            setattr(config, name, value)
+        return await test(ClientSession(FakeServer(config), websocket=None))
+    return asyncio.run(main())
+
+
+def queued_events(session: ClientSession):
+    events = []
+    while not session.outgoing.empty():
+        events.append(session.outgoing.get_nowait())
+    return events
+
+
+@pytest.mark.parametrize("control, error", [
+    ({"type": "start", "src_lang": "de", "tgt_langs": ["en", "ar"]}, None),
+    ({"type": "config", "src_lang": "", "tgt_lang": "en", "format": "float32"}, None),
+    ({"type": "config", "src_lang": None, "tgt_langs": []}, None),
+    ([], "Control messages must be JSON objects"),
+    ({"type": 5}, "type must be a string"),
+    ({"src_lang": ["de"]}, "src_lang must be a string"),
+    ({"tgt_langs": "de"}, "tgt_langs must be a list of strings"),
+    ({"tgt_langs": ["en", 1]}, "tgt_langs must be a list of strings"),
+    ({"src_lang": "fr"}, "Unsupported language fr, expected one of ar, en, de"),
+    ({"tgt_lang": "english"}, "Unsupported language english, expected one of ar, en, de"),
+    ({"tgt_langs": ["en", "xx"]}, "Unsupported language xx, expected one of ar, en, de"),
+    ({"format": "mp3"}, "Unsupported format mp3"),
+])
+def test_validate_control(control, error):
+    assert ClientSession._validate_control(control, SUPPORTED) == error
+
+
+def test_start_applies_the_settings_and_answers_ready():
+    async def test(session):
+        message = {"type": "start", "src_lang": "de", "tgt_langs": ["en", "ar"], "format": "float32"}
+        assert await session._receive_control(json.dumps(message))
+        assert (session.src_lang, session.tgt_langs, session.sample_format.name) == ("de", ["en", "ar"], "float32")
+        return queued_events(session)
+
+    assert run_session(test) == [{"type": "ready", "sample_rate": 16000}]
+
+
+def test_invalid_control_messages_change_nothing():
+    async def test(session):
+        assert await session._receive_control("not json")
+        assert await session._receive_control(json.dumps({"src_lang": "de", "tgt_langs": ["fr"]}))
+        assert (session.src_lang, session.tgt_langs) == (None, ["en"])
+        assert not await session._receive_control(json.dumps({"type": "stop"}))
+        return queued_events(session)
+
+    assert [event["message"] for event in run_session(test)] == [
+        "Control messages must be JSON",
+        "Unsupported language fr, expected one of ar, en, de",
+    ]
+
+
+def test_vad_events_are_dropped_and_results_wait_when_the_client_lags():
+    async def test(session):
+        for time in range(3):
+            session._offer_event({"type": "vad", "event": "start", "time": time})
+        translation = {"type": "translation", "sequence": 0, "lang": "en", "text": "Hello"}
+        send = asyncio.create_task(session._send_event(translation))
+        await asyncio.sleep(0.01)
+        assert not send.done()
+
+        # The client reads one event, which makes room for the translation
+        session.outgoing.get_nowait()
+        await asyncio.wait_for(send, 1)
+        return queued_events(session)
+
+    events = run_session(test, SERVER_MAX_OUTGOING_EVENTS=2)
+    assert [event["type"] for event in events] == ["vad", "translation"]
@@ -0,0 +1,99 @@
+import json
+
+import pytest
+
+from com.mhire.config.config import Config
+from com.mhire.services.translation import (
+    CompletionStream,
+    StreamingTranslationCleaner,
+    Translation,
+    clean_translation,
+    parse_sse_delta,
+)
+
+from tests.fakes import FakeChatClient, streamed_completion
+
+COMPLETIONS = [
+    "Guten Morgen.",
+    "Translation: Guten Morgen.",
+    "Here's the translation: Guten Morgen.\nNote: formal register",
+    "Sure, here is the German text:\nGuten Morgen.",
+    "Das ist gut. Please translate more.\nZweite Zeile",
+    "Hallo. Here we go.",
+    "Hallo\n\nWelt",
+    "Erste Zeile\nZweite Zeile\n",
+    "Translation:",
+    "",
+]
+
+
+def stream_deltas(text: str, size: int):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+def run_stream(deltas):
+    stream = CompletionStream()
+    lines = streamed_completion(deltas).lines
+    preview = ''.join(stream.feed_line(line) for line in lines) + stream.finish()
+    return preview, stream.text
+
+
+@pytest.mark.parametrize("completion", COMPLETIONS)
+@pytest.mark.parametrize("size", [1, 2, 5, 1000])
+def test_streamed_translation_ends_as_clean_translation(completion, size):
+    _, text = run_stream(stream_deltas(completion, size))
+    assert text == clean_translation(completion)
+
+
+@pytest.mark.parametrize("completion, expected", [
+    ("Das ist gut. Please translate more.\nZweite Zeile", "Zweite Zeile"),
+    ("Hallo. Here we go.", ""),
+    ("Hallo\n\nWelt", "Hallo  Welt"),
+])
+def test_final_text_replaces_a_diverging_preview(completion, expected):
+    preview, text = run_stream(stream_deltas(completion, 1))
+    assert text == expected
+    assert preview != expected
+
+
+def test_cleaner_holds_back_prefixes_and_meta_lines():
+    cleaner = StreamingTranslationCleaner()
+    shown = [cleaner.feed(delta) for delta in stream_deltas("Translation: Guten Morgen.\nNote: formal", 4)]
+    shown.append(cleaner.finish())
+    assert ''.join(shown) == "Guten Morgen."
+    # Nothing of the prefix is shown before it can be told apart from the text
+    assert shown[:3] == ["", "", ""]
+
+
+def test_cleaner_streams_the_first_line_once_it_holds_a_sentence():
+    cleaner = StreamingTranslationCleaner()
+    assert cleaner.feed("Guten Morgen") == ""
+    assert cleaner.feed(". Wie ") == "Guten Morgen. Wie "
+    assert cleaner.feed("geht's?") == "geht's?"
+    assert cleaner.finish() == ""
+
+
+def test_streamed_translation_returns_and_caches_the_final_text():
+    translation = Translation(Config())
+    client = translation.http_client = FakeChatClient(lambda text: "Hallo. Here we go.")
+
+    stream = translation.translate_text_stream("Hello. Off we go.", "en", "de")
+    preview = []
+    with pytest.raises(StopIteration) as finished:
+        while True:
+            preview.append(next(stream))
+    assert ''.join(preview) == "Hallo. Here we go."
+    assert finished.value.value == ""
+
+    # Empty results are not cached, so the same text is requested again
+    assert translation.translate_text("Hello. Off we go.", "en", "de") == ""
+    assert len(client.requests) == 2
+
+
+def test_parse_sse_delta():
+    event = {"choices": [{"delta": {"content": "Hallo"}}]}
+    assert parse_sse_delta("data: " + json.dumps(event)) == "Hallo"
+    assert parse_sse_delta("data: [DONE]") is None
+    assert parse_sse_delta(": keep-alive") is None
+    assert parse_sse_delta("data: " + json.dumps({"choices": []})) is None
+    assert parse_sse_delta("data: " + json.dumps({"choices": [{"delta": {}}]})) is None
@@ -0,0 +1,49 @@
+import pytest
+
+from com.mhire.config.config import Config
+from com.mhire.services.translation import Translation
+from com.mhire.services.translation_batcher import TranslationBatcher, format_batch, split_batch
+
+from tests.fakes import FakeChatClient
+
+
+def make_batcher(reply) -> TranslationBatcher:
+    config = Config()
+    config.TRANSLATION_BATCH_MAX_SEGMENTS = 2
+    config.TRANSLATION_BATCH_WINDOW_MS = 5000
+    translation = Translation(config)
+    translation.http_client = FakeChatClient(reply)
+    return TranslationBatcher(config, translation)
+
+
+def test_split_batch_round_trip():
+    content = format_batch(["Hallo  Welt", "Wie geht's?"])
+    assert split_batch(content, 2) == [" Hallo Welt\n", " Wie geht's?"]
+
+
+@pytest.mark.parametrize("content", [
+    "[[1]] eins",
+    "[[1]] eins [[1]] zwei",
+    "[[2]] zwei [[1]] eins",
+    "[[1]] eins [[2]] zwei [[3]] drei",
+    "eins\nzwei",
+])
+def test_split_batch_rejects_mismatched_markers(content):
+    assert split_batch(content, 2) is None
+
+
+def test_segments_are_translated_in_one_request():
+    batcher = make_batcher(str.upper)
+    futures = [batcher.submit(text, "en", "de") for text in ["good  morning", "see you"]]
+    assert [future.result(5) for future in futures] == ["GOOD MORNING", "SEE YOU"]
+    batcher.close()
+    assert len(batcher.translation.http_client.requests) == 1
+    assert batcher.stats()["segments_per_request"] == 2
+
+
+def test_unusable_replies_fall_back_to_one_request_per_segment():
+    batcher = make_batcher(lambda text: "[[1]] only one" if text.startswith("[[") else text.upper())
+    futures = [batcher.submit(text, "en", "de") for text in ["good morning", "see you"]]
+    assert [future.result(5) for future in futures] == ["GOOD MORNING", "SEE YOU"]
+    batcher.close()
+    assert batcher.stats()["requests"] == 3 and batcher.stats()["fallbacks"] == 1
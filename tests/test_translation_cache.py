@@ -0,0 +1,93 @@
+import time
+
+import pytest
+
+from com.mhire.services import translation_cache
+from com.mhire.services.translation_cache import (
+    LRUTranslationCache,
+    SQLiteTranslationCache,
+    make_cache_key,
+    normalize_text,
+)
+
+
+class FakeClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(translation_cache.time, "monotonic", clock)
+    monkeypatch.setattr(translation_cache.time, "time", clock)
+    return clock
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("  Hello,   world.  ", "Hello, world"),
+    ("\"Hello world!\"", "Hello world!"),
+    ("Hello world?!", "Hello world?"),
+    ("¿Qué tal？", "Qué tal?"),
+    ("...", "..."),
+])
+def test_normalize_text(text, expected):
+    assert normalize_text(text) == expected
+
+
+def test_trivial_variants_share_a_key():
+    assert make_cache_key("Hello world.", "en", "de", None) == make_cache_key(" Hello  world ", "en", "de", "")
+    assert make_cache_key("Hello", "en", "de", "a") != make_cache_key("Hello", "en", "de", "b")
+    assert make_cache_key("Hello", "en", "de", None) != make_cache_key("Hello", "en", "ar", None)
+    assert make_cache_key("Ready.", "en", "de", None) != make_cache_key("Ready?", "en", "de", None)
+
+
+def test_lru_evicts_the_least_recently_used_entry(clock):
+    cache = LRUTranslationCache(max_size=2)
+    cache.put(("en", "de", "", "a"), "A")
+    cache.put(("en", "de", "", "b"), "B")
+    assert cache.get(("en", "de", "", "a")) == "A"
+    cache.put(("en", "de", "", "c"), "C")
+    assert cache.get(("en", "de", "", "b")) is None
+    assert cache.get(("en", "de", "", "a")) == "A"
+    assert cache.stats() == {"hits": 2, "misses": 1, "hit_rate": 2 / 3}
+
+
+def test_lru_entries_expire(clock):
+    cache = LRUTranslationCache(ttl=10)
+    cache.put(("en", "de", "", "a"), "A")
+    clock.now += 10
+    assert cache.get(("en", "de", "", "a")) == "A"
+    clock.now += 1
+    assert cache.get(("en", "de", "", "a")) is None
+    assert not cache.entries
+
+
+def test_sqlite_cache_survives_reopening(tmp_path):
+    path = str(tmp_path / "translations.db")
+    cache = SQLiteTranslationCache(path)
+    cache.put(("en", "de", "", "a"), "A")
+    cache.close()
+
+    cache = SQLiteTranslationCache(path)
+    assert cache.get(("en", "de", "", "a")) == "A"
+    assert cache.get(("en", "ar", "", "a")) is None
+    cache.close()
+
+
+def test_sqlite_cache_prunes_by_age_and_count(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(translation_cache, "SQLITE_PRUNE_INSERTS", 3)
+    cache = SQLiteTranslationCache(str(tmp_path / "translations.db"), max_size=2, ttl=10)
+    cache.put(("en", "de", "", "old"), "OLD")
+    clock.now += 11
+    assert cache.get(("en", "de", "", "old")) is None
+
+    for text in ["a", "b"]:
+        clock.now += 1
+        cache.put(("en", "de", "", text), text.upper())
+    rows = cache.connection.execute("SELECT text FROM translations ORDER BY stored_at").fetchall()
+    assert rows == [("a",), ("b",)]
+    cache.close()
@@ -0,0 +1,70 @@
+from com.mhire.config.config import Config
+from com.mhire.services.translation import Translation
+from com.mhire.services.translation_context import TranslationContext
+
+from tests.fakes import FakeChatClient
+
+
+def translate(translation: Translation, context: TranslationContext, text: str) -> str:
+    result = translation.translate_text(text, "en", "de", context)
+    context.add("en", "de", text, result)
+    return result
+
+
+def test_whole_sentences_hit_the_cache_in_the_default_configuration():
+    config = Config()
+    assert config.TRANSLATION_CONTEXT_PAIRS > 0 and config.TRANSLATION_CACHE == "memory"
+    translation = Translation(config)
+    client = translation.http_client = FakeChatClient()
+
+    first_session = TranslationContext(config)
+    translate(translation, first_session, "Good morning.")
+    translate(translation, first_session, "Thank you.")
+    second_session = TranslationContext(config)
+    translate(translation, second_session, "How are you?")
+    assert translate(translation, second_session, "Thank you.") == "THANK YOU."
+
+    assert len(client.requests) == 3
+    assert translation.cache.stats()["hits"] == 1
+
+
+def test_fragments_continuing_a_sentence_bypass_the_cache():
+    config = Config()
+    translation = Translation(config)
+    client = translation.http_client = FakeChatClient()
+
+    context = TranslationContext(config)
+    translate(translation, context, "I went to the")
+    translate(translation, context, "store.")
+    other = TranslationContext(config)
+    translate(translation, other, "We drove to the")
+    translate(translation, other, "store.")
+
+    assert len(client.requests) == 4
+    assert translation.cache.stats()["hits"] == 0
+    # The continuation was sent after the start of its sentence
+    assert [m["content"] for m in client.requests[-1]["messages"][-3:]] == ["We drove to the", "WE DROVE TO THE", "store."]
+
+
+def test_history_is_trimmed_to_three_quarters_of_the_pair_cap():
+    config = Config()
+    config.TRANSLATION_CONTEXT_PAIRS = 4
+    context = TranslationContext(config)
+    for i in range(5):
+        context.add("en", "de", f"text {i}", f"text {i} de")
+
+    messages = context.messages("en", "de")
+    assert [message["content"] for message in messages[::2]] == ["text 2", "text 3", "text 4"]
+    assert context.messages("de", "en") == []
+
+
+def test_history_is_trimmed_by_estimated_tokens():
+    config = Config()
+    config.TRANSLATION_CONTEXT_MAX_TOKENS = 40
+    context = TranslationContext(config)
+    for i in range(3):
+        context.add("en", "de", f"{i}" * 60, "x")
+
+    # A pair is about 17 tokens: the third overflows the cap, and the history
+    # is cut down to three quarters of it
+    assert [message["content"][0] for message in context.messages("en", "de")[::2]] == ["2"]
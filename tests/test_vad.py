@@ -0,0 +1,200 @@
+import os
+import threading
+
+import numpy as np
+import pytest
+
+from benchmarks.replay import synthetic_speech
+from com.mhire.services.vad import (
+    BatchedVadScheduler,
+    VadIterator,
+    VadOptions,
+    VadRuntimeOptions,
+    _load_vad_model,
+    get_vad_model,
+    speech_probs_to_timestamps,
+    speech_probs_to_timestamps_array,
+)
+
+
+def random_speech_probs(rng: np.random.Generator, num_windows: int) -> np.ndarray:
+    """Runs of similar probabilities, like the VAD produces for speech and pauses"""
+    levels = rng.random(num_windows)
+    lengths = rng.integers(1, 12, num_windows)
+    return np.repeat(levels, lengths)[:num_windows].astype(np.float32)
+
+
+def random_vad_options(rng: np.random.Generator, **overrides) -> VadOptions:
+    options = dict(
+        threshold=float(rng.choice([0.3, 0.5, 0.7])),
+        neg_threshold=rng.choice([None, 0.2, 0.4]),
+        min_speech_duration_ms=int(rng.choice([0, 64, 250])),
+        max_speech_duration_s=float(rng.choice([0.5, 1.0, 3.0, np.inf])),
+        min_silence_duration_ms=int(rng.choice([100, 300, 700, 2000])),
+        speech_pad_ms=int(rng.choice([0, 30, 400])),
+    )
+    options.update(overrides)
+    return VadOptions(**options)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_timestamp_backends_agree(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(50):
+        speech_probs = random_speech_probs(rng, int(rng.integers(1, 600)))
+        audio_length = speech_probs.shape[0] * 512 - int(rng.integers(0, 512))
+        options = random_vad_options(rng)
+
+        expected = [
+            [speech["start"], speech["end"]]
+            for speech in speech_probs_to_timestamps(speech_probs, audio_length, options)
+        ]
+        actual = speech_probs_to_timestamps_array(speech_probs, audio_length, options)
+        assert actual.tolist() == expected, options
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_streaming_vad_matches_offline_segments(seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(50):
+        speech_probs = random_speech_probs(rng, int(rng.integers(1, 600)))
+        # Without padding the streaming events are exactly the offline segments
+        options = random_vad_options(rng, speech_pad_ms=0)
+
+        segments = []
+        for event in VadIterator(options, model=object()).process_probs(speech_probs):
+            if "start" in event:
+                segments.append([event["start"], None])
+            else:
+                assert segments and segments[-1][1] is None
+                segments[-1][1] = event["end"]
+        closed = [segment for segment in segments if segment[1] is not None]
+
+        offline = speech_probs_to_timestamps(speech_probs, speech_probs.shape[0] * 512, options)
+        expected = [[speech["start"], speech["end"]] for speech in offline]
+        assert closed == expected[: len(closed)], options
+
+
+def test_streaming_vad_segments_do_not_overlap():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        speech_probs = random_speech_probs(rng, 400)
+        events = VadIterator(random_vad_options(rng), model=object()).process_probs(speech_probs)
+        positions = [next(iter(event.values())) for event in events]
+        assert positions == sorted(positions)
+
+
+@pytest.fixture(scope="module")
+def vad_model():
+    pytest.importorskip("onnxruntime")
+    return get_vad_model()
+
+
+def random_blocks(rng: np.random.Generator, audio: np.ndarray):
+    """Splits audio into blocks of random size, most of them not whole windows"""
+    cuts = np.sort(rng.integers(0, audio.shape[0], audio.shape[0] // 3000))
+    return np.split(audio, cuts)
+
+
+def test_stream_carries_the_model_state_between_calls(vad_model):
+    audio = synthetic_speech(4)[None, : 512 * 120]
+    state, context = vad_model.get_initial_states(batch_size=1)
+    expected, _, _ = vad_model.stream(audio, state, context)
+
+    pieces = []
+    for chunk in np.split(audio, [512 * 7, 512 * 8, 512 * 50], axis=1):
+        speech_probs, state, context = vad_model.stream(chunk, state, context)
+        pieces.append(speech_probs)
+    np.testing.assert_allclose(np.concatenate(pieces, axis=1), expected, atol=1e-5)
+
+
+def test_iterator_events_do_not_depend_on_block_sizes(vad_model):
+    options = VadOptions(min_silence_duration_ms=300, speech_pad_ms=30)
+    audio = synthetic_speech(8, seed=3)
+    expected = VadIterator(options, model=vad_model)(audio)
+    assert any("end" in event for event in expected)
+
+    iterator = VadIterator(options, model=vad_model)
+    events = []
+    for block in random_blocks(np.random.default_rng(0), audio):
+        events.extend(iterator(block))
+    assert events == expected
+
+
+def test_scheduler_matches_per_stream_model_runs(vad_model):
+    rng = np.random.default_rng(0)
+    streams_audio = [synthetic_speech(6, seed=seed) for seed in range(3)]
+    scheduler = BatchedVadScheduler(max_streams=4, model=vad_model)
+    streams = [scheduler.add_stream() for _ in streams_audio]
+
+    batched = {stream: [] for stream in streams}
+    blocks = [random_blocks(rng, audio) for audio in streams_audio]
+    for step in range(max(len(stream_blocks) for stream_blocks in blocks)):
+        for stream, stream_blocks in zip(streams, blocks):
+            if step < len(stream_blocks):
+                scheduler.feed(stream, stream_blocks[step])
+        for stream, speech_probs in scheduler.step().items():
+            batched[stream].append(speech_probs)
+
+    for stream, audio in zip(streams, streams_audio):
+        num_samples = audio.shape[0] // 512 * 512
+        state, context = vad_model.get_initial_states(batch_size=1)
+        expected, _, _ = vad_model.stream(audio[None, :num_samples], state, context)
+        np.testing.assert_allclose(np.concatenate(batched[stream]), expected[0].reshape(-1), atol=1e-5)
+
+
+def test_iterators_on_a_shared_scheduler_match_dedicated_ones(vad_model):
+    options = VadOptions(min_silence_duration_ms=300, max_speech_duration_s=2.0, speech_pad_ms=30)
+    streams_audio = [synthetic_speech(8, seed=seed) for seed in range(4)]
+    scheduler = BatchedVadScheduler(max_streams=4, model=vad_model)
+    events = [[] for _ in streams_audio]
+
+    def run(index: int) -> None:
+        iterator = VadIterator(options, model=None, scheduler=scheduler)
+        for block in random_blocks(np.random.default_rng(index), streams_audio[index]):
+            events[index].extend(iterator(block))
+        iterator.close()
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(len(streams_audio))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    for audio, stream_events in zip(streams_audio, events):
+        expected = VadIterator(options, model=vad_model)(audio)
+        assert stream_events == expected
+        assert any("end" in event for event in expected)
+    # Every slot was given back
+    assert len(scheduler.free_slots) == 4
+
+
+def test_removed_stream_ids_are_not_reused():
+    scheduler = BatchedVadScheduler(max_streams=1, model=object())
+    first = scheduler.add_stream()
+    scheduler.remove_stream(first)
+    second = scheduler.add_stream()
+    assert second != first
+    with pytest.raises(KeyError):
+        scheduler.feed(first, np.zeros(512, dtype=np.float32))
+    with pytest.raises(RuntimeError):
+        scheduler.add_stream()
+
+
+def test_optimized_models_are_saved_whole_and_rebuilt_when_unreadable(vad_model, tmp_path):
+    options = VadRuntimeOptions(optimized_model_dir=str(tmp_path))
+    _load_vad_model(options)
+    saved = sorted(os.listdir(tmp_path))
+    assert len(saved) == 2 and all(name.endswith(".onnx") for name in saved)
+
+    for name in saved:
+        (tmp_path / name).write_bytes(b"truncated")
+    model = _load_vad_model(options)
+    assert sorted(os.listdir(tmp_path)) == saved
+    assert all((tmp_path / name).stat().st_size > len(b"truncated") for name in saved)
+
+    audio = synthetic_speech(2)[None, :16384]
+    state, context = model.get_initial_states(batch_size=1)
+    expected, _, _ = vad_model.stream(audio, state, context)
+    actual, _, _ = model.stream(audio, state, context)
+    np.testing.assert_allclose(actual, expected, atol=1e-5)